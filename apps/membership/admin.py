@@ -1,27 +1,56 @@
 import sys
 from urllib.parse import urlencode
 
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.admin import helpers, register
 from django.contrib.admin.options import get_content_type_for_model
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db.models import Count, Q, Sum
 from django.db.models.fields import TextField
-from django.http import HttpResponseRedirect
+from django.db.models.functions import Coalesce
+from django.http import Http404, HttpResponseRedirect, StreamingHttpResponse
 from django.shortcuts import render
 from django.urls import path, reverse
+from django.utils import timezone
 
 from apps.membership import forms, models
+from apps.membership.cohorts import get_cohorts
 from apps.membership.constants import TimeUnit
+from apps.membership.duplicates import merge_participants
 from apps.membership.filters import EligibleForVoteParticipantFilter, RequiresAttentionFilter
-from apps.membership.forms import AddMembershipForm, MembershipForm, ParticipantForm
+from apps.membership.forms import (
+    AddMembershipForm,
+    BankStatementForm,
+    MembershipForm,
+    ParticipantForm,
+    RosterImportForm,
+    TierChoiceField,
+)
 from apps.membership.formsets import ContactInfoInlineFormset
+from apps.membership.payments import create_payments
+from apps.membership.reconciliation import confirm_proposals, reconcile
+from apps.membership.reference_data import reference_data
+from apps.membership.renewals import apply_renewals, get_expiring, plan_renewals
+from apps.membership.rollups import get_revenue_report
+from apps.membership.roster import ROSTER_COLUMNS, import_roster
+from apps.membership.statistics import get_membership_statistics
 from apps.membership.templatetags import membership
+from apps.membership.timelines import get_timeline
+from apps.membership.voter_rolls import check_in, render_voter_roll, snapshot_voter_roll
 from common.utils.admin import (
     AppendOnlyModelAdminMixin,
+    ColumnProjectionMixin,
+    EmptySelectionActionsMixin,
+    LazyInlinesMixin,
+    PaginatedInlineMixin,
     RemoveDeleteActionMixin,
     TextAreaToInputMixin,
     ViewColumnMixin,
+    get_template_fields,
+    project_queryset,
 )
-from common.utils.form import RequiredOnceInlineFormSet
+from common.utils.db import read_from_replica
+from common.utils.form import RequiredOnceInlineFormSet, paginated_inline_formset_builder
 from contrib.material.admin.options import MaterialTabularInline
 
 
@@ -115,10 +144,12 @@ class FamilyAdmin(RequiresInitModelAdmin, TextAreaToInputMixin, admin.ModelAdmin
 
 
 def generate_participant_table(modeladmin, request, queryset):
-    queryset = queryset.order_by('surname')
-    return render(
-        request, 'col/participant_export.html', context=dict(participants=queryset.all())
+    template_name = 'col/participant_export.html'
+    queryset = project_queryset(
+        queryset.order_by('surname'), get_template_fields(template_name, 'participant')
     )
+    with read_from_replica():
+        return render(request, template_name, context=dict(participants=queryset))
 
 
 generate_participant_table.short_description = "Generate participant PDF"
@@ -126,61 +157,255 @@ generate_participant_table.short_description = "Generate participant PDF"
 
 @register(models.Participant)
 class ParticipantAdmin(
-    RequiresInitModelAdmin, RemoveDeleteActionMixin, TextAreaToInputMixin, admin.ModelAdmin
+    RequiresInitModelAdmin,
+    ColumnProjectionMixin,
+    LazyInlinesMixin,
+    EmptySelectionActionsMixin,
+    RemoveDeleteActionMixin,
+    TextAreaToInputMixin,
+    admin.ModelAdmin,
 ):
     icon_name = 'person_outline'
 
     actions = [generate_participant_table]
+    empty_selection_actions = [generate_participant_table]
     form = ParticipantForm
+    change_form_template = 'admin/membership/participant/change_form.html'
+    # Read from the participant summary, so the list is a single join on the primary key
     list_display = [
-        'full_name',
-        'date_of_birth',
-        'family',
-        'participation_form_filled_on',
+        'get_full_name',
+        'get_age',
+        'get_family_name',
+        'get_tier',
+        'get_is_member',
+        'get_paid',
+        'get_contact_complete',
     ]
+    list_select_related = ['summary']
     area_to_input_field_names = ['name', 'surname']
     list_filter = [EligibleForVoteParticipantFilter, RequiresAttentionFilter]
     inlines = [ContactInfoInline, EmergencyContactInline, HealthInfoInline]
 
+    def get_full_name(self, obj):
+        return obj.full_name
+
+    get_full_name.short_description = 'Full name'
+    get_full_name.admin_order_field = 'summary__surname'
+    get_full_name.projected_fields = ['name', 'surname']
+
+    def get_age(self, obj):
+        return obj.age
+
+    get_age.short_description = 'Age'
+    get_age.admin_order_field = 'summary__date_of_birth'
+    get_age.projected_fields = ['date_of_birth']
+
+    def get_family_name(self, obj):
+        summary = getattr(obj, 'summary', None)
+        return summary and summary.family_name
+
+    get_family_name.short_description = 'Family'
+    get_family_name.admin_order_field = 'summary__family_name'
+    get_family_name.projected_fields = ['summary__family_name']
+
+    def get_tier(self, obj):
+        summary = getattr(obj, 'summary', None)
+        return summary and summary.tier_name
+
+    get_tier.short_description = 'Last tier'
+    get_tier.admin_order_field = 'summary__tier_name'
+    get_tier.projected_fields = ['summary__tier_name']
+
+    def get_is_member(self, obj):
+        summary = getattr(obj, 'summary', None)
+        return bool(summary and summary.is_member)
+
+    get_is_member.short_description = 'Member'
+    get_is_member.boolean = True
+    get_is_member.admin_order_field = 'summary__effective_until'
+    get_is_member.projected_fields = ['summary__effective_from', 'summary__effective_until']
+
+    def get_paid(self, obj):
+        summary = getattr(obj, 'summary', None)
+        return bool(summary and not summary.has_unpaid_memberships)
+
+    get_paid.short_description = 'Paid'
+    get_paid.boolean = True
+    get_paid.admin_order_field = 'summary__has_unpaid_memberships'
+    get_paid.projected_fields = ['summary__has_unpaid_memberships']
+
+    def get_contact_complete(self, obj):
+        summary = getattr(obj, 'summary', None)
+        return bool(summary and summary.contact_complete)
+
+    get_contact_complete.short_description = 'Contact complete'
+    get_contact_complete.boolean = True
+    get_contact_complete.admin_order_field = 'summary__contact_complete'
+    get_contact_complete.projected_fields = ['summary__contact_complete']
+
     def has_delete_permission(self, request, obj=None):
         return False
 
-    def changelist_view(self, request, extra_context=None):
-        try:
-            action_index = int(request.POST.get('index', 0))
-        except ValueError:
-            action_index = 0
+    def get_urls(self):
+        return [
+            path(
+                'import/',
+                self.admin_site.admin_view(self.import_view),
+                name='membership_participant_import',
+            ),
+            path(
+                '<path:object_id>/timeline/',
+                self.admin_site.admin_view(self.timeline_view),
+                name='membership_participant_timeline',
+            ),
+        ] + super().get_urls()
 
-        try:
-            action = request.POST.getlist('action')[action_index]
-        except IndexError:
-            action = None
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
 
-        # If the action is generate_participant_table and no check box has been marked
-        if action == generate_participant_table.__name__ and not request.POST.getlist(
-            helpers.ACTION_CHECKBOX_NAME
-        ):
-            request.POST._mutable = True
-            # Activate to select across pages and avoid PK filter
-            request.POST['select_across'] = True
-            # Add fake data to simulate marked checks
-            request.POST.setlist(helpers.ACTION_CHECKBOX_NAME, [1])
-            request.POST._mutable = False
+        result = None
+        if request.method == 'POST':
+            form = RosterImportForm(request.POST, request.FILES)
+            if form.is_valid():
+                roster = form.cleaned_data['file']
+                result = import_roster(roster, roster.name)
+        else:
+            form = RosterImportForm()
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Import participants',
+            'opts': self.model._meta,
+            'form': form,
+            'columns': ROSTER_COLUMNS,
+            'result': result,
+        }
+
+        return render(request, 'col/import_participants.html', context)
+
+    @read_from_replica()
+    def timeline_view(self, request, object_id):
+        participant = self.get_object(request, object_id)
+        if not participant:
+            raise Http404
+        if not self.has_view_permission(request, participant):
+            raise PermissionDenied
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': f'Membership history of {participant}',
+            'opts': self.model._meta,
+            'original': participant,
+            'timeline': get_timeline(participant),
+        }
+
+        return render(request, 'col/membership_timeline.html', context)
+
+
+def renew_memberships(modeladmin, request, queryset):
+    if request.POST.get('select_across'):
+        # Nothing or everything selected, renew all the expiring memberships
+        queryset = get_expiring(queryset, timezone.now().date())
+
+    plans = plan_renewals(queryset)
+
+    if request.POST.get('post'):
+        renewals = apply_renewals(plans, form_filled=timezone.now().date())
+        modeladmin.message_user(request, f'{len(renewals)} memberships renewed', messages.SUCCESS)
+        return None
 
-        return super().changelist_view(request, extra_context=extra_context)
+    context = {
+        **modeladmin.admin_site.each_context(request),
+        'title': 'Renew memberships',
+        'opts': modeladmin.model._meta,
+        'plans': plans,
+        'renewable_count': sum(1 for plan in plans if not plan.conflict),
+        'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        'action_name': renew_memberships.__name__,
+    }
+    return render(request, 'col/renew_memberships.html', context)
 
 
-class MembershipPaymentInline(MaterialTabularInline):
+renew_memberships.short_description = 'Renew selected (or all expiring) memberships'
+
+
+def record_payments(modeladmin, request, queryset):
+    memberships = {
+        str(membership.pk): membership
+        for membership in queryset.select_related('participant').annotate(
+            already_paid=Coalesce(Sum('payments__amount_paid'), 0)
+        )
+    }
+
+    if request.POST.get('post'):
+        form = forms.BulkPaymentForm(request.POST)
+        formset = forms.MembershipAmountFormSet(request.POST, prefix='amounts')
+        if form.is_valid() and formset.is_valid():
+            amounts = {}
+            for amount_form in formset:
+                membership = memberships.get(str(amount_form.cleaned_data['membership']))
+                if membership:
+                    amounts[membership] = amount_form.cleaned_data['amount_paid']
+
+            payments = create_payments(amounts, **form.cleaned_data)
+            modeladmin.message_user(
+                request, f'{len(payments)} payments recorded', messages.SUCCESS
+            )
+            return None
+    else:
+        form = forms.BulkPaymentForm(initial=dict(paid_on=timezone.now().date()))
+        data = reference_data.data
+        formset = forms.MembershipAmountFormSet(
+            prefix='amounts',
+            initial=[
+                dict(
+                    membership=membership.pk,
+                    amount_paid=data.get_tier(membership.tier_id).base_amount,
+                )
+                for membership in memberships.values()
+            ],
+        )
+
+    context = {
+        **modeladmin.admin_site.each_context(request),
+        'title': 'Record payments',
+        'opts': modeladmin.model._meta,
+        'form': form,
+        'formset': formset,
+        'rows': [
+            (memberships.get(str(amount_form['membership'].value())), amount_form)
+            for amount_form in formset
+        ],
+        'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        'action_name': record_payments.__name__,
+    }
+    return render(request, 'col/record_payments.html', context)
+
+
+record_payments.short_description = 'Record payments of selected memberships'
+
+
+class MembershipPaymentInline(PaginatedInlineMixin, MaterialTabularInline):
     model = models.MembershipPayment
-    formset = RequiredOnceInlineFormSet
+    formset = paginated_inline_formset_builder(10)
+    ordering = ['-id']
     extra = 1
     can_delete = False
 
 
 @register(models.Membership)
-class MembershipAdmin(RequiresInitModelAdmin, AppendOnlyModelAdminMixin, admin.ModelAdmin):
+class MembershipAdmin(
+    RequiresInitModelAdmin,
+    ColumnProjectionMixin,
+    EmptySelectionActionsMixin,
+    AppendOnlyModelAdminMixin,
+    admin.ModelAdmin,
+):
     icon_name = 'card_membership'
 
+    actions = [renew_memberships, record_payments]
+    empty_selection_actions = [renew_memberships]
     form = MembershipForm
     readonly_fields = [
         'tier',
@@ -203,6 +428,12 @@ class MembershipAdmin(RequiresInitModelAdmin, AppendOnlyModelAdminMixin, admin.M
     def get_ordering(self, request):
         return ['-created_at']
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'tier':
+            kwargs['form_class'] = TierChoiceField
+            kwargs['usable_on'] = timezone.now()
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
     def get_exclude(self, request, obj=None):
         exclude = []
         if not obj:
@@ -226,7 +457,27 @@ class MembershipAdmin(RequiresInitModelAdmin, AppendOnlyModelAdminMixin, admin.M
                 'select_participant/',
                 self.admin_site.admin_view(self.select_participant),
                 name='select_participant',
-            )
+            ),
+            path(
+                'statistics/',
+                self.admin_site.admin_view(self.statistics_view),
+                name='membership_statistics',
+            ),
+            path(
+                'revenue/',
+                self.admin_site.admin_view(self.revenue_view),
+                name='membership_revenue',
+            ),
+            path(
+                'retention/',
+                self.admin_site.admin_view(self.retention_view),
+                name='membership_retention',
+            ),
+            path(
+                'reconcile/',
+                self.admin_site.admin_view(self.reconcile_view),
+                name='membership_reconcile',
+            ),
         ] + super().get_urls()
 
     def get_form(self, request, obj=None, change=False, **kwargs):
@@ -291,9 +542,87 @@ class MembershipAdmin(RequiresInitModelAdmin, AppendOnlyModelAdminMixin, admin.M
 
         return render(request, 'col/select_add_membership_participant.html', context)
 
+    @read_from_replica()
+    def statistics_view(self, request):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Membership statistics',
+            'opts': self.model._meta,
+            'statistics': get_membership_statistics(),
+        }
+
+        return render(request, 'col/membership_statistics.html', context)
+
+    @read_from_replica()
+    def revenue_view(self, request):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        try:
+            year = int(request.GET.get('year'))
+        except (TypeError, ValueError):
+            year = timezone.now().year
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': f'Revenue for {year}',
+            'opts': self.model._meta,
+            'report': get_revenue_report(year),
+        }
+
+        return render(request, 'col/revenue_report.html', context)
+
+    @read_from_replica()
+    def retention_view(self, request):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Membership retention',
+            'opts': self.model._meta,
+            'analysis': get_cohorts(),
+        }
+
+        return render(request, 'col/membership_retention.html', context)
+
+    def reconcile_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+
+        if request.method == 'POST' and 'confirm' in request.POST:
+            payments = confirm_proposals(request.POST.getlist('proposal'))
+            self.message_user(
+                request, f'{len(payments)} bank transfers recorded', messages.SUCCESS
+            )
+            return HttpResponseRedirect(reverse('admin:membership_reconcile'))
+
+        reconciliation = None
+        if request.method == 'POST':
+            form = BankStatementForm(request.POST, request.FILES)
+            if form.is_valid():
+                reconciliation = reconcile(form.cleaned_data['file'])
+        else:
+            form = BankStatementForm()
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Bank reconciliation',
+            'opts': self.model._meta,
+            'form': form,
+            'reconciliation': reconciliation,
+        }
+
+        return render(request, 'col/reconcile_payments.html', context)
+
 
 @register(models.Tier)
-class TierAdmin(RequiresInitModelAdmin, TextAreaToInputMixin, admin.ModelAdmin):
+class TierAdmin(
+    RequiresInitModelAdmin, ColumnProjectionMixin, TextAreaToInputMixin, admin.ModelAdmin
+):
     icon_name = 'layers'
 
     list_display = [
@@ -308,8 +637,7 @@ class TierAdmin(RequiresInitModelAdmin, TextAreaToInputMixin, admin.ModelAdmin):
     def get_name(self, obj):
         return f'{obj.name} ({obj.member_type.type_name})'
 
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('member_type')
+    get_name.projected_fields = ['name', 'member_type__type_name']
 
     def get_ordering(self, request):
         return ['name']
@@ -320,7 +648,7 @@ class TierAdmin(RequiresInitModelAdmin, TextAreaToInputMixin, admin.ModelAdmin):
     def get_readonly_fields(self, request, obj=None):
         readonly = ()
         if obj:
-            if models.Membership.objects.filter(tier=obj).exists():
+            if obj.in_use:
                 readonly += (
                     'name',
                     'can_vote',
@@ -348,11 +676,194 @@ class MemberTypeAdmin(RequiresInitModelAdmin, TextAreaToInputMixin, admin.ModelA
         return False
 
     def get_readonly_fields(self, request, obj=None):
-        if obj and models.Membership.objects.filter(tier__member_type=obj).exists():
+        if obj and obj.in_use:
             return ('type_name',) + self.readonly_fields
         return self.readonly_fields
 
 
+def merge_duplicates(modeladmin, request, queryset):
+    merged = 0
+    for candidate_id in queryset.filter(dismissed=False).values_list('id', flat=True):
+        # Merging a previous pair may have deleted this one along with its duplicate
+        candidate = (
+            models.DuplicateCandidate.objects.select_related('participant', 'duplicate')
+            .filter(pk=candidate_id)
+            .first()
+        )
+        if not candidate:
+            continue
+        try:
+            merge_participants(candidate.participant, candidate.duplicate)
+        except ValidationError as e:
+            modeladmin.message_user(
+                request,
+                f'{candidate.duplicate} not merged into {candidate.participant}: '
+                + ' '.join(e.messages),
+                messages.ERROR,
+            )
+        else:
+            merged += 1
+
+    modeladmin.message_user(request, f'{merged} duplicates merged', messages.SUCCESS)
+
+
+merge_duplicates.short_description = 'Merge duplicates into the oldest participant'
+
+
+def dismiss_duplicates(modeladmin, request, queryset):
+    dismissed = queryset.update(dismissed=True)
+    modeladmin.message_user(request, f'{dismissed} candidates dismissed', messages.SUCCESS)
+
+
+dismiss_duplicates.short_description = 'Dismiss, they are different participants'
+
+
+@register(models.DuplicateCandidate)
+class DuplicateCandidateAdmin(RequiresInitModelAdmin, ColumnProjectionMixin, admin.ModelAdmin):
+    icon_name = 'people'
+
+    actions = [merge_duplicates, dismiss_duplicates]
+    list_display = [
+        'participant',
+        'duplicate',
+        'get_score',
+        'same_date_of_birth',
+        'same_email',
+        'same_phone',
+    ]
+    list_filter = ['dismissed']
+    readonly_fields = [
+        'participant',
+        'duplicate',
+        'score',
+        'name_similarity',
+        'surname_similarity',
+        'same_date_of_birth',
+        'same_email',
+        'same_phone',
+        'dismissed',
+    ]
+
+    def get_score(self, obj):
+        return f'{obj.score:.0%}'
+
+    get_score.short_description = 'Score'
+    get_score.admin_order_field = 'score'
+    get_score.projected_fields = ['score']
+
+    def get_ordering(self, request):
+        return ['-score']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('participant', 'duplicate')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@register(models.VoterRoll)
+class VoterRollAdmin(RequiresInitModelAdmin, admin.ModelAdmin):
+    icon_name = 'how_to_vote'
+
+    actions = None
+    fields = ['election_date', 'notes']
+    list_display = ['election_date', 'get_voter_count', 'get_checked_in_count', 'created_at']
+
+    def get_voter_count(self, obj):
+        return obj.voter_count
+
+    get_voter_count.short_description = 'Voters'
+
+    def get_checked_in_count(self, obj):
+        return obj.checked_in_count
+
+    get_checked_in_count.short_description = 'Checked in'
+
+    def get_ordering(self, request):
+        return ['-election_date']
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                voter_count=Count('entries'),
+                checked_in_count=Count('entries', filter=Q(entries__checked_in_at__isnull=False)),
+            )
+        )
+
+    def get_readonly_fields(self, request, obj=None):
+        if obj:
+            # The roll was frozen for this date
+            return ['election_date']
+        return []
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if not change:
+            voters = snapshot_voter_roll(obj)
+            self.message_user(request, f'{voters} eligible participants added to the roll')
+
+    def get_urls(self):
+        return [
+            path(
+                '<path:object_id>/export/',
+                self.admin_site.admin_view(self.export_view),
+                name='membership_voterroll_export',
+            ),
+        ] + super().get_urls()
+
+    def export_view(self, request, object_id):
+        voter_roll = self.get_object(request, object_id)
+        if not voter_roll:
+            raise Http404
+        if not self.has_view_permission(request, voter_roll):
+            raise PermissionDenied
+
+        return StreamingHttpResponse(render_voter_roll(voter_roll))
+
+
+def check_in_voters(modeladmin, request, queryset):
+    checked_in = check_in(queryset)
+    modeladmin.message_user(request, f'{checked_in} voters checked in', messages.SUCCESS)
+
+
+check_in_voters.short_description = 'Check in selected voters'
+
+
+@register(models.VoterRollEntry)
+class VoterRollEntryAdmin(
+    RequiresInitModelAdmin, ColumnProjectionMixin, RemoveDeleteActionMixin, admin.ModelAdmin
+):
+    icon_name = 'assignment_ind'
+
+    actions = [check_in_voters]
+    list_display = ['surname', 'name', 'date_of_birth', 'voter_roll', 'checked_in_at']
+    list_filter = ['voter_roll']
+    list_select_related = ['voter_roll']
+    search_fields = ['surname', 'name']
+    readonly_fields = [
+        'voter_roll',
+        'participant',
+        'name',
+        'surname',
+        'date_of_birth',
+        'checked_in_at',
+    ]
+
+    def get_ordering(self, request):
+        return ['voter_roll', 'surname', 'name']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 @register(models.GeneralSetup)
 class GeneralSetupAdmin(ViewColumnMixin, AppendOnlyModelAdminMixin, admin.ModelAdmin):
     icon_name = 'settings'
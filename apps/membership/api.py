@@ -0,0 +1,94 @@
+import hashlib
+from typing import Dict, List, NamedTuple, Optional
+
+from apps.membership.data_versions import get_read_versions
+from apps.membership.filters import get_eligible_for_vote_ids
+from apps.membership.models import Membership, Participant
+
+API_PAGE_SIZE = 100
+MAX_API_PAGE_SIZE = 1000
+
+PARTICIPANT_FIELDS = (
+    'id',
+    'name',
+    'surname',
+    'date_of_birth',
+    'family_id',
+    'participation_form_filled_on',
+    'created_at',
+    'updated_at',
+)
+MEMBERSHIP_FIELDS = (
+    'id',
+    'participant_id',
+    'tier_id',
+    'effective_from',
+    'effective_until',
+    'form_filled',
+    'paid_on',
+    'created_at',
+    'updated_at',
+)
+
+
+class ApiPage(NamedTuple):
+    rows: List[Dict]
+    cursor: Optional[int]
+
+
+def get_fields(requested, allowed):
+    """
+    Fields of a comma separated `requested` list, or all the `allowed` ones if empty. The id is
+    always returned, as pages are keyed by it.
+    """
+    if not requested:
+        return list(allowed)
+
+    fields = ['id']
+    for field in requested.split(','):
+        field = field.strip()
+        if field not in allowed:
+            raise ValueError(f'Unknown field: {field}')
+        if field not in fields:
+            fields.append(field)
+    return fields
+
+
+def get_etag(families, params):
+    """
+    ETag of a response depending on the data of `families` and on the query `params`, known
+    without querying the data itself. Computed where the response reads its data from, as the
+    replica versions tag what the replica returns.
+    """
+    key = [str(version) for version in get_read_versions(*families)]
+    key.extend(f'{name}={value}' for name, value in sorted(params.items()))
+    return hashlib.sha1('|'.join(key).encode()).hexdigest()
+
+
+def get_page(queryset, fields, cursor=None, limit=API_PAGE_SIZE) -> ApiPage:
+    """
+    Values of `fields` of the rows of `queryset`, which is ordered by id, after the id `cursor`.
+    The cursor of the page is the id to continue from, if there are more rows.
+    """
+    if cursor is not None:
+        queryset = queryset.filter(id__gt=cursor)
+    rows = list(queryset.values(*fields)[: limit + 1])
+    if rows[limit:]:
+        rows = rows[:limit]
+        return ApiPage(rows=rows, cursor=rows[-1]['id'])
+    return ApiPage(rows=rows, cursor=None)
+
+
+def get_participants():
+    return Participant.objects.order_by('id')
+
+
+def get_memberships():
+    return Membership.objects.order_by('id')
+
+
+def get_eligible_participants(date):
+    """
+    Participants who can vote on `date`, as filtered in the admin
+    """
+    return Participant.objects.filter(id__in=get_eligible_for_vote_ids(date)).order_by('id')
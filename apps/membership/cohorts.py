@@ -0,0 +1,103 @@
+from array import array
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date
+from typing import List, NamedTuple
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.membership.data_versions import GENERAL_SETUP_DATA, MEMBERSHIP_DATA, get_read_versions
+from apps.membership.models import GeneralSetup, MembershipPeriod
+from apps.membership.utils import get_month_start
+
+COHORTS_CACHE_KEY = 'membership:cohorts:{membership_version}:{setup_version}:{until}'
+COHORTS_CACHE_TIMEOUT = 86400
+
+
+class Cohort(NamedTuple):
+    month: date
+    size: int
+    renewals: List[date]
+    retained: List[int]
+
+    @property
+    def retention_rates(self):
+        return [retained / self.size for retained in self.retained]
+
+    @property
+    def cells(self):
+        return list(zip(self.renewals, self.retained, self.retention_rates))
+
+
+class CohortAnalysis(NamedTuple):
+    cohorts: List[Cohort]
+
+    @property
+    def max_renewals(self):
+        return max((len(cohort.renewals) for cohort in self.cohorts), default=0)
+
+
+def get_renewals(from_date, until):
+    """
+    Renewal boundaries following `from_date` up to `until`, taking the renewal month from the
+    setup valid on each of them
+    """
+    renewals = []
+    setup = GeneralSetup.get_for_date(from_date)
+    while setup and setup.renewal_month:
+        from_date = setup.get_next_renewal(from_date)
+        if from_date > until:
+            break
+        renewals.append(from_date)
+        setup = GeneralSetup.get_for_date(from_date)
+    return renewals
+
+
+def compute_cohorts(until) -> CohortAnalysis:
+    """
+    Groups the membership chains by the month they started and counts how many of them were still
+    active on each of the following renewals
+    """
+    ends_by_month = defaultdict(lambda: array('l'))
+    for effective_from, effective_until in MembershipPeriod.objects.values_list(
+        'effective_from', 'effective_until'
+    ):
+        ends_by_month[get_month_start(effective_from)].append(effective_until.toordinal())
+
+    cohorts = []
+    for month, ends in sorted(ends_by_month.items()):
+        ends = array('l', sorted(ends))
+        renewals = get_renewals(month, until)
+        cohorts.append(
+            Cohort(
+                month=month,
+                size=len(ends),
+                renewals=renewals,
+                # As in `Membership.is_active_on`, a chain ending on the renewal is not retained
+                retained=[
+                    len(ends) - bisect_right(ends, renewal.toordinal()) for renewal in renewals
+                ],
+            )
+        )
+
+    return CohortAnalysis(cohorts=cohorts)
+
+
+def get_cohorts(until=None) -> CohortAnalysis:
+    """
+    Retention cohorts, cached until any membership or the general setup changes
+    """
+    until = until or timezone.now().date()
+    membership_version, setup_version = get_read_versions(MEMBERSHIP_DATA, GENERAL_SETUP_DATA)
+    key = COHORTS_CACHE_KEY.format(
+        membership_version=membership_version,
+        setup_version=setup_version,
+        until=until.isoformat(),
+    )
+
+    cohorts = cache.get(key)
+    if cohorts is None:
+        cohorts = compute_cohorts(until)
+        cache.set(key, cohorts, timeout=COHORTS_CACHE_TIMEOUT)
+    return cohorts
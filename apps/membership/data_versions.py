@@ -0,0 +1,101 @@
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+
+from common.utils.db import get_read_db
+
+# Families of models whose changes invalidate the same derived data
+PARTICIPANT_DATA = 'participant'
+MEMBERSHIP_DATA = 'membership'
+REFERENCE_DATA = 'reference_data'
+GENERAL_SETUP_DATA = 'general_setup'
+
+VERSION_CACHE_KEY = 'membership:data_version:{family}'
+
+SELECT_VERSIONS_SQL = '''
+    SELECT family, version FROM membership_dataversion WHERE family = ANY(%s)
+'''
+
+STORE_VERSIONS_SQL = '''
+    INSERT INTO membership_dataversion (family, version)
+    SELECT * FROM unnest(%s::text[], %s::bigint[])
+    ON CONFLICT (family) DO UPDATE
+        SET version = GREATEST(membership_dataversion.version, EXCLUDED.version)
+'''
+
+
+def get_cache_key(family):
+    return VERSION_CACHE_KEY.format(family=family)
+
+
+def get_stored_versions(families, using=DEFAULT_DB_ALIAS):
+    with connections[using].cursor() as cursor:
+        cursor.execute(SELECT_VERSIONS_SQL, [list(families)])
+        versions = dict(cursor.fetchall())
+    return {family: versions.get(family, 0) for family in families}
+
+
+def store_versions(versions):
+    with connection.cursor() as cursor:
+        cursor.execute(STORE_VERSIONS_SQL, [list(versions), list(versions.values())])
+
+
+def get_versions(*families):
+    """
+    Current version of each family, read from the cache with a single request. Families missing
+    from the cache, as after a flush, are restored from the database so versions never go back.
+    """
+    keys = [get_cache_key(family) for family in families]
+    cached = cache.get_many(keys)
+    missing = [family for family, key in zip(families, keys) if key not in cached]
+    if missing:
+        for family, version in get_stored_versions(missing).items():
+            cache.add(get_cache_key(family), version, timeout=None)
+        cached.update(cache.get_many([get_cache_key(family) for family in missing]))
+    return tuple(cached[key] for key in keys)
+
+
+def get_version(family):
+    return get_versions(family)[0]
+
+
+def get_read_versions(*families):
+    """
+    Versions of the data seen by the reads of the current block, to cache or tag what is computed
+    from them.
+
+    Within `read_from_replica` they are read from the copy of the versions on the replica, which
+    is stored after the data they version is committed and so lags behind along with it. The
+    versions in the cache include the latest writes to the primary and would tag stale data.
+    """
+    using = get_read_db()
+    if using == DEFAULT_DB_ALIAS:
+        return get_versions(*families)
+    versions = get_stored_versions(families, using=using)
+    return tuple(versions[family] for family in families)
+
+
+def increment_versions(families):
+    versions = {}
+    for family in families:
+        key = get_cache_key(family)
+        try:
+            versions[family] = cache.incr(key)
+        except ValueError:
+            get_versions(family)
+            versions[family] = cache.incr(key)
+    return versions
+
+
+def bump_versions(*families):
+    """
+    Increments the version of the families so anything cached under the previous ones is ignored.
+
+    Inside a transaction they are incremented again once committed, as other workers could cache
+    the previous data under the new versions before the commit. The database copy is only written
+    outside transactions so concurrent writers are not serialized by its rows.
+    """
+    versions = increment_versions(families)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: store_versions(increment_versions(families)))
+    else:
+        store_versions(versions)
@@ -0,0 +1,211 @@
+import re
+import unicodedata
+from collections import defaultdict
+from datetime import date
+from itertools import combinations
+from typing import FrozenSet, NamedTuple
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.membership.data_versions import MEMBERSHIP_DATA, PARTICIPANT_DATA, bump_versions
+from apps.membership.models import (
+    ContactInfo,
+    DuplicateCandidate,
+    EmergencyContact,
+    HealthInfo,
+    Membership,
+    Participant,
+)
+from apps.membership.summaries import refresh_participant_summaries
+
+SURNAME_PREFIX_LENGTH = 4
+# Compare the national part of the phone numbers only, ignoring international prefixes
+PHONE_DIGITS = 9
+MIN_SCORE = 0.6
+
+
+class ParticipantKeys(NamedTuple):
+    id: int
+    date_of_birth: date
+    surname_prefix: str
+    name_trigrams: FrozenSet[str]
+    surname_trigrams: FrozenSet[str]
+    emails: FrozenSet[str]
+    phones: FrozenSet[str]
+
+
+def normalize(text):
+    """
+    Lowercase words of `text` without accents nor punctuation
+    """
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode().lower()
+    return ' '.join(re.findall(r'[a-z0-9]+', text))
+
+
+def get_trigrams(text):
+    """
+    Trigrams of `text` as extracted by pg_trgm, padding each word with two spaces before and one
+    after it
+    """
+    trigrams = set()
+    for word in normalize(text).split():
+        word = f'  {word} '
+        trigrams.update(word[i : i + 3] for i in range(len(word) - 2))
+    return frozenset(trigrams)
+
+
+def trigram_similarity(trigrams, other_trigrams):
+    """
+    Same as pg_trgm's `similarity`: shared trigrams over all the distinct trigrams of both texts
+    """
+    if not trigrams or not other_trigrams:
+        return 0.0
+    return len(trigrams & other_trigrams) / len(trigrams | other_trigrams)
+
+
+def get_participant_keys():
+    emails = defaultdict(set)
+    phones = defaultdict(set)
+    for participant_id, email, phone in ContactInfo.objects.values_list(
+        'participant_id', 'email', 'phone'
+    ):
+        if email:
+            emails[participant_id].add(email.strip().lower())
+        phone = re.sub(r'\D', '', phone or '')[-PHONE_DIGITS:]
+        if phone:
+            phones[participant_id].add(phone)
+
+    return [
+        ParticipantKeys(
+            id=participant_id,
+            date_of_birth=date_of_birth,
+            surname_prefix=normalize(surname).replace(' ', '')[:SURNAME_PREFIX_LENGTH],
+            name_trigrams=get_trigrams(name),
+            surname_trigrams=get_trigrams(surname),
+            emails=frozenset(emails[participant_id]),
+            phones=frozenset(phones[participant_id]),
+        )
+        for participant_id, name, surname, date_of_birth in Participant.objects.order_by(
+            'id'
+        ).values_list('id', 'name', 'surname', 'date_of_birth')
+    ]
+
+
+def get_candidate_pairs(participants):
+    """
+    Pairs of participants sharing their date of birth or the beginning of their surname, instead
+    of every possible pair
+    """
+    blocks = defaultdict(list)
+    for participant in participants:
+        blocks[('date_of_birth', participant.date_of_birth)].append(participant)
+        if participant.surname_prefix:
+            blocks[('surname', participant.surname_prefix)].append(participant)
+
+    pairs = {}
+    for block in blocks.values():
+        # Blocks keep the id order, so the oldest participant always comes first
+        for participant, duplicate in combinations(block, 2):
+            pairs[(participant.id, duplicate.id)] = (participant, duplicate)
+    return [pairs[key] for key in sorted(pairs)]
+
+
+def score_pair(participant, duplicate) -> DuplicateCandidate:
+    name_similarity = trigram_similarity(participant.name_trigrams, duplicate.name_trigrams)
+    surname_similarity = trigram_similarity(
+        participant.surname_trigrams, duplicate.surname_trigrams
+    )
+    same_date_of_birth = participant.date_of_birth == duplicate.date_of_birth
+    same_email = bool(participant.emails & duplicate.emails)
+    same_phone = bool(participant.phones & duplicate.phones)
+
+    return DuplicateCandidate(
+        participant_id=participant.id,
+        duplicate_id=duplicate.id,
+        score=(
+            0.3 * name_similarity
+            + 0.3 * surname_similarity
+            + 0.2 * same_date_of_birth
+            + 0.1 * same_email
+            + 0.1 * same_phone
+        ),
+        name_similarity=name_similarity,
+        surname_similarity=surname_similarity,
+        same_date_of_birth=same_date_of_birth,
+        same_email=same_email,
+        same_phone=same_phone,
+    )
+
+
+@transaction.atomic
+def find_duplicates(min_score=MIN_SCORE) -> int:
+    """
+    Replaces the pending duplicate candidates with the pairs scoring at least `min_score`, keeping
+    the dismissed ones so they are not reviewed again
+    """
+    dismissed = set(
+        DuplicateCandidate.objects.filter(dismissed=True).values_list(
+            'participant_id', 'duplicate_id'
+        )
+    )
+
+    candidates = []
+    for participant, duplicate in get_candidate_pairs(get_participant_keys()):
+        if (participant.id, duplicate.id) in dismissed:
+            continue
+        candidate = score_pair(participant, duplicate)
+        if candidate.score >= min_score:
+            candidates.append(candidate)
+
+    DuplicateCandidate.objects.filter(dismissed=False).delete()
+    DuplicateCandidate.objects.bulk_create(candidates, batch_size=1000)
+    return len(candidates)
+
+
+def get_overlapping_memberships(participant, duplicate):
+    """
+    Pairs of memberships of `participant` and `duplicate` active on the same dates, which a single
+    participant cannot have
+    """
+    memberships = list(Membership.objects.filter(participant=participant))
+    return [
+        (membership, other)
+        for other in Membership.objects.filter(participant=duplicate)
+        for membership in memberships
+        if membership.effective_from < (other.effective_until or date.max)
+        and other.effective_from < (membership.effective_until or date.max)
+    ]
+
+
+@transaction.atomic
+def merge_participants(participant, duplicate):
+    """
+    Moves the memberships, contact, emergency contact and health info of `duplicate` to
+    `participant`, as well as its family if `participant` has none, and deletes `duplicate`.
+
+    Raises `ValidationError` without merging anything if memberships of both overlap.
+    """
+    overlapping = get_overlapping_memberships(participant, duplicate)
+    if overlapping:
+        raise ValidationError(
+            [
+                f'The {membership.effective_from} membership overlaps the '
+                f'{other.effective_from} membership of the duplicate'
+                for membership, other in overlapping
+            ]
+        )
+
+    for model in (Membership, ContactInfo, EmergencyContact, HealthInfo):
+        model.objects.filter(participant=duplicate).update(
+            participant=participant, updated_at=timezone.now()
+        )
+
+    if not participant.family_id and duplicate.family_id:
+        participant.family_id = duplicate.family_id
+        participant.save(update_fields=['family', 'updated_at'])
+
+    duplicate.delete()
+    refresh_participant_summaries([participant.pk])
+    bump_versions(PARTICIPANT_DATA, MEMBERSHIP_DATA)
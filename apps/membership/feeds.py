@@ -0,0 +1,73 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional
+
+from django.apps import apps
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from common.utils.model import Loggable
+
+FEED_PAGE_SIZE = 500
+MAX_FEED_PAGE_SIZE = 5000
+# A transaction still open when a page is read may commit rows older than the ones in the page,
+# so the latest changes are left for the next read
+FEED_LAG = timedelta(seconds=60)
+
+
+class ChangesPage(NamedTuple):
+    rows: List[Dict]
+    cursor: Optional[str]
+    has_more: bool
+
+
+def get_feed_models():
+    return {
+        model._meta.model_name: model
+        for model in apps.get_app_config('membership').get_models()
+        if issubclass(model, Loggable)
+    }
+
+
+def encode_cursor(updated_at, pk):
+    return urlsafe_b64encode(f'{updated_at.isoformat()}|{pk}'.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        updated_at, pk = urlsafe_b64decode(cursor.encode()).decode().split('|')
+        updated_at = parse_datetime(updated_at)
+        pk = int(pk)
+    except (Base64Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f'Invalid cursor: {cursor}')
+    if not isinstance(updated_at, datetime):
+        raise ValueError(f'Invalid cursor: {cursor}')
+    return updated_at, pk
+
+
+def get_changes(model, cursor=None, limit=FEED_PAGE_SIZE) -> ChangesPage:
+    """
+    Rows of `model` created or updated after `cursor`, in (updated_at, id) order so each page is
+    an index range scan. The cursor of the page resumes the feed after its last row.
+    """
+    queryset = model.objects.filter(updated_at__lt=timezone.now() - FEED_LAG).order_by(
+        'updated_at', 'id'
+    )
+    if cursor:
+        updated_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(updated_at__gte=updated_at).exclude(
+            updated_at=updated_at, id__lte=pk
+        )
+
+    fields = [field.attname for field in model._meta.concrete_fields]
+    rows = list(queryset.values(*fields)[: limit + 1])
+    if rows[limit:]:
+        rows = rows[:limit]
+        has_more = True
+    else:
+        has_more = False
+
+    if rows:
+        cursor = encode_cursor(rows[-1]['updated_at'], rows[-1]['id'])
+    return ChangesPage(rows=rows, cursor=cursor, has_more=has_more)
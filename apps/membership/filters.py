@@ -1,13 +1,100 @@
+from array import array
 from datetime import datetime
 
-from django.db.models import DateField, Q
-from django.db.models.expressions import DurationValue, F, Value
+from django.core.cache import cache
+from django.db.models import DateField, OuterRef, Q, Subquery
+from django.db.models.expressions import F, Value
 from django.db.models.functions import Coalesce
 
-from apps.membership.models import GeneralSetup
+from apps.membership.data_versions import (
+    GENERAL_SETUP_DATA,
+    MEMBERSHIP_DATA,
+    PARTICIPANT_DATA,
+    REFERENCE_DATA,
+    get_read_versions,
+)
+from apps.membership.models import GeneralSetupPeriod, Participant
+from common.utils.db import read_from_replica
 from common.utils.filters import OnlyInputFilter
 from contrib.django.postgres.fields import DurationField
 
+# Eligibility depends on the participants, their memberships, whether their tiers can vote and
+# the general setup of the date
+ELIGIBILITY_DATA = (PARTICIPANT_DATA, MEMBERSHIP_DATA, REFERENCE_DATA, GENERAL_SETUP_DATA)
+ELIGIBLE_FOR_VOTE_CACHE_KEY = 'membership:eligible_for_vote:{versions}:{date}'
+ELIGIBLE_FOR_VOTE_CACHE_TIMEOUT = 86400
+
+
+def filter_eligible_for_vote(queryset, date):
+    """
+    Participants of `queryset` who can vote on `date`, ordered by id.
+
+    The rules of the general setup valid on `date` are joined from `GeneralSetupPeriod`, so there
+    are none without a setup.
+    """
+    setup = GeneralSetupPeriod.objects.filter(validity__contains=OuterRef('reference_date'))
+
+    return (
+        (
+            queryset.annotate(reference_date=Value(date, output_field=DateField()))
+            .annotate(
+                min_age=Subquery(
+                    setup.values('minimum_age_to_vote')[:1], output_field=DurationField()
+                ),
+                vote_interval=Subquery(
+                    setup.values('time_to_vote_since_membership')[:1],
+                    output_field=DurationField(),
+                ),
+            )
+            .filter(
+                Q(
+                    reference_date__range=(
+                        F('membership_periods__effective_from') + F('vote_interval'),
+                        Coalesce(
+                            'membership_periods__effective_until',
+                            Value(date.max, output_field=DateField()),
+                            output_field=DateField(),
+                        ),
+                    )
+                ),
+                Q(
+                    reference_date__range=(
+                        F('memberships__effective_from'),
+                        Coalesce(
+                            'memberships__effective_until',
+                            Value(date.max, output_field=DateField()),
+                            output_field=DateField(),
+                        ),
+                    )
+                ),
+                memberships__tier__can_vote=True,
+                reference_date__gte=F('min_age') + F('date_of_birth'),
+            )
+        )
+        .order_by('id', '-membership_periods__effective_from')
+        .distinct('id')
+    )
+
+
+def get_eligible_for_vote_ids(date):
+    """
+    Sorted ids of the participants who can vote on `date`, cached until the data they depend on
+    changes so paging and sorting the eligible participants do not run the whole query again.
+    Read from the replica, and cached under the versions of the data it has.
+    """
+    with read_from_replica():
+        key = ELIGIBLE_FOR_VOTE_CACHE_KEY.format(
+            versions='.'.join(str(version) for version in get_read_versions(*ELIGIBILITY_DATA)),
+            date=date.isoformat(),
+        )
+
+        ids = cache.get(key)
+        if ids is None:
+            eligible = filter_eligible_for_vote(Participant.objects.all(), date)
+            ids = array('l', eligible.values_list('id', flat=True))
+            cache.set(key, ids, timeout=ELIGIBLE_FOR_VOTE_CACHE_TIMEOUT)
+    return ids
+
 
 class EligibleForVoteParticipantFilter(OnlyInputFilter):
     template = 'admin/date_input_filter.html'
@@ -28,51 +115,7 @@ class EligibleForVoteParticipantFilter(OnlyInputFilter):
         except ValueError:
             return queryset.none()
 
-        setup = GeneralSetup.get_for_date(date)
-
-        if not setup:
-            return queryset.none()
-
-        return (
-            (
-                queryset.annotate(
-                    reference_date=Value(date, output_field=DateField()),
-                    min_age=DurationValue(
-                        f"{setup.minimum_age_to_vote} YEARS", output_field=DurationField()
-                    ),
-                    vote_interval=DurationValue(
-                        f'{setup.time_to_vote_since_membership} '
-                        f'{setup.time_unit_to_vote_since_membership.upper()}',
-                        output_field=DurationField(),
-                    ),
-                ).filter(
-                    Q(
-                        reference_date__range=(
-                            F('membership_periods__effective_from') + F('vote_interval'),
-                            Coalesce(
-                                'membership_periods__effective_until',
-                                Value(date.max, output_field=DateField()),
-                                output_field=DateField(),
-                            ),
-                        )
-                    ),
-                    Q(
-                        reference_date__range=(
-                            F('memberships__effective_from'),
-                            Coalesce(
-                                'memberships__effective_until',
-                                Value(date.max, output_field=DateField()),
-                                output_field=DateField(),
-                            ),
-                        )
-                    ),
-                    memberships__tier__can_vote=True,
-                    reference_date__gte=F('min_age') + F('date_of_birth'),
-                )
-            )
-            .order_by('id', '-membership_periods__effective_from')
-            .distinct('id')
-        )
+        return queryset.filter(id__in=get_eligible_for_vote_ids(date))
 
 
 class RequiresAttentionFilter(OnlyInputFilter):
@@ -90,16 +133,5 @@ class RequiresAttentionFilter(OnlyInputFilter):
         if not value:
             return queryset
 
-        return queryset.filter(
-            Q(contact_info=None)
-            | Q(contact_info__address=None)
-            | Q(contact_info__address='')
-            | Q(contact_info__postcode=None)
-            | Q(contact_info__postcode='')
-            | Q(contact_info__phone=None)
-            | Q(contact_info__phone='')
-            | Q(contact_info__email=None)
-            | Q(contact_info__email='')
-            | Q(emergency_contacts=None)
-            | Q(memberships__paid_on=None)
-        )
+        # Missing or incomplete contact info, no emergency contacts or unpaid memberships
+        return queryset.filter(summary__requires_attention=True)
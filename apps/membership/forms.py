@@ -2,8 +2,20 @@ from datetime import datetime, timezone
 
 from django import forms
 from django.core.exceptions import ValidationError
+from django.forms.fields import Field
 
 from apps.membership import models
+from apps.membership.constants import PaymentMethod
+from apps.membership.formsets import ADULT_REQUIRED_CONTACT_FIELDS
+from apps.membership.reference_data import reference_data
+
+UNDER_AGED_WITHOUT_ADULT_ERROR = (
+    'An under aged participant must belong to a family with at least one adult participant'
+)
+UNDER_AGED_WITHOUT_FAMILY_ERROR = (
+    'An under aged participant must belong to a family, '
+    'and the family must have at least one adult participant'
+)
 
 
 class GeneralSetupForm(forms.ModelForm):
@@ -50,15 +62,9 @@ class ParticipantForm(forms.ModelForm):
                     if not participant.is_under_aged:
                         break
                 else:
-                    errors['family'] = (
-                        'An under aged participant must belong to a family '
-                        'with at least one adult participant'
-                    )
+                    errors['family'] = UNDER_AGED_WITHOUT_ADULT_ERROR
             else:
-                errors['family'] = (
-                    'An under aged participant must belong to a family, '
-                    'and the family must have at least one adult participant'
-                )
+                errors['family'] = UNDER_AGED_WITHOUT_FAMILY_ERROR
 
         if errors:
             raise ValidationError(errors)
@@ -66,6 +72,39 @@ class ParticipantForm(forms.ModelForm):
         return self.cleaned_data
 
 
+class TierChoiceField(forms.ModelChoiceField):
+    """
+    Tier choice field resolved through the reference data registry instead of the database.
+
+    Only the tiers usable on `usable_on` are displayed, but any existing tier is accepted so the
+    form can explain why it cannot be used.
+    """
+
+    def __init__(self, queryset, *, usable_on=None, **kwargs):
+        self.usable_on = usable_on
+        super().__init__(queryset, **kwargs)
+
+    def _get_choices(self):
+        if hasattr(self, '_choices'):
+            return self._choices
+
+        tiers = reference_data.get_usable_tiers(self.usable_on or datetime.now(timezone.utc))
+        choices = [(tier.id, str(tier)) for tier in tiers]
+        if self.empty_label is not None:
+            choices.insert(0, ('', self.empty_label))
+        return choices
+
+    choices = property(_get_choices, forms.ChoiceField._set_choices)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            return reference_data.get_tier(int(value)).to_model()
+        except (ValueError, TypeError, models.Tier.DoesNotExist):
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+
+
 class MembershipForm(forms.ModelForm):
     def clean(self):
         super().clean()
@@ -83,3 +122,94 @@ class MembershipForm(forms.ModelForm):
 
 class AddMembershipForm(forms.Form):
     participant = forms.ModelChoiceField(queryset=models.Participant.objects.all(), required=True)
+
+
+class BulkPaymentForm(forms.Form):
+    payment_method = forms.ChoiceField(choices=PaymentMethod.choices())
+    paid_on = forms.DateField()
+
+
+class MembershipAmountForm(forms.Form):
+    membership = forms.IntegerField(widget=forms.HiddenInput)
+    amount_paid = forms.IntegerField(min_value=0)
+
+
+MembershipAmountFormSet = forms.formset_factory(MembershipAmountForm, extra=0)
+
+
+class BankStatementForm(forms.Form):
+    file = forms.FileField(
+        help_text='CSV bank statement with date, amount, payer and reference columns'
+    )
+
+
+class RosterImportForm(forms.Form):
+    file = forms.FileField(help_text='CSV or XLSX file with a header row')
+
+
+class RosterRowForm(forms.Form):
+    """
+    A participant with its contact, emergency contact and health info, as a row of an imported
+    roster. Follows the rules of `ParticipantForm` and `ContactInfoInlineFormset`, except for the
+    families having an adult, which depends on the rest of the roster.
+
+    `family_id` joins an existing family, while rows with the same `family_name` and no
+    `family_id` form a new family.
+    """
+
+    name = forms.CharField()
+    surname = forms.CharField()
+    date_of_birth = forms.DateField()
+    participation_form_filled_on = forms.DateField()
+    family_name = forms.CharField(required=False)
+    family_id = forms.IntegerField(min_value=1, required=False)
+    address = forms.CharField(required=False)
+    postcode = forms.CharField(required=False)
+    phone = forms.CharField(required=False)
+    email = forms.EmailField(required=False)
+    emergency_contact_name = forms.CharField(required=False)
+    emergency_contact_phone = forms.CharField(required=False)
+    emergency_contact_relation = forms.CharField(required=False)
+    height = forms.IntegerField(min_value=0, required=False)
+    weight = forms.IntegerField(min_value=0, required=False)
+    health_info = forms.CharField(required=False)
+
+    def clean(self):
+        super().clean()
+        errors = dict()
+
+        if self.cleaned_data.get('date_of_birth'):
+            self.cleaned_data['is_under_aged'] = models.Participant(
+                date_of_birth=self.cleaned_data['date_of_birth']
+            ).is_under_aged
+            if self.cleaned_data['is_under_aged']:
+                if not self.cleaned_data.get('family_name') and not self.cleaned_data.get(
+                    'family_id'
+                ):
+                    errors['family_name'] = UNDER_AGED_WITHOUT_FAMILY_ERROR
+            else:
+                # Empty cells cannot be told apart from missing values
+                for field_name in ADULT_REQUIRED_CONTACT_FIELDS:
+                    if field_name not in self.errors and not self.cleaned_data.get(field_name):
+                        errors[field_name] = Field.default_error_messages['required']
+
+        emergency_contact_fields = (
+            'emergency_contact_name',
+            'emergency_contact_phone',
+            'emergency_contact_relation',
+        )
+        if any(self.cleaned_data.get(field_name) for field_name in emergency_contact_fields):
+            for field_name in emergency_contact_fields:
+                if field_name not in self.errors and not self.cleaned_data.get(field_name):
+                    errors[field_name] = Field.default_error_messages['required']
+
+        if (
+            self.cleaned_data.get('weight') is not None or self.cleaned_data.get('health_info')
+        ) and self.cleaned_data.get('height') is None:
+            if 'height' not in self.errors:
+                errors['height'] = Field.default_error_messages['required']
+
+        if errors:
+            raise ValidationError(errors)
+
+        return self.cleaned_data
@@ -3,6 +3,8 @@ from django.forms.fields import Field
 
 from common.utils.form import RequiredOnceInlineFormSet
 
+ADULT_REQUIRED_CONTACT_FIELDS = ('address', 'postcode', 'phone', 'email')
+
 
 class ContactInfoInlineFormset(RequiredOnceInlineFormSet):
     def clean(self):
@@ -13,13 +15,8 @@ class ContactInfoInlineFormset(RequiredOnceInlineFormSet):
             if form.cleaned_data and not form.cleaned_data.get('DELETE'):
                 if not self.instance.is_under_aged:
                     errors = dict()
-                    for field_name, value in (
-                        ('address', form.cleaned_data.get('address')),
-                        ('postcode', form.cleaned_data.get('postcode')),
-                        ('phone', form.cleaned_data.get('phone')),
-                        ('email', form.cleaned_data.get('email')),
-                    ):
-                        if value is None:
+                    for field_name in ADULT_REQUIRED_CONTACT_FIELDS:
+                        if form.cleaned_data.get(field_name) is None:
                             errors[field_name] = Field.default_error_messages['required']
 
                     if errors:
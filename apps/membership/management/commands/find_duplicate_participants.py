@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.membership.duplicates import MIN_SCORE, find_duplicates
+
+
+class Command(BaseCommand):
+    help = 'Finds the participants that may be duplicated and leaves them for review'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-score', type=float, default=MIN_SCORE)
+
+    def handle(self, *args, **options):
+        found = find_duplicates(min_score=options['min_score'])
+        self.stdout.write(self.style.SUCCESS(f'{found} duplicate candidates to review'))
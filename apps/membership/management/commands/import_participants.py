@@ -0,0 +1,33 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from apps.membership.roster import IMPORT_CHUNK_SIZE, import_roster
+
+
+class Command(BaseCommand):
+    help = 'Imports the participants of a CSV or XLSX roster, reporting the rows with errors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        with open(options['path'], 'rb') as roster:
+            result = import_roster(
+                roster,
+                options['path'],
+                workers=options['workers'],
+                chunk_size=options['chunk_size'],
+            )
+
+        for error in result.errors:
+            for field, messages in error.errors.items():
+                self.stderr.write(f'Row {error.row_number}, {field}: {" ".join(messages)}')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{result.imported} participants and {result.families_created} families imported, '
+                f'{len(result.errors)} rows with errors'
+            )
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.membership.summaries import rebuild_participant_summaries
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the participant summaries shown in the participant list'
+
+    def handle(self, *args, **options):
+        rebuild_participant_summaries()
+        self.stdout.write(self.style.SUCCESS('Participant summaries rebuilt'))
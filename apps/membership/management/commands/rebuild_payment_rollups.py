@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.membership.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the membership and payment rollups used by the revenue reports'
+
+    def handle(self, *args, **options):
+        rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS('Payment rollups rebuilt'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from apps.membership.reminders import send_renewal_reminders
+
+
+class Command(BaseCommand):
+    help = 'Emails the participants whose membership expires within the given number of days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30)
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        result = send_renewal_reminders(
+            options['days'], batch_size=options['batch_size'], dry_run=options['dry_run']
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{result.sent} reminders {"to send" if options["dry_run"] else "sent"}, '
+                f'{result.without_email} memberships without contact email'
+            )
+        )
@@ -0,0 +1,35 @@
+# Generated by Django 2.2.9 on 2026-10-19 09:12
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [('membership', '0001_initial')]
+
+    operations = [
+        migrations.AddField(
+            model_name='membertype',
+            name='membership_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tier',
+            name='membership_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(
+            sql=[
+                '''UPDATE membership_tier AS t
+                   SET membership_count = (
+                       SELECT COUNT(*) FROM membership_membership AS m WHERE m.tier_id = t.id
+                   )''',
+                '''UPDATE membership_membertype AS mt
+                   SET membership_count = (
+                       SELECT COALESCE(SUM(t.membership_count), 0)
+                       FROM membership_tier AS t
+                       WHERE t.member_type_id = mt.id
+                   )''',
+            ],
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 2.2.9 on 2026-10-19 11:07
+import django.db.models.deletion
+from django.db import migrations, models
+
+from apps.membership.constants import PaymentMethod
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [('membership', '0002_membership_count')]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentRollup',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name='ID'
+                    ),
+                ),
+                ('month', models.DateField()),
+                ('payment_method', models.TextField(choices=PaymentMethod.choices())),
+                ('amount_paid', models.IntegerField(default=0)),
+                ('payment_count', models.IntegerField(default=0)),
+                (
+                    'tier',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name='payment_rollups',
+                        to='membership.Tier',
+                    ),
+                ),
+            ],
+            options={'unique_together': {('month', 'tier', 'payment_method')}},
+        ),
+        migrations.CreateModel(
+            name='MembershipRollup',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name='ID'
+                    ),
+                ),
+                ('month', models.DateField()),
+                ('membership_count', models.IntegerField(default=0)),
+                ('expected_amount', models.IntegerField(default=0)),
+                (
+                    'tier',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name='membership_rollups',
+                        to='membership.Tier',
+                    ),
+                ),
+            ],
+            options={'unique_together': {('month', 'tier')}},
+        ),
+        migrations.RunSQL(
+            sql=[
+                '''INSERT INTO membership_membershiprollup
+                       (month, tier_id, membership_count, expected_amount)
+                   SELECT
+                       date_trunc('month', m.effective_from)::date,
+                       m.tier_id,
+                       COUNT(*),
+                       SUM(t.base_amount)
+                   FROM membership_membership AS m
+                       JOIN membership_tier AS t ON m.tier_id = t.id
+                   GROUP BY 1, 2''',
+                '''INSERT INTO membership_paymentrollup
+                       (month, tier_id, payment_method, amount_paid, payment_count)
+                   SELECT
+                       date_trunc('month', m.effective_from)::date,
+                       m.tier_id,
+                       p.payment_method,
+                       SUM(p.amount_paid),
+                       COUNT(*)
+                   FROM membership_membershippayment AS p
+                       JOIN membership_membership AS m ON p.membership_id = m.id
+                   GROUP BY 1, 2, 3''',
+            ],
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
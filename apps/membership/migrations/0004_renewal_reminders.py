@@ -0,0 +1,37 @@
+# Generated by Django 2.2.9 on 2026-10-19 11:09
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [('membership', '0003_rollups')]
+
+    operations = [
+        migrations.AlterField(
+            model_name='membership',
+            name='effective_until',
+            field=models.DateField(blank=True, db_index=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='RenewalReminder',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name='ID'
+                    ),
+                ),
+                ('email', models.EmailField(max_length=254)),
+                ('sent_at', models.DateTimeField(auto_now_add=True)),
+                (
+                    'membership',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name='renewal_reminder',
+                        to='membership.Membership',
+                    ),
+                ),
+            ],
+        ),
+    ]
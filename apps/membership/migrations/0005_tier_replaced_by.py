@@ -0,0 +1,23 @@
+# Generated by Django 2.2.9 on 2026-10-19 11:10
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [('membership', '0004_renewal_reminders')]
+
+    operations = [
+        migrations.AddField(
+            model_name='tier',
+            name='replaced_by',
+            field=models.ForeignKey(
+                blank=True,
+                help_text='Tier to renew memberships into once this one is no longer usable',
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name='replaces',
+                to='membership.Tier',
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 2.2.9 on 2026-10-19 11:21
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [('membership', '0005_tier_replaced_by')]
+
+    operations = [
+        migrations.CreateModel(
+            name='DuplicateCandidate',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name='ID'
+                    ),
+                ),
+                ('score', models.FloatField(db_index=True)),
+                ('name_similarity', models.FloatField()),
+                ('surname_similarity', models.FloatField()),
+                ('same_date_of_birth', models.BooleanField()),
+                ('same_email', models.BooleanField()),
+                ('same_phone', models.BooleanField()),
+                ('dismissed', models.BooleanField(default=False)),
+                (
+                    'duplicate',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='+',
+                        to='membership.Participant',
+                    ),
+                ),
+                (
+                    'participant',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='duplicate_candidates',
+                        to='membership.Participant',
+                    ),
+                ),
+            ],
+            options={'unique_together': {('participant', 'duplicate')}},
+        ),
+    ]
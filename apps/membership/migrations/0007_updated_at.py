@@ -0,0 +1,89 @@
+# Generated by Django 2.2.9 on 2026-10-19 11:25
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [('membership', '0006_duplicate_candidates')]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactinfo', name='updated_at', field=models.DateTimeField(auto_now=True)
+        ),
+        migrations.AddField(
+            model_name='emergencycontact',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='family', name='updated_at', field=models.DateTimeField(auto_now=True)
+        ),
+        migrations.AddField(
+            model_name='generalsetup', name='updated_at', field=models.DateTimeField(auto_now=True)
+        ),
+        migrations.AddField(
+            model_name='healthinfo', name='updated_at', field=models.DateTimeField(auto_now=True)
+        ),
+        migrations.AddField(
+            model_name='membership', name='updated_at', field=models.DateTimeField(auto_now=True)
+        ),
+        migrations.AddField(
+            model_name='membertype', name='updated_at', field=models.DateTimeField(auto_now=True)
+        ),
+        migrations.AddField(
+            model_name='participant', name='updated_at', field=models.DateTimeField(auto_now=True)
+        ),
+        migrations.AddField(
+            model_name='tier', name='updated_at', field=models.DateTimeField(auto_now=True)
+        ),
+        migrations.RunSQL(
+            sql=[
+                'UPDATE membership_contactinfo SET updated_at = created_at',
+                'UPDATE membership_emergencycontact SET updated_at = created_at',
+                'UPDATE membership_family SET updated_at = created_at',
+                'UPDATE membership_generalsetup SET updated_at = created_at',
+                'UPDATE membership_healthinfo SET updated_at = created_at',
+                'UPDATE membership_membership SET updated_at = created_at',
+                'UPDATE membership_membertype SET updated_at = created_at',
+                'UPDATE membership_participant SET updated_at = created_at',
+                'UPDATE membership_tier SET updated_at = created_at',
+            ],
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='contactinfo',
+            index=models.Index(fields=['updated_at', 'id'], name='membership__updated_c5eb94_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emergencycontact',
+            index=models.Index(fields=['updated_at', 'id'], name='membership__updated_e2c2bc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='family',
+            index=models.Index(fields=['updated_at', 'id'], name='membership__updated_7d4d07_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generalsetup',
+            index=models.Index(fields=['updated_at', 'id'], name='membership__updated_1fb5da_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='healthinfo',
+            index=models.Index(fields=['updated_at', 'id'], name='membership__updated_ab3d23_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='membership',
+            index=models.Index(fields=['updated_at', 'id'], name='membership__updated_fbb7bc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='membertype',
+            index=models.Index(fields=['updated_at', 'id'], name='membership__updated_974bf8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='participant',
+            index=models.Index(fields=['updated_at', 'id'], name='membership__updated_292a8a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tier',
+            index=models.Index(fields=['updated_at', 'id'], name='membership__updated_8734a1_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.9 on 2026-10-19 11:32
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [('membership', '0007_updated_at')]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('family', models.TextField(primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        )
+    ]
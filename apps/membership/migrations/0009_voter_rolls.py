@@ -0,0 +1,73 @@
+# Generated by Django 2.2.9 on 2026-10-19 11:35
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [('membership', '0008_data_versions')]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoterRoll',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name='ID'
+                    ),
+                ),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('election_date', models.DateField(unique=True)),
+                ('notes', models.TextField(blank=True, null=True)),
+            ],
+            options={'abstract': False},
+        ),
+        migrations.CreateModel(
+            name='VoterRollEntry',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name='ID'
+                    ),
+                ),
+                ('name', models.TextField()),
+                ('surname', models.TextField()),
+                ('date_of_birth', models.DateField()),
+                ('checked_in_at', models.DateTimeField(blank=True, null=True)),
+                (
+                    'participant',
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name='voter_roll_entries',
+                        to='membership.Participant',
+                    ),
+                ),
+                (
+                    'voter_roll',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='entries',
+                        to='membership.VoterRoll',
+                    ),
+                ),
+            ],
+            options={'verbose_name_plural': 'voter roll entries'},
+        ),
+        migrations.AddIndex(
+            model_name='voterroll',
+            index=models.Index(fields=['updated_at', 'id'], name='membership__updated_917bd5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voterrollentry',
+            index=models.Index(
+                fields=['voter_roll', 'surname', 'name'], name='membership__voter_r_4deecc_idx'
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name='voterrollentry', unique_together={('voter_roll', 'participant')}
+        ),
+    ]
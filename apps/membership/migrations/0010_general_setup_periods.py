@@ -0,0 +1,61 @@
+# Generated by Django 2.2.9 on 2026-10-19 11:37
+import django.contrib.postgres.fields.ranges
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [('membership', '0009_voter_rolls')]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeneralSetupPeriod',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name='ID'
+                    ),
+                ),
+                ('valid_from', models.DateField()),
+                ('valid_until', models.DateField(null=True)),
+                ('validity', django.contrib.postgres.fields.ranges.DateRangeField()),
+                ('minimum_age_to_vote', models.DurationField()),
+                ('time_to_vote_since_membership', models.DurationField()),
+            ],
+            options={'db_table': 'membership_generalsetupperiod', 'managed': False},
+        ),
+        migrations.RunSQL(
+            sql=[
+                '''
+                CREATE MATERIALIZED VIEW membership_generalsetupperiod AS
+                SELECT
+                    s.id,
+                    s.id AS general_setup_id,
+                    s.valid_from,
+                    s.valid_until,
+                    daterange(s.valid_from, s.valid_until) AS validity,
+                    make_interval(years => s.minimum_age_to_vote) AS minimum_age_to_vote,
+                    (
+                        s.time_to_vote_since_membership || ' '
+                        || s.time_unit_to_vote_since_membership
+                    )::interval AS time_to_vote_since_membership
+                FROM (
+                    SELECT
+                        *,
+                        LEAD(valid_from) OVER (ORDER BY valid_from, id) AS valid_until
+                    FROM membership_generalsetup
+                ) AS s
+                ''',
+                '''
+                CREATE UNIQUE INDEX membership_generalsetupperiod_id
+                ON membership_generalsetupperiod (id)
+                ''',
+                '''
+                CREATE INDEX membership_generalsetupperiod_validity
+                ON membership_generalsetupperiod USING gist (validity)
+                ''',
+            ],
+            reverse_sql='DROP MATERIALIZED VIEW IF EXISTS membership_generalsetupperiod',
+        ),
+    ]
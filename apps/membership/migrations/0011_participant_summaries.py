@@ -0,0 +1,139 @@
+# Generated by Django 2.2.9 on 2026-10-19 11:40
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [('membership', '0010_general_setup_periods')]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParticipantSummary',
+            fields=[
+                (
+                    'participant',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name='summary',
+                        serialize=False,
+                        to='membership.Participant',
+                    ),
+                ),
+                ('name', models.TextField()),
+                ('surname', models.TextField()),
+                ('date_of_birth', models.DateField()),
+                ('family_name', models.TextField(null=True)),
+                ('tier_name', models.TextField(null=True)),
+                ('effective_from', models.DateField(null=True)),
+                ('effective_until', models.DateField(null=True)),
+                ('paid_on', models.DateField(null=True)),
+                ('has_unpaid_memberships', models.BooleanField()),
+                ('contact_complete', models.BooleanField()),
+                ('requires_attention', models.BooleanField()),
+                (
+                    'tier',
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name='+',
+                        to='membership.Tier',
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='participantsummary',
+            index=models.Index(fields=['surname', 'name'], name='membership__surname_a9f6e9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='participantsummary',
+            index=models.Index(fields=['date_of_birth'], name='membership__date_of_ff3de7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='participantsummary',
+            index=models.Index(fields=['family_name'], name='membership__family__a27071_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='participantsummary',
+            index=models.Index(fields=['effective_until'], name='membership__effecti_06e61d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='participantsummary',
+            index=models.Index(
+                fields=['requires_attention'], name='membership__require_aaba76_idx'
+            ),
+        ),
+        migrations.RunSQL(
+            sql=[
+                '''INSERT INTO membership_participantsummary (
+                       participant_id,
+                       name,
+                       surname,
+                       date_of_birth,
+                       family_name,
+                       tier_id,
+                       tier_name,
+                       effective_from,
+                       effective_until,
+                       paid_on,
+                       has_unpaid_memberships,
+                       contact_complete,
+                       requires_attention
+                   )
+                   SELECT
+                       p.id,
+                       p.name,
+                       p.surname,
+                       p.date_of_birth,
+                       f.family_name,
+                       m.tier_id,
+                       t.name,
+                       m.effective_from,
+                       m.effective_until,
+                       m.paid_on,
+                       u.has_unpaid_memberships,
+                       c.contact_complete,
+                       NOT c.contact_complete OR m.id IS NULL OR u.has_unpaid_memberships
+                   FROM membership_participant AS p
+                       LEFT JOIN membership_family AS f ON f.id = p.family_id
+                       LEFT JOIN LATERAL (
+                           SELECT id, tier_id, effective_from, effective_until, paid_on
+                           FROM membership_membership
+                           WHERE participant_id = p.id
+                           ORDER BY effective_from DESC, id DESC
+                           LIMIT 1
+                       ) AS m ON TRUE
+                       LEFT JOIN membership_tier AS t ON t.id = m.tier_id
+                       CROSS JOIN LATERAL (
+                           SELECT EXISTS (
+                               SELECT 1 FROM membership_membership
+                               WHERE participant_id = p.id AND paid_on IS NULL
+                           ) AS has_unpaid_memberships
+                       ) AS u
+                       CROSS JOIN LATERAL (
+                           SELECT
+                               EXISTS (
+                                   SELECT 1 FROM membership_contactinfo
+                                   WHERE participant_id = p.id
+                               )
+                               AND NOT EXISTS (
+                                   SELECT 1 FROM membership_contactinfo
+                                   WHERE participant_id = p.id
+                                       AND (
+                                           COALESCE(address, '') = ''
+                                           OR COALESCE(postcode, '') = ''
+                                           OR COALESCE(phone, '') = ''
+                                           OR COALESCE(email, '') = ''
+                                       )
+                               )
+                               AND EXISTS (
+                                   SELECT 1 FROM membership_emergencycontact
+                                   WHERE participant_id = p.id
+                               ) AS contact_complete
+                       ) AS c'''
+            ],
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
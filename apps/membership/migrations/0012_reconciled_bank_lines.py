@@ -0,0 +1,32 @@
+# Generated by Django 2.2.9 on 2026-10-19 12:09
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [('membership', '0011_participant_summaries')]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReconciledBankLine',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name='ID'
+                    ),
+                ),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('recorded_at', models.DateTimeField(auto_now_add=True)),
+                (
+                    'payment',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='bank_line',
+                        to='membership.MembershipPayment',
+                    ),
+                ),
+            ],
+        )
+    ]
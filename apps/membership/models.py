@@ -1,15 +1,20 @@
+from collections import Counter, defaultdict
 from datetime import date, datetime
 
 from dateutil.relativedelta import relativedelta
 from dateutil.rrule import YEARLY, rrule
+from django.contrib.postgres.fields import DateRangeField
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import connection, models
+from django.db.models import F
 from django.utils import timezone
 from django.utils.dates import MONTHS
 from memoize import memoize
 
 from apps.membership.constants import PaymentMethod, TimeUnit
-from common.utils.model import Loggable
+from apps.membership.reference_data import reference_data
+from apps.membership.utils import get_month_start
+from common.utils.model import Loggable, increment_rows
 
 
 class GeneralSetup(Loggable, models.Model):
@@ -91,7 +96,7 @@ class GeneralSetup(Loggable, models.Model):
 
 
 class Family(Loggable, models.Model):
-    class Meta:
+    class Meta(Loggable.Meta):
         verbose_name_plural = 'families'
 
     family_name = models.TextField()
@@ -159,6 +164,12 @@ class EmergencyContact(Loggable, models.Model):
 class MemberType(Loggable, models.Model):
     type_name = models.TextField()
     notes = models.TextField(null=True, blank=True)
+    # Denormalized from Membership.save to avoid querying memberships to know if it is in use
+    membership_count = models.PositiveIntegerField(default=0, editable=False)
+
+    @property
+    def in_use(self):
+        return self.membership_count > 0
 
     def __str__(self):
         return self.type_name
@@ -172,6 +183,20 @@ class Tier(Loggable, models.Model):
     can_vote = models.BooleanField()
     needs_renewal = models.BooleanField()
     base_amount = models.PositiveIntegerField()
+    replaced_by = models.ForeignKey(
+        'Tier',
+        null=True,
+        blank=True,
+        on_delete=models.PROTECT,
+        related_name='replaces',
+        help_text='Tier to renew memberships into once this one is no longer usable',
+    )
+    # Denormalized from Membership.save to avoid querying memberships to know if it is in use
+    membership_count = models.PositiveIntegerField(default=0, editable=False)
+
+    @property
+    def in_use(self):
+        return self.membership_count > 0
 
     def is_usable_for(self, ref_date):
         if isinstance(ref_date, datetime):
@@ -188,7 +213,7 @@ class Membership(Loggable, models.Model):
     )
     tier = models.ForeignKey(Tier, on_delete=models.PROTECT, related_name='memberships')
     effective_from = models.DateField()
-    effective_until = models.DateField(null=True, blank=True)
+    effective_until = models.DateField(null=True, blank=True, db_index=True)
     form_filled = models.DateField()
     paid_on = models.DateField(null=True, blank=True)
     group_first_membership = models.ForeignKey(
@@ -214,6 +239,7 @@ class Membership(Loggable, models.Model):
         return '{} membership for {}'.format(self.effective_from, self.participant)
 
     def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
+        adding = self._state.adding
         if self.effective_from and not self.effective_until:
             try:
                 last_membership = (
@@ -241,7 +267,7 @@ class Membership(Loggable, models.Model):
                         last_membership.group_first_membership or last_membership
                     )
 
-            if self.tier.needs_renewal:
+            if reference_data.get_tier(self.tier_id).needs_renewal:
                 self.effective_until = GeneralSetup.get_for_date(
                     self.effective_from
                 ).get_next_renewal(self.effective_from) - relativedelta(days=1)
@@ -253,12 +279,287 @@ class Membership(Loggable, models.Model):
             update_fields=update_fields,
         )
 
+        if adding:
+            self.record_created([self], using=using)
+
+    @staticmethod
+    def record_created(memberships, using=None):
+        """
+        Keeps the denormalized membership counts and the membership rollups up to date
+        """
+        tier_counts = Counter(membership.tier_id for membership in memberships)
+        for tier_id, count in tier_counts.items():
+            Tier.objects.using(using).filter(pk=tier_id).update(
+                membership_count=F('membership_count') + count, updated_at=timezone.now()
+            )
+            MemberType.objects.using(using).filter(tiers=tier_id).update(
+                membership_count=F('membership_count') + count, updated_at=timezone.now()
+            )
+
+        data = reference_data.data
+        deltas = defaultdict(lambda: [0, 0])
+        for membership in memberships:
+            key = (get_month_start(membership.effective_from), membership.tier_id)
+            deltas[key][0] += 1
+            deltas[key][1] += data.get_tier(membership.tier_id).base_amount
+        MembershipRollup.increment(deltas, using=using)
+
 
 class MembershipPayment(models.Model):
     membership = models.ForeignKey(Membership, on_delete=models.PROTECT, related_name='payments')
     amount_paid = models.PositiveIntegerField()
     payment_method = models.TextField(choices=PaymentMethod.choices())
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Keep the stored values to know what to take out of the rollups when they change
+        instance._rollup_values = instance.get_rollup_values()
+        return instance
+
+    def get_rollup_values(self):
+        return self.payment_method, self.amount_paid
+
+    def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
+        if self._state.adding:
+            previous_values = None
+        elif hasattr(self, '_rollup_values'):
+            previous_values = self._rollup_values
+        else:
+            previous_values = (
+                type(self)
+                .objects.filter(pk=self.pk)
+                .values_list('payment_method', 'amount_paid')
+                .first()
+            )
+
+        super().save(
+            force_insert=force_insert,
+            force_update=force_update,
+            using=using,
+            update_fields=update_fields,
+        )
+
+        self.record_changes([(self, previous_values)], using=using)
+        self._rollup_values = self.get_rollup_values()
+
+    def delete(self, using=None, keep_parents=False):
+        previous_values = getattr(self, '_rollup_values', self.get_rollup_values())
+        result = super().delete(using=using, keep_parents=keep_parents)
+        self.record_changes([(self, previous_values)], using=using, deleted=True)
+        return result
+
+    @staticmethod
+    def record_changes(changes, using=None, deleted=False):
+        """
+        Applies to the payment rollups the difference between the previous values of the payments
+        (`None` for new payments) and their current ones
+        """
+        deltas = defaultdict(lambda: [0, 0])
+        for payment, previous_values in changes:
+            month = get_month_start(payment.membership.effective_from)
+            tier_id = payment.membership.tier_id
+            if previous_values:
+                payment_method, amount_paid = previous_values
+                deltas[(month, tier_id, payment_method)][0] -= amount_paid
+                deltas[(month, tier_id, payment_method)][1] -= 1
+            if not deleted:
+                deltas[(month, tier_id, payment.payment_method)][0] += payment.amount_paid
+                deltas[(month, tier_id, payment.payment_method)][1] += 1
+
+        PaymentRollup.increment(
+            {key: values for key, values in deltas.items() if any(values)}, using=using
+        )
+
+
+class MembershipRollup(models.Model):
+    """
+    Number of memberships and amount expected from them by the month they start and tier.
+
+    Maintained by `Membership.record_created` and rebuilt with `rebuild_payment_rollups`.
+    """
+
+    month = models.DateField()
+    tier = models.ForeignKey(Tier, on_delete=models.PROTECT, related_name='membership_rollups')
+    membership_count = models.IntegerField(default=0)
+    expected_amount = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = [('month', 'tier')]
+
+    @classmethod
+    def increment(cls, deltas, using=None):
+        increment_rows(
+            cls, ('month', 'tier'), ('membership_count', 'expected_amount'), deltas, using=using
+        )
+
+
+class PaymentRollup(models.Model):
+    """
+    Amount paid by the month the membership starts, tier and payment method.
+
+    Maintained by `MembershipPayment.record_changes` and rebuilt with `rebuild_payment_rollups`.
+    """
+
+    month = models.DateField()
+    tier = models.ForeignKey(Tier, on_delete=models.PROTECT, related_name='payment_rollups')
+    payment_method = models.TextField(choices=PaymentMethod.choices())
+    # Signed, as the rows proposed by the upserts that take payments out carry negative values
+    amount_paid = models.IntegerField(default=0)
+    payment_count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = [('month', 'tier', 'payment_method')]
+
+    @classmethod
+    def increment(cls, deltas, using=None):
+        increment_rows(
+            cls,
+            ('month', 'tier', 'payment_method'),
+            ('amount_paid', 'payment_count'),
+            deltas,
+            using=using,
+        )
+
+
+class RenewalReminder(models.Model):
+    """
+    Log of the renewal reminders sent, so a membership is only reminded once
+    """
+
+    membership = models.OneToOneField(
+        Membership, on_delete=models.PROTECT, related_name='renewal_reminder'
+    )
+    email = models.EmailField()
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+
+class ReconciledBankLine(models.Model):
+    """
+    Log of the bank statement lines recorded as payments, so uploading a statement again does not
+    record them twice
+    """
+
+    key = models.CharField(max_length=64, unique=True)
+    payment = models.OneToOneField(
+        MembershipPayment, on_delete=models.CASCADE, related_name='bank_line'
+    )
+    recorded_at = models.DateTimeField(auto_now_add=True)
+
+
+class DuplicateCandidate(models.Model):
+    """
+    Pair of participants that may be the same person, found by `find_duplicate_participants` and
+    pending review. `participant` is always the oldest of the two.
+    """
+
+    participant = models.ForeignKey(
+        Participant, on_delete=models.CASCADE, related_name='duplicate_candidates'
+    )
+    duplicate = models.ForeignKey(Participant, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField(db_index=True)
+    name_similarity = models.FloatField()
+    surname_similarity = models.FloatField()
+    same_date_of_birth = models.BooleanField()
+    same_email = models.BooleanField()
+    same_phone = models.BooleanField()
+    dismissed = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = [('participant', 'duplicate')]
+
+    def __str__(self):
+        return f'{self.participant} / {self.duplicate}'
+
+
+class ParticipantSummary(models.Model):
+    """
+    Denormalized details of a participant for the changelist, with its last membership. Kept up to
+    date from the write paths by `refresh_participant_summaries`.
+    """
+
+    participant = models.OneToOneField(
+        Participant, primary_key=True, on_delete=models.CASCADE, related_name='summary'
+    )
+    name = models.TextField()
+    surname = models.TextField()
+    date_of_birth = models.DateField()
+    family_name = models.TextField(null=True)
+    tier = models.ForeignKey(Tier, null=True, on_delete=models.SET_NULL, related_name='+')
+    tier_name = models.TextField(null=True)
+    effective_from = models.DateField(null=True)
+    effective_until = models.DateField(null=True)
+    paid_on = models.DateField(null=True)
+    has_unpaid_memberships = models.BooleanField()
+    contact_complete = models.BooleanField()
+    requires_attention = models.BooleanField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['surname', 'name']),
+            models.Index(fields=['date_of_birth']),
+            models.Index(fields=['family_name']),
+            models.Index(fields=['effective_until']),
+            models.Index(fields=['requires_attention']),
+        ]
+
+    def __str__(self):
+        return f'{self.name} {self.surname}'
+
+    @property
+    def is_member(self):
+        return bool(self.effective_from) and (
+            self.effective_from <= timezone.now().date() < (self.effective_until or date.max)
+        )
+
+
+class VoterRoll(Loggable, models.Model):
+    """
+    Participants eligible for vote on `election_date`, frozen when the roll is created so it does
+    not change if their data does
+    """
+
+    election_date = models.DateField(unique=True)
+    notes = models.TextField(null=True, blank=True)
+
+    def __str__(self):
+        return f'Voter roll on {self.election_date:%d/%m/%Y}'
+
+
+class VoterRollEntry(models.Model):
+    voter_roll = models.ForeignKey(VoterRoll, on_delete=models.CASCADE, related_name='entries')
+    # Kept if the participant is deleted or merged, the entry holds a copy of their details
+    participant = models.ForeignKey(
+        Participant,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='voter_roll_entries',
+    )
+    name = models.TextField()
+    surname = models.TextField()
+    date_of_birth = models.DateField()
+    checked_in_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = [('voter_roll', 'participant')]
+        indexes = [models.Index(fields=['voter_roll', 'surname', 'name'])]
+        verbose_name_plural = 'voter roll entries'
+
+    def __str__(self):
+        return f'{self.name} {self.surname}'
+
+
+class DataVersion(models.Model):
+    """
+    Last version of each data family, to restore them if they are missing from the cache
+    """
+
+    family = models.TextField(primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.family}: {self.version}'
+
 
 class MembershipPeriod(models.Model):
     id = models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')
@@ -271,3 +572,31 @@ class MembershipPeriod(models.Model):
     class Meta:
         managed = False
         db_table = 'membership_membershipperiod'
+
+
+class GeneralSetupPeriod(models.Model):
+    """
+    Each general setup along with the range of dates it applies to and its rules as intervals, so
+    queries can join the setup of any date. `valid_until` is exclusive and null for the last one.
+
+    Materialized view indexed by `validity`, refreshed whenever a general setup is saved.
+    """
+
+    id = models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')
+    general_setup = models.OneToOneField(
+        GeneralSetup, on_delete=models.DO_NOTHING, related_name='period'
+    )
+    valid_from = models.DateField()
+    valid_until = models.DateField(null=True)
+    validity = DateRangeField()
+    minimum_age_to_vote = models.DurationField()
+    time_to_vote_since_membership = models.DurationField()
+
+    class Meta:
+        managed = False
+        db_table = 'membership_generalsetupperiod'
+
+    @classmethod
+    def refresh(cls):
+        with connection.cursor() as cursor:
+            cursor.execute(f'REFRESH MATERIALIZED VIEW {cls._meta.db_table}')
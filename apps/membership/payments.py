@@ -0,0 +1,49 @@
+from typing import List
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.membership.data_versions import MEMBERSHIP_DATA, bump_versions
+from apps.membership.models import Membership, MembershipPayment
+from apps.membership.summaries import refresh_participant_summaries
+
+
+@transaction.atomic
+def save_payments(payments, payment_method) -> List[MembershipPayment]:
+    """
+    Records each of the `(membership, amount, paid_on)` payments and marks the memberships not
+    paid yet as paid on the date of their first payment, in a handful of queries regardless of the
+    number of payments
+    """
+    payments = [payment for payment in payments if payment[1]]
+    created = MembershipPayment.objects.bulk_create(
+        [
+            MembershipPayment(
+                membership=membership, amount_paid=amount, payment_method=payment_method
+            )
+            for membership, amount, _ in payments
+        ]
+    )
+    # bulk_create skips MembershipPayment.save
+    MembershipPayment.record_changes([(payment, None) for payment in created])
+
+    unpaid = {}
+    for membership, _, paid_on in payments:
+        if not membership.paid_on and membership.pk not in unpaid:
+            membership.paid_on = paid_on
+            membership.updated_at = timezone.now()
+            unpaid[membership.pk] = membership
+    Membership.objects.bulk_update(unpaid.values(), ['paid_on', 'updated_at'])
+    refresh_participant_summaries({membership.participant_id for membership in unpaid.values()})
+
+    bump_versions(MEMBERSHIP_DATA)
+    return created
+
+
+def create_payments(amounts, payment_method, paid_on) -> List[MembershipPayment]:
+    """
+    Records a payment of each `{membership: amount}`, all of them paid on `paid_on`
+    """
+    return save_payments(
+        [(membership, amount, paid_on) for membership, amount in amounts.items()], payment_method
+    )
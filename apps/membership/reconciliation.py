@@ -0,0 +1,283 @@
+import csv
+import hashlib
+import io
+import re
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import List, NamedTuple, Optional
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import Coalesce
+
+from apps.membership.constants import PaymentMethod
+from apps.membership.duplicates import get_trigrams, normalize
+from apps.membership.models import Membership, ReconciledBankLine
+from apps.membership.payments import save_payments
+
+EXACT_CONFIDENCE = 1.0
+# The payer is known but not the amount, as when paying in instalments, so it is not confirmed by
+# default
+NAME_CONFIDENCE = 0.6
+# The amount is known, scaled by the share of the name of the participant found in the line
+FUZZY_CONFIDENCE = 0.8
+MIN_FUZZY_CONFIDENCE = 0.5
+CONFIRMED_BY_DEFAULT_CONFIDENCE = 0.8
+
+# An optional sign, the whole part with or without thousands separators, and the decimal part
+AMOUNT_PATTERN = re.compile(
+    r'(?P<sign>[-+]?)'
+    r'(?P<whole>\d{1,3}(?:(?P<thousands>[.,])\d{3}(?:(?P=thousands)\d{3})*)?|\d+)'
+    r'(?:(?P<decimal>[.,])(?P<fraction>\d{1,2}))?'
+)
+
+AMOUNT_COLUMNS = ('amount', 'importe')
+DATE_COLUMNS = ('date', 'fecha', 'value date')
+PAYER_COLUMNS = ('payer', 'ordenante', 'name')
+REFERENCE_COLUMNS = ('reference', 'concepto', 'description')
+
+
+class BankLine(NamedTuple):
+    line_number: int
+    date: date
+    amount: int
+    payer: str
+    reference: str
+    # Number of identical lines before this one in the statement
+    occurrence: int = 0
+
+    @property
+    def key(self):
+        """
+        Identifies the line across uploads of the statements that include it
+        """
+        values = [self.date.isoformat(), self.amount, self.payer, self.reference, self.occurrence]
+        return hashlib.sha256('|'.join(map(str, values)).encode()).hexdigest()
+
+    @property
+    def keys(self):
+        keys = [normalize(self.payer), normalize(self.reference)]
+        return [key for i, key in enumerate(keys) if key and key not in keys[:i]]
+
+
+class Proposal(NamedTuple):
+    line: BankLine
+    membership: Membership
+    confidence: float
+
+    @property
+    def confirmed_by_default(self):
+        return self.confidence >= CONFIRMED_BY_DEFAULT_CONFIDENCE
+
+    @property
+    def value(self):
+        return (
+            f'{self.membership.pk}:{self.line.amount}:{self.line.date.isoformat()}:{self.line.key}'
+        )
+
+
+class Reconciliation(NamedTuple):
+    proposals: List[Proposal]
+    unmatched: List[BankLine]
+    # Lines recorded from a previous upload of the statement
+    recorded: List[BankLine]
+    errors: List[str]
+
+
+def get_column(row, names):
+    for name in names:
+        if row.get(name):
+            return row[name].strip()
+    return ''
+
+
+def parse_amount(value):
+    """
+    Whole amount of a bank statement amount. The last dot or comma is the decimal separator if
+    followed by one or two digits, and the others separate the thousands. Raises `ValueError` for
+    any other format, as `1,234,56`.
+    """
+    match = AMOUNT_PATTERN.fullmatch(value.replace(' ', ''))
+    if not match or (match['thousands'] and match['thousands'] == match['decimal']):
+        raise ValueError(f'Ambiguous or invalid amount: {value}')
+
+    whole = match['whole'].replace(match['thousands'] or ',', '')
+    amount = Decimal(f'{match["sign"]}{whole}.{match["fraction"] or 0}')
+    return int(amount.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def read_statement(file):
+    """
+    Parses the credit lines of a bank statement CSV, returning them along with the lines that could
+    not be parsed
+    """
+    content = file.read().decode('utf-8-sig')
+    try:
+        dialect = csv.Sniffer().sniff(content[:4096], delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(io.StringIO(content), dialect=dialect)
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+
+    date_field = forms.DateField()
+    occurrences = Counter()
+    lines = []
+    errors = []
+    for row in reader:
+        try:
+            line = BankLine(
+                line_number=reader.line_num,
+                date=date_field.clean(get_column(row, DATE_COLUMNS)),
+                amount=parse_amount(get_column(row, AMOUNT_COLUMNS)),
+                payer=get_column(row, PAYER_COLUMNS),
+                reference=get_column(row, REFERENCE_COLUMNS),
+            )
+        except (ValidationError, ValueError, InvalidOperation):
+            errors.append(f'Line {reader.line_num}: the date or the amount are not valid')
+            continue
+        if line.amount > 0:
+            identity = (line.date, line.amount, line.payer, line.reference)
+            lines.append(line._replace(occurrence=occurrences[identity]))
+            occurrences[identity] += 1
+    return lines, errors
+
+
+def get_open_memberships(start, end):
+    """
+    Memberships effective at some point between `start` and `end`, both included, paid below their
+    tier base amount, with the amount still due as `outstanding`
+    """
+    return (
+        Membership.objects.select_related('participant')
+        .filter(
+            Q(effective_until__isnull=True) | Q(effective_until__gt=start), effective_from__lte=end
+        )
+        .annotate(outstanding=F('tier__base_amount') - Coalesce(Sum('payments__amount_paid'), 0))
+        .filter(outstanding__gt=0)
+        .order_by('effective_from', 'id')
+    )
+
+
+class MembershipIndex:
+    """
+    Open memberships hashed by the amount due and by the normalized name of the participant,
+    keeping track of what remains due as the lines are matched
+    """
+
+    def __init__(self, memberships):
+        self.by_amount = defaultdict(list)
+        self.by_name = defaultdict(list)
+        self.trigrams = {}
+        self.remaining = {}
+        for membership in memberships:
+            participant = membership.participant
+            self.remaining[membership.pk] = membership.outstanding
+            self.by_amount[membership.outstanding].append(membership)
+            for name in (
+                f'{participant.name} {participant.surname}',
+                f'{participant.surname} {participant.name}',
+            ):
+                self.by_name[normalize(name)].append(membership)
+            self.trigrams[membership.pk] = get_trigrams(participant.full_name)
+
+    def match(self, line) -> Optional[Proposal]:
+        proposal = self.find(line)
+        if proposal:
+            self.remaining[proposal.membership.pk] -= line.amount
+        return proposal
+
+    def find(self, line) -> Optional[Proposal]:
+        # A line paying more than what remains due is not proposed, as it would be recorded as an
+        # overpayment
+        by_name = [
+            membership
+            for key in line.keys
+            for membership in self.by_name[key]
+            if self.remaining[membership.pk] >= line.amount
+        ]
+        for membership in by_name:
+            if self.remaining[membership.pk] == line.amount:
+                return Proposal(line, membership, EXACT_CONFIDENCE)
+        if by_name:
+            return Proposal(line, by_name[0], NAME_CONFIDENCE)
+
+        # Fall back to the memberships due the same amount whose participant name is the most
+        # similar to the payer and reference of the line
+        line_trigrams = get_trigrams(f'{line.payer} {line.reference}')
+        best = None
+        for membership in self.by_amount[line.amount]:
+            name_trigrams = self.trigrams[membership.pk]
+            if self.remaining[membership.pk] != line.amount or not name_trigrams:
+                continue
+            # Share of the name found in the line, which usually has other words too
+            confidence = len(name_trigrams & line_trigrams) / len(name_trigrams)
+            if confidence >= MIN_FUZZY_CONFIDENCE and (not best or confidence > best.confidence):
+                best = Proposal(line, membership, round(confidence * FUZZY_CONFIDENCE, 2))
+        return best
+
+
+def reconcile(file) -> Reconciliation:
+    """
+    Proposes the open membership each credit line of a bank statement not recorded yet pays,
+    querying the open memberships effective in the dates of the statement once
+    """
+    lines, errors = read_statement(file)
+    recorded_keys = set(
+        ReconciledBankLine.objects.filter(key__in=[line.key for line in lines]).values_list(
+            'key', flat=True
+        )
+    )
+    dates = [line.date for line in lines]
+    index = MembershipIndex(get_open_memberships(min(dates), max(dates)) if lines else [])
+
+    proposals = []
+    unmatched = []
+    recorded = []
+    for line in lines:
+        if line.key in recorded_keys:
+            recorded.append(line)
+            continue
+        proposal = index.match(line)
+        if proposal:
+            proposals.append(proposal)
+        else:
+            unmatched.append(line)
+
+    return Reconciliation(
+        proposals=proposals, unmatched=unmatched, recorded=recorded, errors=errors
+    )
+
+
+@transaction.atomic
+def confirm_proposals(values):
+    """
+    Records as bank transfers the proposals confirmed, given as their `Proposal.value`, skipping
+    the lines already recorded
+    """
+    payments = {}
+    for value in values:
+        try:
+            membership_id, amount, paid_on, key = value.split(':')
+            paid_on = datetime.strptime(paid_on, '%Y-%m-%d').date()
+            payments[key] = (int(membership_id), int(amount), paid_on)
+        except ValueError:
+            continue
+    for key in ReconciledBankLine.objects.filter(key__in=payments).values_list('key', flat=True):
+        del payments[key]
+
+    memberships = Membership.objects.in_bulk(
+        {membership_id for membership_id, _, _ in payments.values()}
+    )
+    payments = {
+        key: (memberships[membership_id], amount, paid_on)
+        for key, (membership_id, amount, paid_on) in payments.items()
+        if membership_id in memberships and amount > 0
+    }
+    created = save_payments(payments.values(), PaymentMethod.PAYMENT_METHOD_TRANSFER.name)
+    ReconciledBankLine.objects.bulk_create(
+        [ReconciledBankLine(key=key, payment=payment) for key, payment in zip(payments, created)]
+    )
+    return created
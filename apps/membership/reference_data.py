@@ -0,0 +1,205 @@
+from bisect import bisect_right
+from datetime import date, datetime
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from django.db import DEFAULT_DB_ALIAS
+
+from apps.membership.data_versions import REFERENCE_DATA, bump_versions, get_version
+
+
+class MemberTypeRecord(NamedTuple):
+    id: int
+    type_name: str
+    notes: Optional[str]
+
+    def __str__(self):
+        return self.type_name
+
+
+class TierRecord(NamedTuple):
+    id: int
+    name: str
+    usable_from: date
+    usable_until: Optional[date]
+    member_type_id: int
+    can_vote: bool
+    needs_renewal: bool
+    base_amount: int
+    replaced_by_id: Optional[int]
+
+    def is_usable_for(self, ref_date):
+        if isinstance(ref_date, datetime):
+            ref_date = ref_date.date()
+        return self.usable_from <= ref_date < (self.usable_until or date.max)
+
+    def to_model(self):
+        """
+        Builds an equivalent Tier instance without querying the database
+        """
+        from apps.membership.models import Tier
+
+        tier = Tier(**self._asdict())
+        tier._state.adding = False
+        return tier
+
+    def __str__(self):
+        return '{} ({} - {})'.format(self.name, self.usable_from, self.usable_until or 'forever')
+
+
+class UsableTierIndex:
+    """
+    Interval index over the `usable_from`/`usable_until` ranges of the tiers.
+
+    The range boundaries split time into segments within which the usable tiers do not change,
+    so the tiers usable on a date are found with a single bisection.
+    """
+
+    def __init__(self, tiers):
+        self.boundaries = sorted(
+            {tier.usable_from for tier in tiers}
+            | {tier.usable_until for tier in tiers if tier.usable_until}
+        )
+        self.segments = [
+            tuple(tier for tier in tiers if tier.is_usable_for(boundary))
+            for boundary in self.boundaries
+        ]
+
+    def get_usable(self, ref_date) -> Tuple[TierRecord, ...]:
+        if isinstance(ref_date, datetime):
+            ref_date = ref_date.date()
+        index = bisect_right(self.boundaries, ref_date) - 1
+        if index < 0:
+            return ()
+        return self.segments[index]
+
+
+class ReferenceData:
+    """
+    Snapshot of the Tier and MemberType tables at `version`.
+
+    Operations looking up many rows resolve it once from the registry and use it for all of them,
+    so the version is only checked once.
+    """
+
+    def __init__(self, version, tiers, member_types):
+        self.version = version
+        self.tiers: Dict[int, TierRecord] = {tier.id: tier for tier in tiers}
+        self.member_types: Dict[int, MemberTypeRecord] = {
+            member_type.id: member_type for member_type in member_types
+        }
+        self.usable_tiers = UsableTierIndex(sorted(tiers, key=lambda tier: tier.name))
+        # Missing rows already looked for by reloading at this version
+        self.retried = set()
+
+    def get_tier(self, tier_id) -> TierRecord:
+        try:
+            return self.tiers[tier_id]
+        except KeyError:
+            from apps.membership.models import Tier
+
+            raise Tier.DoesNotExist(f'Tier matching id {tier_id} does not exist.')
+
+    def get_member_type(self, member_type_id) -> MemberTypeRecord:
+        try:
+            return self.member_types[member_type_id]
+        except KeyError:
+            from apps.membership.models import MemberType
+
+            raise MemberType.DoesNotExist(
+                f'MemberType matching id {member_type_id} does not exist.'
+            )
+
+    def get_usable_tiers(self, ref_date) -> Tuple[TierRecord, ...]:
+        return self.usable_tiers.get_usable(ref_date)
+
+    def get_usable_replacement(self, tier_id, ref_date) -> Optional[TierRecord]:
+        """
+        Follows the `replaced_by` chain of the tier until finding one usable on `ref_date`
+        """
+        seen = set()
+        while tier_id is not None and tier_id not in seen:
+            seen.add(tier_id)
+            tier = self.get_tier(tier_id)
+            if tier.is_usable_for(ref_date):
+                return tier
+            tier_id = tier.replaced_by_id
+        return None
+
+
+class ReferenceDataRegistry:
+    """
+    Process-local copy of the Tier and MemberType tables.
+
+    All the rows are loaded at once and kept until the version stored in the shared cache changes,
+    which happens whenever a Tier or MemberType is saved in any worker. Every access to `data`
+    checks that version, so loops should resolve it once instead of calling the getters per row.
+    """
+
+    def __init__(self):
+        self._data = None
+
+    def load(self, version):
+        from apps.membership.models import MemberType, Tier
+
+        # From the primary even within `read_from_replica`, as `version` includes its writes
+        self._data = ReferenceData(
+            version,
+            [
+                TierRecord(**values)
+                for values in Tier.objects.using(DEFAULT_DB_ALIAS).values(*TierRecord._fields)
+            ],
+            [
+                MemberTypeRecord(**values)
+                for values in MemberType.objects.using(DEFAULT_DB_ALIAS).values(
+                    *MemberTypeRecord._fields
+                )
+            ],
+        )
+        return self._data
+
+    @property
+    def data(self) -> ReferenceData:
+        version = get_version(REFERENCE_DATA)
+        if self._data is None or self._data.version != version:
+            return self.load(version)
+        return self._data
+
+    def reload_missing(self, data, key):
+        """
+        Reloads the data once per missing row and version, as the row may have been created after
+        loading. Unknown ids, as stale ones posted by a form, do not reload it every time.
+        """
+        if key in data.retried:
+            return data
+        retried = data.retried | {key}
+        data = self.load(data.version)
+        data.retried = retried
+        return data
+
+    def get_tier(self, tier_id) -> TierRecord:
+        data = self.data
+        if tier_id not in data.tiers:
+            data = self.reload_missing(data, ('tier', tier_id))
+        return data.get_tier(tier_id)
+
+    def get_member_type(self, member_type_id) -> MemberTypeRecord:
+        data = self.data
+        if member_type_id not in data.member_types:
+            data = self.reload_missing(data, ('member_type', member_type_id))
+        return data.get_member_type(member_type_id)
+
+    def get_usable_tiers(self, ref_date) -> Tuple[TierRecord, ...]:
+        return self.data.get_usable_tiers(ref_date)
+
+    def get_usable_replacement(self, tier_id, ref_date) -> Optional[TierRecord]:
+        return self.data.get_usable_replacement(tier_id, ref_date)
+
+    def clear(self):
+        self._data = None
+
+    def invalidate(self):
+        bump_versions(REFERENCE_DATA)
+        self.clear()
+
+
+reference_data = ReferenceDataRegistry()
@@ -0,0 +1,97 @@
+from datetime import timedelta
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from apps.membership.models import ContactInfo, Membership, RenewalReminder
+from apps.membership.renewals import exclude_renewed
+
+
+class ReminderResult(NamedTuple):
+    sent: int
+    without_email: int
+
+
+def get_memberships_to_remind(days, today=None):
+    """
+    Memberships of renewable tiers expiring in the next `days` days which have neither been
+    renewed nor reminded yet
+    """
+    today = today or timezone.now().date()
+    return exclude_renewed(
+        Membership.objects.filter(
+            effective_until__range=(today, today + timedelta(days=days)),
+            tier__needs_renewal=True,
+            renewal_reminder=None,
+        )
+    ).order_by('effective_until', 'id')
+
+
+def get_emails(participant_ids):
+    """
+    Latest non-empty contact email of each participant, in a single query
+    """
+    return dict(
+        ContactInfo.objects.filter(participant_id__in=participant_ids)
+        .exclude(email='')
+        .order_by('participant_id', '-created_at')
+        .distinct('participant_id')
+        .values_list('participant_id', 'email')
+    )
+
+
+def build_reminder(membership, email):
+    context = dict(membership=membership, participant=membership.participant)
+    return EmailMessage(
+        subject=render_to_string('col/email/renewal_reminder_subject.txt', context).strip(),
+        body=render_to_string('col/email/renewal_reminder_body.txt', context),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[email],
+    )
+
+
+def send_renewal_reminders(days, batch_size=100, dry_run=False, today=None) -> ReminderResult:
+    """
+    Emails the participants whose membership is about to expire, in batches sent through a single
+    connection of the configured email backend
+    """
+    memberships_to_remind = get_memberships_to_remind(days, today=today)
+    membership_ids = list(memberships_to_remind.values_list('id', flat=True))
+    sent = without_email = 0
+
+    connection = get_connection()
+    connection.open()
+    try:
+        for start in range(0, len(membership_ids), batch_size):
+            memberships = (
+                Membership.objects.filter(id__in=membership_ids[start : start + batch_size])
+                .select_related('participant')
+                .order_by('effective_until', 'id')
+            )
+            emails = get_emails([membership.participant_id for membership in memberships])
+
+            messages = []
+            reminders = []
+            for membership in memberships:
+                email = emails.get(membership.participant_id)
+                if not email:
+                    without_email += 1
+                    continue
+                messages.append(build_reminder(membership, email))
+                reminders.append(RenewalReminder(membership=membership, email=email))
+
+            if dry_run or not messages:
+                sent += len(messages)
+                continue
+
+            connection.send_messages(messages)
+            # Logged once sent, so a failing batch is retried on the next run
+            RenewalReminder.objects.bulk_create(reminders)
+            sent += len(messages)
+    finally:
+        connection.close()
+
+    return ReminderResult(sent=sent, without_email=without_email)
@@ -0,0 +1,148 @@
+from collections import defaultdict
+from datetime import date
+from typing import List, NamedTuple, Optional
+
+from dateutil.relativedelta import relativedelta
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from apps.membership.data_versions import MEMBERSHIP_DATA, bump_versions
+from apps.membership.models import GeneralSetup, Membership
+from apps.membership.reference_data import ReferenceData, TierRecord, reference_data
+from apps.membership.summaries import refresh_participant_summaries
+
+
+class RenewalPlan(NamedTuple):
+    membership: Membership
+    current_tier: Optional[TierRecord] = None
+    tier: Optional[TierRecord] = None
+    effective_from: Optional[date] = None
+    effective_until: Optional[date] = None
+    conflict: Optional[str] = None
+
+
+def exclude_renewed(memberships):
+    """
+    Leaves out the memberships followed by a later one of the same participant
+    """
+    return memberships.annotate(
+        is_renewed=Exists(
+            Membership.objects.filter(
+                participant_id=OuterRef('participant_id'),
+                effective_from__gt=OuterRef('effective_from'),
+            )
+        )
+    ).filter(is_renewed=False)
+
+
+def get_expiring(memberships, today):
+    """
+    Current memberships of renewable tiers that have not been renewed yet
+    """
+    return exclude_renewed(
+        memberships.filter(
+            tier__needs_renewal=True, effective_from__lte=today, effective_until__gte=today
+        )
+    )
+
+
+def plan_renewal(membership, later_memberships, data: ReferenceData) -> RenewalPlan:
+    current_tier = data.get_tier(membership.tier_id)
+    if not current_tier.needs_renewal or not membership.effective_until:
+        return RenewalPlan(
+            membership, current_tier=current_tier, conflict='The membership does not need renewal'
+        )
+
+    if later_memberships:
+        return RenewalPlan(
+            membership,
+            current_tier=current_tier,
+            conflict='The participant already has a later membership',
+        )
+
+    effective_from = membership.effective_until + relativedelta(days=1)
+    tier = data.get_usable_replacement(membership.tier_id, effective_from)
+    if not tier:
+        return RenewalPlan(
+            membership,
+            current_tier=current_tier,
+            effective_from=effective_from,
+            conflict=f'{current_tier} is not usable on {effective_from} and has no replacement',
+        )
+
+    effective_until = None
+    if tier.needs_renewal:
+        setup = GeneralSetup.get_for_date(effective_from)
+        if not setup:
+            return RenewalPlan(
+                membership,
+                current_tier=current_tier,
+                tier=tier,
+                effective_from=effective_from,
+                conflict=f'There is no general setup for {effective_from}',
+            )
+        effective_until = setup.get_next_renewal(effective_from) - relativedelta(days=1)
+
+    return RenewalPlan(
+        membership,
+        current_tier=current_tier,
+        tier=tier,
+        effective_from=effective_from,
+        effective_until=effective_until,
+    )
+
+
+def plan_renewals(memberships) -> List[RenewalPlan]:
+    """
+    Works out the membership that would follow each of `memberships`, or why it cannot be renewed
+    """
+    memberships = list(memberships.select_related('participant').order_by('effective_from'))
+
+    # All the memberships of the participants involved, in a single query
+    start_dates = defaultdict(list)
+    for participant_id, effective_from in Membership.objects.filter(
+        participant_id__in={membership.participant_id for membership in memberships}
+    ).values_list('participant_id', 'effective_from'):
+        start_dates[participant_id].append(effective_from)
+
+    data = reference_data.data
+    return [
+        plan_renewal(
+            membership,
+            [
+                effective_from
+                for effective_from in start_dates[membership.participant_id]
+                if effective_from > membership.effective_from
+            ],
+            data,
+        )
+        for membership in memberships
+    ]
+
+
+@transaction.atomic
+def apply_renewals(plans, form_filled) -> List[Membership]:
+    """
+    Creates the memberships of the plans without conflicts
+    """
+    renewals = Membership.objects.bulk_create(
+        [
+            Membership(
+                participant_id=plan.membership.participant_id,
+                tier_id=plan.tier.id,
+                effective_from=plan.effective_from,
+                effective_until=plan.effective_until,
+                form_filled=form_filled,
+                group_first_membership_id=(
+                    plan.membership.group_first_membership_id or plan.membership.pk
+                ),
+            )
+            for plan in plans
+            if not plan.conflict
+        ]
+    )
+    # bulk_create skips Membership.save and the signals
+    Membership.record_created(renewals)
+    refresh_participant_summaries({membership.participant_id for membership in renewals})
+    bump_versions(MEMBERSHIP_DATA)
+    return renewals
@@ -0,0 +1,123 @@
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, NamedTuple
+
+from django.db import connection, transaction
+from django.db.models import Sum
+
+from apps.membership.constants import PaymentMethod
+from apps.membership.models import MembershipRollup, PaymentRollup
+from apps.membership.reference_data import reference_data
+
+REBUILD_MEMBERSHIP_ROLLUP_SQL = '''
+    INSERT INTO membership_membershiprollup (month, tier_id, membership_count, expected_amount)
+    SELECT
+        date_trunc('month', m.effective_from)::date,
+        m.tier_id,
+        COUNT(*),
+        SUM(t.base_amount)
+    FROM membership_membership AS m
+        JOIN membership_tier AS t ON m.tier_id = t.id
+    GROUP BY 1, 2
+'''
+
+REBUILD_PAYMENT_ROLLUP_SQL = '''
+    INSERT INTO membership_paymentrollup
+        (month, tier_id, payment_method, amount_paid, payment_count)
+    SELECT
+        date_trunc('month', m.effective_from)::date,
+        m.tier_id,
+        p.payment_method,
+        SUM(p.amount_paid),
+        COUNT(*)
+    FROM membership_membershippayment AS p
+        JOIN membership_membership AS m ON p.membership_id = m.id
+    GROUP BY 1, 2, 3
+'''
+
+
+class TierRevenue(NamedTuple):
+    tier: str
+    by_payment_method: List[int]
+    paid: int
+    expected: int
+
+    @property
+    def outstanding(self):
+        return self.expected - self.paid
+
+
+class RevenueReport(NamedTuple):
+    year: int
+    payment_methods: List[str]
+    tiers: List[TierRevenue]
+    by_month: Dict[date, int]
+
+    @property
+    def paid(self):
+        return sum(tier.paid for tier in self.tiers)
+
+    @property
+    def expected(self):
+        return sum(tier.expected for tier in self.tiers)
+
+    @property
+    def outstanding(self):
+        return self.expected - self.paid
+
+
+def rebuild_rollups():
+    """
+    Recomputes the membership and payment rollups from scratch
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            'LOCK TABLE membership_membershiprollup, membership_paymentrollup IN EXCLUSIVE MODE'
+        )
+        MembershipRollup.objects.all().delete()
+        PaymentRollup.objects.all().delete()
+        cursor.execute(REBUILD_MEMBERSHIP_ROLLUP_SQL)
+        cursor.execute(REBUILD_PAYMENT_ROLLUP_SQL)
+
+
+def get_revenue_report(year) -> RevenueReport:
+    """
+    Revenue of the memberships starting in `year`, by tier and payment method, compared with the
+    base amount of their tiers
+    """
+    month_range = (date(year, 1, 1), date(year, 12, 31))
+    payment_methods = [name for name, _ in PaymentMethod.choices()]
+
+    paid = defaultdict(lambda: [0] * len(payment_methods))
+    by_month = defaultdict(int)
+    for month, tier_id, payment_method, amount_paid in PaymentRollup.objects.filter(
+        month__range=month_range
+    ).values_list('month', 'tier_id', 'payment_method', 'amount_paid'):
+        paid[tier_id][payment_methods.index(payment_method)] += amount_paid
+        by_month[month] += amount_paid
+
+    expected = dict(
+        MembershipRollup.objects.filter(month__range=month_range)
+        .order_by()
+        .values('tier_id')
+        .annotate(expected=Sum('expected_amount'))
+        .values_list('tier_id', 'expected')
+    )
+
+    data = reference_data.data
+    tiers = [
+        TierRevenue(
+            tier=str(data.get_tier(tier_id)),
+            by_payment_method=paid[tier_id],
+            paid=sum(paid[tier_id]),
+            expected=expected.get(tier_id, 0),
+        )
+        for tier_id in set(paid) | set(expected)
+    ]
+
+    return RevenueReport(
+        year=year,
+        payment_methods=[PaymentMethod[name].value for name in payment_methods],
+        tiers=sorted(tiers, key=lambda tier: tier.tier),
+        by_month=dict(sorted(by_month.items())),
+    )
@@ -0,0 +1,347 @@
+import codecs
+import csv
+import multiprocessing
+import os
+import tempfile
+from collections import deque
+from typing import Dict, List, NamedTuple
+
+import django
+from dateutil.relativedelta import relativedelta
+from django.db import connection, transaction
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from apps.membership.data_versions import PARTICIPANT_DATA, bump_versions
+from apps.membership.forms import UNDER_AGED_WITHOUT_ADULT_ERROR, RosterRowForm
+from apps.membership.summaries import refresh_participant_summaries
+
+IMPORT_CHUNK_SIZE = 1000
+UNKNOWN_FAMILY_ERROR = 'There is no family with this id'
+ROSTER_COLUMNS = list(RosterRowForm.base_fields)
+NON_TEXT_COLUMNS = [
+    'date_of_birth',
+    'participation_form_filled_on',
+    'family_id',
+    'height',
+    'weight',
+]
+TEXT_COLUMNS = [name for name in ROSTER_COLUMNS if name not in NON_TEXT_COLUMNS]
+
+CREATE_STAGING_SQL = '''
+    CREATE TEMPORARY TABLE roster_import (
+        row_number integer NOT NULL,
+        name text NOT NULL,
+        surname text NOT NULL,
+        date_of_birth date NOT NULL,
+        participation_form_filled_on date NOT NULL,
+        family_name text NOT NULL,
+        family_id integer,
+        address text NOT NULL,
+        postcode text NOT NULL,
+        phone text NOT NULL,
+        email text NOT NULL,
+        emergency_contact_name text NOT NULL,
+        emergency_contact_phone text NOT NULL,
+        emergency_contact_relation text NOT NULL,
+        height integer,
+        weight integer,
+        health_info text NOT NULL,
+        is_under_aged boolean NOT NULL,
+        participant_id integer
+    ) ON COMMIT DROP
+'''
+
+COPY_STAGING_SQL = '''
+    COPY roster_import ({columns}) FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL ({text_columns}))
+'''.format(
+    columns=', '.join(['row_number'] + ROSTER_COLUMNS + ['is_under_aged']),
+    text_columns=', '.join(TEXT_COLUMNS),
+)
+
+REJECT_UNKNOWN_FAMILIES_SQL = '''
+    DELETE FROM roster_import AS s
+    WHERE s.family_id IS NOT NULL
+        AND NOT EXISTS (SELECT 1 FROM membership_family AS f WHERE f.id = s.family_id)
+    RETURNING s.row_number
+'''
+
+REJECT_UNDER_AGED_WITHOUT_ADULT_SQL = '''
+    DELETE FROM roster_import AS s
+    WHERE s.is_under_aged
+        AND NOT EXISTS (
+            SELECT 1 FROM roster_import AS a
+            WHERE NOT a.is_under_aged
+                AND (
+                    a.family_id = s.family_id
+                    OR (
+                        a.family_id IS NULL
+                        AND s.family_id IS NULL
+                        AND a.family_name = s.family_name
+                    )
+                )
+        )
+        AND NOT EXISTS (
+            SELECT 1 FROM membership_participant AS p
+            WHERE p.family_id = s.family_id AND p.date_of_birth <= %s
+        )
+    RETURNING s.row_number
+'''
+
+MERGE_FAMILIES_SQL = '''
+    WITH created AS (
+        INSERT INTO membership_family (family_name, created_at, updated_at)
+        SELECT family_name, now(), now()
+        FROM roster_import
+        WHERE family_id IS NULL AND family_name <> ''
+        GROUP BY family_name
+        ORDER BY MIN(row_number)
+        RETURNING id, family_name
+    ), assigned AS (
+        UPDATE roster_import AS s
+        SET family_id = created.id
+        FROM created
+        WHERE s.family_id IS NULL AND s.family_name = created.family_name
+    )
+    SELECT count(*) FROM created
+'''
+
+ASSIGN_PARTICIPANT_IDS_SQL = '''
+    UPDATE roster_import AS s
+    SET participant_id = ids.participant_id
+    FROM (
+        SELECT row_number() OVER (ORDER BY row_number) AS position, row_number
+        FROM roster_import
+    ) AS rows
+        JOIN (
+            SELECT row_number() OVER (ORDER BY participant_id) AS position, participant_id
+            FROM (
+                SELECT nextval(pg_get_serial_sequence('membership_participant', 'id'))
+                    AS participant_id
+                FROM roster_import
+            ) AS reserved
+        ) AS ids ON ids.position = rows.position
+    WHERE s.row_number = rows.row_number
+'''
+
+MERGE_PARTICIPANTS_SQL = '''
+    INSERT INTO membership_participant
+        (
+            id,
+            name,
+            surname,
+            date_of_birth,
+            family_id,
+            participation_form_filled_on,
+            created_at,
+            updated_at
+        )
+    SELECT
+        participant_id,
+        name,
+        surname,
+        date_of_birth,
+        family_id,
+        participation_form_filled_on,
+        now(),
+        now()
+    FROM roster_import
+    ORDER BY row_number
+'''
+
+MERGE_CONTACT_INFO_SQL = '''
+    INSERT INTO membership_contactinfo
+        (participant_id, address, postcode, phone, email, created_at, updated_at)
+    SELECT participant_id, address, postcode, phone, email, now(), now()
+    FROM roster_import
+    WHERE address <> '' OR postcode <> '' OR phone <> '' OR email <> ''
+    ORDER BY row_number
+'''
+
+MERGE_EMERGENCY_CONTACTS_SQL = '''
+    INSERT INTO membership_emergencycontact
+        (participant_id, full_name, phone, relation, created_at, updated_at)
+    SELECT
+        participant_id,
+        emergency_contact_name,
+        emergency_contact_phone,
+        emergency_contact_relation,
+        now(),
+        now()
+    FROM roster_import
+    WHERE emergency_contact_name <> ''
+    ORDER BY row_number
+'''
+
+MERGE_HEALTH_INFO_SQL = '''
+    INSERT INTO membership_healthinfo
+        (participant_id, height, weight, info, created_at, updated_at)
+    SELECT participant_id, height, weight, NULLIF(health_info, ''), now(), now()
+    FROM roster_import
+    WHERE height IS NOT NULL
+    ORDER BY row_number
+'''
+
+
+class RowError(NamedTuple):
+    row_number: int
+    errors: Dict[str, List[str]]
+
+
+class RosterImportResult(NamedTuple):
+    imported: int
+    families_created: int
+    errors: List[RowError]
+
+
+def read_csv(file):
+    reader = csv.DictReader(codecs.iterdecode(file, 'utf-8-sig'))
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_xlsx(file):
+    rows = load_workbook(file, read_only=True, data_only=True).active.iter_rows(values_only=True)
+    header = [str(name or '').strip().lower() for name in next(rows, [])]
+    for row_number, values in enumerate(rows, start=2):
+        if any(value is not None for value in values):
+            yield row_number, dict(zip(header, values))
+
+
+def read_roster(file, file_name):
+    """
+    Yields the `(row number, {column: value})` of the roster as they are read
+    """
+    if os.path.splitext(file_name)[1].lower() == '.xlsx':
+        return read_xlsx(file)
+    return read_csv(file)
+
+
+def validate_rows(rows):
+    """
+    Splits the rows into the cleaned data of the valid ones and the errors of the rest
+    """
+    valid_rows = []
+    errors = []
+    for row_number, row in rows:
+        form = RosterRowForm(data=row)
+        if form.is_valid():
+            valid_rows.append((row_number, form.cleaned_data))
+        else:
+            messages = {field: list(field_errors) for field, field_errors in form.errors.items()}
+            errors.append(RowError(row_number, messages))
+    return valid_rows, errors
+
+
+def get_chunks(rows, chunk_size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_chunks(chunks, workers):
+    """
+    Yields the result of `validate_rows` for each chunk, in the same order as the chunks.
+
+    With several workers the chunks are validated in a pool of spawned processes, so they share
+    nothing with this one, reading ahead at most two chunks per worker so the memory used does
+    not depend on the size of the roster.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield validate_rows(chunk)
+        return
+
+    with multiprocessing.get_context('spawn').Pool(workers, initializer=django.setup) as pool:
+        pending = deque()
+        for chunk in chunks:
+            if len(pending) >= workers * 2:
+                yield pending.popleft().get()
+            pending.append(pool.apply_async(validate_rows, (chunk,)))
+        while pending:
+            yield pending.popleft().get()
+
+
+def validate_roster(rows, workers, chunk_size):
+    """
+    Validates the rows, spooling the valid ones to a temporary file as the CSV for
+    `COPY ... FROM STDIN`. Returns the file and the errors of the invalid rows.
+    """
+    spool = tempfile.TemporaryFile(mode='w+', newline='')
+    writer = csv.writer(spool)
+    errors = []
+    for valid_rows, chunk_errors in validate_chunks(get_chunks(rows, chunk_size), workers):
+        errors.extend(chunk_errors)
+        for row_number, row in valid_rows:
+            values = [row[column] for column in ROSTER_COLUMNS]
+            writer.writerow(
+                [row_number]
+                + ['' if value is None else value for value in values]
+                + [row['is_under_aged']]
+            )
+    spool.seek(0)
+    return spool, errors
+
+
+@transaction.atomic
+def merge_rows(spool, errors):
+    """
+    Creates the participants of the spooled rows, a new family for each family name of the rows
+    without a family id, and their contact, emergency contact and health info with set-based
+    statements over a staging table
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_STAGING_SQL)
+        cursor.copy_expert(COPY_STAGING_SQL, spool)
+        cursor.execute('ANALYZE roster_import')
+
+        cursor.execute(REJECT_UNKNOWN_FAMILIES_SQL)
+        errors.extend(
+            RowError(row_number, dict(family_id=[UNKNOWN_FAMILY_ERROR]))
+            for row_number, in cursor.fetchall()
+        )
+
+        # Only known once all the rows are staged
+        cursor.execute(
+            REJECT_UNDER_AGED_WITHOUT_ADULT_SQL,
+            [timezone.now().date() - relativedelta(years=18)],
+        )
+        errors.extend(
+            RowError(row_number, dict(family_name=[UNDER_AGED_WITHOUT_ADULT_ERROR]))
+            for row_number, in cursor.fetchall()
+        )
+
+        cursor.execute(MERGE_FAMILIES_SQL)
+        families_created = cursor.fetchone()[0]
+        cursor.execute(ASSIGN_PARTICIPANT_IDS_SQL)
+        cursor.execute(MERGE_PARTICIPANTS_SQL)
+        imported = cursor.rowcount
+        cursor.execute(MERGE_CONTACT_INFO_SQL)
+        cursor.execute(MERGE_EMERGENCY_CONTACTS_SQL)
+        cursor.execute(MERGE_HEALTH_INFO_SQL)
+        cursor.execute('SELECT participant_id FROM roster_import')
+        refresh_participant_summaries(participant_id for participant_id, in cursor.fetchall())
+        cursor.execute('DROP TABLE roster_import')
+    bump_versions(PARTICIPANT_DATA)
+    return imported, families_created
+
+
+def import_roster(file, file_name, workers=1, chunk_size=IMPORT_CHUNK_SIZE) -> RosterImportResult:
+    """
+    Imports the participants of a CSV or XLSX roster, skipping the invalid rows and reporting why.
+
+    The whole roster is validated in chunks by `workers` processes before the transaction that
+    creates the participants starts. The result does not depend on the number of workers.
+    """
+    spool, errors = validate_roster(read_roster(file, file_name), workers, chunk_size)
+    with spool:
+        imported, families_created = merge_rows(spool, errors)
+    errors.sort(key=lambda error: error.row_number)
+
+    return RosterImportResult(imported=imported, families_created=families_created, errors=errors)
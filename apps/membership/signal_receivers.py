@@ -1,19 +1,86 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from memoize import delete_memoized
 
+from apps.membership.data_versions import (
+    GENERAL_SETUP_DATA,
+    MEMBERSHIP_DATA,
+    PARTICIPANT_DATA,
+    bump_versions,
+)
+from apps.membership.reference_data import reference_data
+from apps.membership.summaries import refresh_participant_summaries
 from apps.membership.templatetags.membership import is_membership_setup_initialized
 
 
 def invalidate_general_setup(sender, **kwargs):
+    from .models import GeneralSetupPeriod
+
+    GeneralSetupPeriod.refresh()
     delete_memoized(sender.get_last)
     delete_memoized(sender.get_for_date)
     delete_memoized(sender.get_current)
     delete_memoized(sender.get_next)
     delete_memoized(sender.get_previous)
     delete_memoized(is_membership_setup_initialized)
+    bump_versions(GENERAL_SETUP_DATA)
+
+
+def invalidate_reference_data(sender, **kwargs):
+    reference_data.invalidate()
+
+
+def invalidate_membership_data(sender, **kwargs):
+    bump_versions(MEMBERSHIP_DATA)
+
+
+def invalidate_participant_data(sender, **kwargs):
+    bump_versions(PARTICIPANT_DATA)
+
+
+def update_participant_summary(sender, instance, **kwargs):
+    refresh_participant_summaries([instance.pk])
+
+
+def update_related_participant_summary(sender, instance, **kwargs):
+    refresh_participant_summaries([instance.participant_id])
+
+
+def update_family_summaries(sender, instance, **kwargs):
+    refresh_participant_summaries(instance.family_members.values_list('id', flat=True))
+
+
+def update_tier_summaries(sender, instance, **kwargs):
+    from .models import ParticipantSummary
+
+    refresh_participant_summaries(
+        ParticipantSummary.objects.filter(tier=instance).values_list('participant_id', flat=True)
+    )
 
 
 def setup():
     from . import models
 
     post_save.connect(invalidate_general_setup, sender=models.GeneralSetup)
+    post_delete.connect(invalidate_general_setup, sender=models.GeneralSetup)
+    for model in (models.Tier, models.MemberType):
+        post_save.connect(invalidate_reference_data, sender=model)
+        post_delete.connect(invalidate_reference_data, sender=model)
+    for model in (models.Membership, models.MembershipPayment):
+        post_save.connect(invalidate_membership_data, sender=model)
+        post_delete.connect(invalidate_membership_data, sender=model)
+    for model in (
+        models.Participant,
+        models.Family,
+        models.ContactInfo,
+        models.EmergencyContact,
+        models.HealthInfo,
+    ):
+        post_save.connect(invalidate_participant_data, sender=model)
+        post_delete.connect(invalidate_participant_data, sender=model)
+
+    post_save.connect(update_participant_summary, sender=models.Participant)
+    post_save.connect(update_family_summaries, sender=models.Family)
+    post_save.connect(update_tier_summaries, sender=models.Tier)
+    for model in (models.Membership, models.ContactInfo, models.EmergencyContact):
+        post_save.connect(update_related_participant_summary, sender=model)
+        post_delete.connect(update_related_participant_summary, sender=model)
@@ -0,0 +1,152 @@
+from array import array
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, NamedTuple
+
+from dateutil.relativedelta import relativedelta
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.membership.data_versions import MEMBERSHIP_DATA, REFERENCE_DATA, get_read_versions
+from apps.membership.reference_data import reference_data
+
+STATISTICS_CACHE_KEY = 'membership:statistics:{membership_version}:{reference_version}:{until}'
+STATISTICS_CACHE_TIMEOUT = 86400
+
+
+class MembershipStatistics(NamedTuple):
+    months: List[date]
+    active: List[int]
+    new_joiners: List[int]
+    renewals: List[int]
+    active_by_tier: Dict[str, List[int]]
+    active_by_member_type: Dict[str, List[int]]
+
+    def rows(self):
+        tiers = list(self.active_by_tier.values())
+        member_types = list(self.active_by_member_type.values())
+        for i, month in enumerate(self.months):
+            yield (
+                month,
+                self.active[i],
+                self.new_joiners[i],
+                self.renewals[i],
+                [counts[i] for counts in tiers],
+                [counts[i] for counts in member_types],
+            )
+
+
+class MembershipEvents:
+    """
+    Sorted start and end dates (as ordinals) of a set of memberships
+    """
+
+    def __init__(self):
+        self.starts = array('l')
+        self.ends = array('l')
+
+    def add(self, effective_from, effective_until):
+        self.starts.append(effective_from.toordinal())
+        # Memberships without end are active forever, so they never leave the sweep
+        if effective_until:
+            self.ends.append(effective_until.toordinal())
+
+    def sort(self):
+        self.starts = array('l', sorted(self.starts))
+        self.ends = array('l', sorted(self.ends))
+        return self
+
+    def count_active(self, ref_dates):
+        """
+        Counts the memberships active on each of the sorted `ref_dates` in a single sweep.
+
+        Follows `Membership.is_active_on`: active when effective_from <= ref_date < effective_until
+        """
+        counts = []
+        started = ended = 0
+        for ref_date in ref_dates:
+            ordinal = ref_date.toordinal()
+            while started < len(self.starts) and self.starts[started] <= ordinal:
+                started += 1
+            while ended < len(self.ends) and self.ends[ended] <= ordinal:
+                ended += 1
+            counts.append(started - ended)
+        return counts
+
+
+def get_months(first_date, last_date):
+    month = date(first_date.year, first_date.month, 1)
+    months = []
+    while month <= last_date:
+        months.append(month)
+        month += relativedelta(months=1)
+    return months
+
+
+def compute_membership_statistics(until) -> MembershipStatistics:
+    from apps.membership.models import Membership
+
+    memberships = Membership.objects.order_by().values_list(
+        'effective_from', 'effective_until', 'group_first_membership_id', 'tier_id'
+    )
+
+    events = MembershipEvents()
+    events_by_tier = defaultdict(MembershipEvents)
+    events_by_member_type = defaultdict(MembershipEvents)
+    new_joiners = defaultdict(int)
+    renewals = defaultdict(int)
+    first_date = None
+
+    data = reference_data.data
+    for effective_from, effective_until, group_first_membership_id, tier_id in memberships:
+        tier = data.tiers[tier_id]
+        events.add(effective_from, effective_until)
+        events_by_tier[str(tier)].add(effective_from, effective_until)
+        events_by_member_type[str(data.member_types[tier.member_type_id])].add(
+            effective_from, effective_until
+        )
+
+        month = (effective_from.year, effective_from.month)
+        if group_first_membership_id is None:
+            new_joiners[month] += 1
+        else:
+            renewals[month] += 1
+
+        if first_date is None or effective_from < first_date:
+            first_date = effective_from
+
+    months = get_months(first_date, until) if first_date else []
+
+    return MembershipStatistics(
+        months=months,
+        active=events.sort().count_active(months),
+        new_joiners=[new_joiners[(month.year, month.month)] for month in months],
+        renewals=[renewals[(month.year, month.month)] for month in months],
+        active_by_tier={
+            name: tier_events.sort().count_active(months)
+            for name, tier_events in sorted(events_by_tier.items())
+        },
+        active_by_member_type={
+            name: member_type_events.sort().count_active(months)
+            for name, member_type_events in sorted(events_by_member_type.items())
+        },
+    )
+
+
+def get_membership_statistics(until=None) -> MembershipStatistics:
+    """
+    Monthly membership statistics, cached until any membership, tier or member type changes
+    """
+    until = until or timezone.now().date()
+    membership_version, reference_version = get_read_versions(MEMBERSHIP_DATA, REFERENCE_DATA)
+    key = STATISTICS_CACHE_KEY.format(
+        membership_version=membership_version,
+        reference_version=reference_version,
+        until=until.isoformat(),
+    )
+
+    statistics = cache.get(key)
+    if statistics is None:
+        statistics = compute_membership_statistics(until)
+        cache.set(key, statistics, timeout=STATISTICS_CACHE_TIMEOUT)
+    return statistics
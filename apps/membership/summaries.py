@@ -0,0 +1,100 @@
+from django.db import connection
+
+UPSERT_SUMMARIES_SQL = '''
+    INSERT INTO membership_participantsummary (
+        participant_id,
+        name,
+        surname,
+        date_of_birth,
+        family_name,
+        tier_id,
+        tier_name,
+        effective_from,
+        effective_until,
+        paid_on,
+        has_unpaid_memberships,
+        contact_complete,
+        requires_attention
+    )
+    SELECT
+        p.id,
+        p.name,
+        p.surname,
+        p.date_of_birth,
+        f.family_name,
+        m.tier_id,
+        t.name,
+        m.effective_from,
+        m.effective_until,
+        m.paid_on,
+        u.has_unpaid_memberships,
+        c.contact_complete,
+        NOT c.contact_complete OR m.id IS NULL OR u.has_unpaid_memberships
+    FROM membership_participant AS p
+        LEFT JOIN membership_family AS f ON f.id = p.family_id
+        LEFT JOIN LATERAL (
+            SELECT id, tier_id, effective_from, effective_until, paid_on
+            FROM membership_membership
+            WHERE participant_id = p.id
+            ORDER BY effective_from DESC, id DESC
+            LIMIT 1
+        ) AS m ON TRUE
+        LEFT JOIN membership_tier AS t ON t.id = m.tier_id
+        CROSS JOIN LATERAL (
+            SELECT EXISTS (
+                SELECT 1 FROM membership_membership
+                WHERE participant_id = p.id AND paid_on IS NULL
+            ) AS has_unpaid_memberships
+        ) AS u
+        CROSS JOIN LATERAL (
+            SELECT
+                EXISTS (SELECT 1 FROM membership_contactinfo WHERE participant_id = p.id)
+                AND NOT EXISTS (
+                    SELECT 1 FROM membership_contactinfo
+                    WHERE participant_id = p.id
+                        AND (
+                            COALESCE(address, '') = ''
+                            OR COALESCE(postcode, '') = ''
+                            OR COALESCE(phone, '') = ''
+                            OR COALESCE(email, '') = ''
+                        )
+                )
+                AND EXISTS (
+                    SELECT 1 FROM membership_emergencycontact WHERE participant_id = p.id
+                ) AS contact_complete
+        ) AS c
+    {where}
+    ON CONFLICT (participant_id) DO UPDATE SET
+        name = EXCLUDED.name,
+        surname = EXCLUDED.surname,
+        date_of_birth = EXCLUDED.date_of_birth,
+        family_name = EXCLUDED.family_name,
+        tier_id = EXCLUDED.tier_id,
+        tier_name = EXCLUDED.tier_name,
+        effective_from = EXCLUDED.effective_from,
+        effective_until = EXCLUDED.effective_until,
+        paid_on = EXCLUDED.paid_on,
+        has_unpaid_memberships = EXCLUDED.has_unpaid_memberships,
+        contact_complete = EXCLUDED.contact_complete,
+        requires_attention = EXCLUDED.requires_attention
+'''
+
+
+def refresh_participant_summaries(participant_ids):
+    """
+    Recomputes the summaries of the participants in a single statement. Must be called by every
+    write path changing a participant, its family, contact info, emergency contacts or memberships
+    without going through their `save`.
+    """
+    participant_ids = list(participant_ids)
+    if not participant_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            UPSERT_SUMMARIES_SQL.format(where='WHERE p.id = ANY(%s)'), [participant_ids]
+        )
+
+
+def rebuild_participant_summaries():
+    with connection.cursor() as cursor:
+        cursor.execute(UPSERT_SUMMARIES_SQL.format(where='WHERE TRUE'))
@@ -1,6 +1,8 @@
 import pytest
+from django.core.cache import cache
 
 from apps.membership import models
+from apps.membership.reference_data import reference_data
 
 
 @pytest.fixture(autouse=True)
@@ -11,3 +13,15 @@ def clear_memoize():
     models.GeneralSetup.get_current.delete_memoized()
     models.GeneralSetup.get_next.delete_memoized()
     models.GeneralSetup.get_previous.delete_memoized()
+
+
+@pytest.fixture(autouse=True)
+def clear_reference_data():
+    yield
+    reference_data.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    yield
+    cache.clear()
@@ -0,0 +1,90 @@
+from datetime import date
+
+import pytest
+
+from apps.membership.api import (
+    PARTICIPANT_FIELDS,
+    get_eligible_participants,
+    get_etag,
+    get_fields,
+    get_page,
+    get_participants,
+)
+from apps.membership.constants import TimeUnit
+from apps.membership.data_versions import MEMBERSHIP_DATA, PARTICIPANT_DATA
+from apps.membership.filters import ELIGIBILITY_DATA
+from apps.membership.tests import factories
+
+pytestmark = pytest.mark.django_db
+
+
+def test_get_fields():
+    assert get_fields('', PARTICIPANT_FIELDS) == list(PARTICIPANT_FIELDS)
+    assert get_fields('surname, name,surname', PARTICIPANT_FIELDS) == ['id', 'surname', 'name']
+    with pytest.raises(ValueError):
+        get_fields('name,health_info', PARTICIPANT_FIELDS)
+
+
+def test_get_page():
+    participants = factories.ParticipantFactory.create_batch(5)
+
+    page = get_page(get_participants(), ['id', 'name'], limit=2)
+    assert page.rows == [dict(id=p.id, name=p.name) for p in participants[:2]]
+    assert page.cursor == participants[1].id
+
+    page = get_page(get_participants(), ['id'], cursor=page.cursor, limit=3)
+    assert [row['id'] for row in page.rows] == [p.id for p in participants[2:]]
+    assert page.cursor is None
+
+
+def test_get_etag():
+    participant = factories.ParticipantFactory()
+    participants_etag = get_etag([PARTICIPANT_DATA], {})
+    memberships_etag = get_etag([MEMBERSHIP_DATA], {})
+
+    assert get_etag([PARTICIPANT_DATA], {}) == participants_etag
+    assert get_etag([PARTICIPANT_DATA], {'fields': 'name'}) != participants_etag
+
+    participant.save()
+    assert get_etag([PARTICIPANT_DATA], {}) != participants_etag
+    assert get_etag([MEMBERSHIP_DATA], {}) == memberships_etag
+
+    eligibility_etag = get_etag(ELIGIBILITY_DATA, {'date': '2020-01-01'})
+    factories.GeneralSetupFactory(valid_from=date(2015, 1, 1))
+    assert get_etag(ELIGIBILITY_DATA, {'date': '2020-01-01'}) != eligibility_etag
+
+
+def test_get_eligible_participants():
+    factories.GeneralSetupFactory(
+        valid_from=date(2015, 1, 1),
+        time_to_vote_since_membership=3,
+        time_unit_to_vote_since_membership=TimeUnit.MONTHS.value,
+        minimum_age_to_vote=18,
+        renewal_month=1,
+    )
+    tier = factories.TierFactory(needs_renewal=True, usable_from=date(2015, 1, 1))
+    participants = factories.ParticipantFactory.create_batch(3, date_of_birth=date(1990, 12, 1))
+    for participant in participants[:2]:
+        for year in (2019, 2020):
+            factories.MembershipFactory(
+                participant=participant,
+                tier=tier,
+                effective_from=date(year, 1, 1),
+                form_filled=date(year, 1, 1),
+            )
+    # Not a member for long enough
+    factories.MembershipFactory(
+        participant=participants[2],
+        tier=tier,
+        effective_from=date(2020, 1, 1),
+        form_filled=date(2020, 1, 1),
+    )
+
+    page = get_page(get_eligible_participants(date(2020, 2, 1)), ['id', 'surname'], limit=1)
+    assert page.rows == [dict(id=participants[0].id, surname=participants[0].surname)]
+    page = get_page(
+        get_eligible_participants(date(2020, 2, 1)), ['id'], cursor=page.cursor, limit=1
+    )
+    assert page.rows == [dict(id=participants[1].id)]
+    assert page.cursor is None
+    assert list(get_eligible_participants(date(2014, 1, 1))) == []
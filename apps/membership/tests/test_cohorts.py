@@ -0,0 +1,85 @@
+from datetime import date
+
+import pytest
+
+from apps.membership import models
+from apps.membership.cohorts import compute_cohorts, get_cohorts, get_renewals
+from apps.membership.tests import factories
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def general_setup():
+    return factories.GeneralSetupFactory(valid_from=date(2015, 1, 1), renewal_month=1)
+
+
+@pytest.fixture
+def tier():
+    return factories.TierFactory(usable_from=date(2015, 1, 1), needs_renewal=True)
+
+
+def create_chain(tier, effective_from, renewals):
+    participant = factories.ParticipantFactory()
+    models.Membership.objects.create(
+        participant=participant, tier=tier, effective_from=effective_from, form_filled=date.min
+    )
+    for year in range(effective_from.year + 1, effective_from.year + 1 + renewals):
+        models.Membership.objects.create(
+            participant=participant,
+            tier=tier,
+            effective_from=date(year, 1, 1),
+            form_filled=date.min,
+        )
+
+
+@pytest.mark.parametrize(
+    ['from_date', 'until', 'expected'],
+    [
+        (date(2018, 3, 1), date(2019, 12, 31), [date(2019, 1, 1)]),
+        (date(2018, 3, 1), date(2020, 1, 1), [date(2019, 1, 1), date(2020, 1, 1)]),
+        (date(2018, 1, 1), date(2020, 6, 1), [date(2019, 1, 1), date(2020, 1, 1)]),
+        (date(2018, 3, 1), date(2018, 12, 31), []),
+    ],
+)
+def test_get_renewals(from_date, until, expected):
+    assert get_renewals(from_date, until) == expected
+
+
+def test_get_renewals_setup_change():
+    factories.GeneralSetupFactory(valid_from=date(2019, 2, 1), renewal_month=9)
+    assert get_renewals(date(2018, 3, 1), date(2020, 12, 31)) == [
+        date(2019, 1, 1),
+        date(2019, 9, 1),
+        date(2020, 9, 1),
+    ]
+
+
+def test_compute_cohorts(tier):
+    create_chain(tier, date(2017, 3, 5), renewals=0)
+    create_chain(tier, date(2017, 3, 20), renewals=1)
+    create_chain(tier, date(2017, 3, 28), renewals=3)
+    create_chain(tier, date(2018, 6, 1), renewals=2)
+
+    analysis = compute_cohorts(date(2020, 3, 1))
+
+    assert [(cohort.month, cohort.size) for cohort in analysis.cohorts] == [
+        (date(2017, 3, 1), 3),
+        (date(2018, 6, 1), 1),
+    ]
+    assert analysis.cohorts[0].renewals == [date(2018, 1, 1), date(2019, 1, 1), date(2020, 1, 1)]
+    assert analysis.cohorts[0].retained == [2, 1, 1]
+    assert analysis.cohorts[1].retained == [1, 1]
+    assert analysis.cohorts[1].retention_rates == [1, 1]
+    assert analysis.max_renewals == 3
+
+
+def test_get_cohorts_cached(tier, django_assert_num_queries):
+    create_chain(tier, date(2017, 3, 5), renewals=1)
+    analysis = get_cohorts(date(2020, 3, 1))
+
+    with django_assert_num_queries(0):
+        assert get_cohorts(date(2020, 3, 1)) == analysis
+
+    create_chain(tier, date(2017, 3, 20), renewals=0)
+    assert get_cohorts(date(2020, 3, 1)).cohorts[0].retained == [1, 0, 0]
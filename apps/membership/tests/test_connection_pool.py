@@ -0,0 +1,130 @@
+import threading
+
+import psycopg2
+import pytest
+from django.db import connection
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from contrib.django.db.backends.postgresql_pool.pool import (
+    ConnectionPool,
+    close_pools,
+    get_pool,
+    pools,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def build_pool():
+    pools = []
+
+    def build(**kwargs):
+        conn_params = connection.get_connection_params()
+        pool = ConnectionPool(lambda: psycopg2.connect(**conn_params), **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield build
+    for pool in pools:
+        pool.close_all()
+
+
+def test_backend_uses_a_pool():
+    connection.ensure_connection()
+
+    assert isinstance(connection.pool, ConnectionPool)
+    assert connection.pool.stats.in_use >= 1
+
+
+def test_connections_are_reused(build_pool):
+    pool = build_pool(max_size=2)
+
+    first = pool.getconn()
+    pool.putconn(first)
+
+    assert pool.getconn() is first
+    stats = pool.stats
+    assert (stats.opened, stats.checkouts, stats.in_use, stats.idle) == (1, 2, 1, 0)
+
+
+def test_returned_connections_are_reset(build_pool):
+    pool = build_pool()
+    pooled_connection = pool.getconn()
+    pooled_connection.autocommit = False
+    with pooled_connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+    pool.putconn(pooled_connection)
+
+    assert pooled_connection.info.transaction_status == TRANSACTION_STATUS_IDLE
+    assert pooled_connection.autocommit
+
+
+def test_wait_for_a_connection(build_pool):
+    pool = build_pool(max_size=1, timeout=5)
+    pooled_connection = pool.getconn()
+
+    timer = threading.Timer(0.1, pool.putconn, [pooled_connection])
+    timer.start()
+    assert pool.getconn() is pooled_connection
+    timer.join()
+    assert pool.stats.waits == 1
+
+
+def test_timeout_when_exhausted(build_pool):
+    pool = build_pool(max_size=1, timeout=0.1)
+    pool.getconn()
+
+    with pytest.raises(psycopg2.OperationalError):
+        pool.getconn()
+    assert pool.stats.timeouts == 1
+
+
+def test_health_check_replaces_broken_connections(build_pool):
+    pool = build_pool(health_check_after=0)
+    broken = pool.getconn()
+    pool.putconn(broken)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_terminate_backend(%s)', [broken.get_backend_pid()])
+
+    pooled_connection = pool.getconn()
+
+    assert pooled_connection is not broken
+    stats = pool.stats
+    assert (stats.health_check_failures, stats.opened, stats.size) == (1, 2, 1)
+
+
+def test_idle_connections_are_closed_down_to_min_size(build_pool):
+    pool = build_pool(min_size=1, idle_timeout=0)
+    connections = [pool.getconn(), pool.getconn()]
+
+    for pooled_connection in connections:
+        pool.putconn(pooled_connection)
+
+    stats = pool.stats
+    assert (stats.size, stats.idle, stats.closed) == (1, 1, 1)
+    assert connections[0].closed
+
+
+def test_close_all_empties_the_pool(build_pool):
+    pool = build_pool()
+    connections = [pool.getconn(), pool.getconn()]
+    pool.putconn(connections[0])
+
+    pool.close_all()
+
+    stats = pool.stats
+    assert (stats.size, stats.idle, stats.in_use, stats.closed) == (1, 0, 1, 1)
+    pool.putconn(connections[1])
+
+
+def test_pools_are_not_keyed_on_the_password():
+    conn_params = dict(connection.get_connection_params(), database='pool_key_test')
+    pool = get_pool(dict(conn_params, password='old'), {})
+
+    try:
+        assert get_pool(dict(conn_params, password='new'), {}) is pool
+        assert not any('old' in dict(key).values() for key in pools)
+    finally:
+        close_pools(database='pool_key_test')
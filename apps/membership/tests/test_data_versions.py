@@ -0,0 +1,53 @@
+import pytest
+from django.core.cache import cache
+
+from apps.membership import models
+from apps.membership.data_versions import (
+    MEMBERSHIP_DATA,
+    PARTICIPANT_DATA,
+    bump_versions,
+    get_cache_key,
+    get_stored_versions,
+    get_versions,
+    store_versions,
+)
+from apps.membership.tests import factories
+
+pytestmark = pytest.mark.django_db
+
+
+def test_bump_versions():
+    participant_version, membership_version = get_versions(PARTICIPANT_DATA, MEMBERSHIP_DATA)
+
+    bump_versions(PARTICIPANT_DATA)
+    assert get_versions(PARTICIPANT_DATA, MEMBERSHIP_DATA) == (
+        participant_version + 1,
+        membership_version,
+    )
+
+    factories.ParticipantFactory()
+    assert get_versions(PARTICIPANT_DATA)[0] > participant_version + 1
+    assert get_versions(MEMBERSHIP_DATA)[0] == membership_version
+
+
+def test_versions_restored_from_database():
+    cache.delete(get_cache_key(PARTICIPANT_DATA))
+    store_versions({PARTICIPANT_DATA: 41})
+
+    assert get_versions(PARTICIPANT_DATA) == (41,)
+    cache.delete(get_cache_key(PARTICIPANT_DATA))
+    bump_versions(PARTICIPANT_DATA)
+    assert get_versions(PARTICIPANT_DATA) == (42,)
+
+
+def test_store_versions():
+    store_versions({PARTICIPANT_DATA: 5, MEMBERSHIP_DATA: 3})
+    # Never goes back, as concurrent writers may store their versions out of order
+    store_versions({PARTICIPANT_DATA: 4})
+
+    assert get_stored_versions([PARTICIPANT_DATA, MEMBERSHIP_DATA, 'other']) == {
+        PARTICIPANT_DATA: 5,
+        MEMBERSHIP_DATA: 3,
+        'other': 0,
+    }
+    assert models.DataVersion.objects.count() == 2
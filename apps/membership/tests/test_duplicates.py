@@ -0,0 +1,111 @@
+from datetime import date
+
+import pytest
+from django.core.exceptions import ValidationError
+
+from apps.membership import models
+from apps.membership.duplicates import (
+    find_duplicates,
+    get_trigrams,
+    merge_participants,
+    trigram_similarity,
+)
+from apps.membership.tests import factories
+
+pytestmark = pytest.mark.django_db
+
+
+def create_participant(name, surname, date_of_birth, email='', phone=''):
+    participant = factories.ParticipantFactory(
+        name=name, surname=surname, date_of_birth=date_of_birth
+    )
+    if email or phone:
+        models.ContactInfo.objects.create(participant=participant, email=email, phone=phone)
+    return participant
+
+
+def test_trigram_similarity():
+    assert get_trigrams('Ñoño') == get_trigrams('nono')
+    assert get_trigrams('cat') == {'  c', ' ca', 'cat', 'at '}
+    assert trigram_similarity(get_trigrams('María'), get_trigrams('maria')) == 1
+    # Same value as pg_trgm's similarity('word', 'two words')
+    assert trigram_similarity(get_trigrams('word'), get_trigrams('two words')) == pytest.approx(
+        4 / 11
+    )
+    assert trigram_similarity(get_trigrams(''), get_trigrams('word')) == 0
+
+
+def test_find_duplicates():
+    jon = create_participant('Jon', 'Etxeberria', date(1980, 1, 1), email='jon@example.com')
+    # Same date of birth and typo
+    jon_typo = create_participant('Jon', 'Echeberria', date(1980, 1, 1))
+    # Same surname prefix and contact, different date of birth
+    jon_other_date = create_participant(
+        'Jon', 'Etxeberria', date(1981, 1, 1), email='JON@example.com ', phone='+34 600 000 000'
+    )
+    # Same date of birth only
+    create_participant('Ane', 'Goikoetxea', date(1980, 1, 1))
+    # Not in any block
+    create_participant('Jon', 'Zubizarreta', date(1990, 1, 1), phone='600000000')
+
+    assert find_duplicates() == 2
+
+    candidates = {
+        (candidate.participant, candidate.duplicate): candidate
+        for candidate in models.DuplicateCandidate.objects.all()
+    }
+    assert set(candidates) == {(jon, jon_typo), (jon, jon_other_date)}
+    assert candidates[(jon, jon_typo)].same_date_of_birth
+    assert candidates[(jon, jon_other_date)].same_email
+    assert candidates[(jon, jon_other_date)].surname_similarity == 1
+
+    # Dismissed candidates are kept and not found again
+    models.DuplicateCandidate.objects.filter(duplicate=jon_typo).update(dismissed=True)
+    assert find_duplicates() == 1
+    assert models.DuplicateCandidate.objects.count() == 2
+
+
+def test_merge_participants():
+    family = models.Family.objects.create(family_name='Etxeberria')
+    participant = create_participant('Jon', 'Etxeberria', date(1980, 1, 1))
+    duplicate = create_participant('Jon', 'Echeberria', date(1980, 1, 1), email='jon@example.com')
+    duplicate.family = family
+    duplicate.save()
+    membership = factories.MembershipFactory(participant=duplicate)
+    models.DuplicateCandidate.objects.create(
+        participant=participant,
+        duplicate=duplicate,
+        score=0.8,
+        name_similarity=1,
+        surname_similarity=0.5,
+        same_date_of_birth=True,
+        same_email=False,
+        same_phone=False,
+    )
+
+    merge_participants(participant, duplicate)
+
+    participant.refresh_from_db()
+    assert participant.family == family
+    assert list(participant.memberships.all()) == [membership]
+    assert list(participant.contact_info.values_list('email', flat=True)) == ['jon@example.com']
+    assert not models.Participant.objects.filter(pk=duplicate.pk).exists()
+    assert not models.DuplicateCandidate.objects.exists()
+
+
+def test_merge_participants_overlapping_memberships():
+    participant = create_participant('Jon', 'Etxeberria', date(1980, 1, 1))
+    duplicate = create_participant('Jon', 'Echeberria', date(1980, 1, 1))
+    factories.MembershipFactory(
+        participant=participant, effective_from=date(2019, 1, 1), effective_until=date(2020, 1, 1)
+    )
+    membership = factories.MembershipFactory(
+        participant=duplicate, effective_from=date(2019, 6, 1), effective_until=date(2020, 6, 1)
+    )
+
+    with pytest.raises(ValidationError):
+        merge_participants(participant, duplicate)
+
+    membership.refresh_from_db()
+    assert membership.participant == duplicate
+    assert models.Participant.objects.filter(pk=duplicate.pk).exists()
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from freezegun import freeze_time
+
+from apps.membership import models
+from apps.membership.feeds import decode_cursor, encode_cursor, get_changes, get_feed_models
+from apps.membership.tests import factories
+
+pytestmark = pytest.mark.django_db
+
+
+def read_feed(model, cursor=None, limit=2):
+    ids = []
+    while True:
+        page = get_changes(model, cursor=cursor, limit=limit)
+        ids.extend(row['id'] for row in page.rows)
+        cursor = page.cursor
+        if not page.has_more:
+            return ids, cursor
+
+
+def test_cursor():
+    updated_at = timezone.now()
+    assert decode_cursor(encode_cursor(updated_at, 3)) == (updated_at, 3)
+    with pytest.raises(ValueError):
+        decode_cursor('not a cursor')
+
+
+def test_feed_models():
+    feed_models = get_feed_models()
+    assert feed_models['participant'] is models.Participant
+    assert 'duplicatecandidate' not in feed_models
+
+
+def test_get_changes():
+    an_hour_ago = timezone.now() - timedelta(hours=1)
+    with freeze_time(an_hour_ago):
+        # Same updated_at, so the id decides the order
+        participants = factories.ParticipantFactory.create_batch(3)
+    with freeze_time(an_hour_ago + timedelta(minutes=1)):
+        participants.append(factories.ParticipantFactory())
+
+    ids, cursor = read_feed(models.Participant)
+    assert ids == [participant.id for participant in participants]
+    assert get_changes(models.Participant, cursor=cursor).rows == []
+
+    with freeze_time(an_hour_ago + timedelta(minutes=2)):
+        participants[0].save()
+    assert read_feed(models.Participant, cursor=cursor) == (
+        [participants[0].id],
+        encode_cursor(participants[0].updated_at, participants[0].id),
+    )
+
+
+def test_get_changes_lag():
+    participant = factories.ParticipantFactory()
+
+    page = get_changes(models.Participant)
+    assert page.rows == []
+    assert page.cursor is None
+
+    with freeze_time(timezone.now() + timedelta(minutes=2)):
+        page = get_changes(models.Participant)
+    assert [row['id'] for row in page.rows] == [participant.id]
+    assert page.rows[0]['updated_at'] == participant.updated_at
@@ -4,7 +4,7 @@ import pytest
 
 from apps.membership import models
 from apps.membership.constants import TimeUnit
-from apps.membership.filters import EligibleForVoteParticipantFilter
+from apps.membership.filters import EligibleForVoteParticipantFilter, get_eligible_for_vote_ids
 from apps.membership.tests import factories
 
 
@@ -142,3 +142,34 @@ def test_eligible_for_vote_filter_gaps_pass(vote_date, is_id_expected):
 
     vote_filter_qs = vote_filter.queryset(None, models.Participant.objects.all())
     assert (participant in list(vote_filter_qs)) is is_id_expected
+
+
+@pytest.mark.django_db
+def test_eligible_for_vote_ids_cached(django_assert_num_queries):
+    factories.GeneralSetupFactory(
+        valid_from=date(2015, 1, 1),
+        time_to_vote_since_membership=3,
+        time_unit_to_vote_since_membership=TimeUnit.MONTHS.value,
+        minimum_age_to_vote=18,
+        renewal_month=1,
+    )
+    tier = factories.TierFactory(needs_renewal=True, usable_from=date(2015, 1, 1))
+    participants = factories.ParticipantFactory.create_batch(2, date_of_birth=date(1990, 12, 1))
+    factories.MembershipFactory(
+        participant=participants[0],
+        tier=tier,
+        effective_from=date(2019, 1, 1),
+        form_filled=date(2019, 1, 1),
+    )
+
+    assert list(get_eligible_for_vote_ids(date(2019, 12, 31))) == [participants[0].id]
+    with django_assert_num_queries(0):
+        assert list(get_eligible_for_vote_ids(date(2019, 12, 31))) == [participants[0].id]
+
+    factories.MembershipFactory(
+        participant=participants[1],
+        tier=tier,
+        effective_from=date(2019, 6, 1),
+        form_filled=date(2019, 6, 1),
+    )
+    assert list(get_eligible_for_vote_ids(date(2019, 12, 31))) == [p.id for p in participants]
@@ -0,0 +1,105 @@
+import pytest
+from django.forms import inlineformset_factory
+from django.http import QueryDict
+
+from apps.membership import models
+from apps.membership.tests import factories
+from common.utils.form import RequiredOnceInlineFormSet, paginated_inline_formset_builder
+
+pytestmark = pytest.mark.django_db
+
+
+def build_formset_cls(formset):
+    return inlineformset_factory(
+        models.Participant,
+        models.EmergencyContact,
+        formset=formset,
+        fields=['full_name', 'phone', 'relation'],
+        extra=1,
+        can_delete=False,
+    )
+
+
+def create_emergency_contacts(participant, amount):
+    return [
+        models.EmergencyContact.objects.create(
+            participant=participant, full_name=f'Contact {i}', phone='123', relation='Friend'
+        )
+        for i in range(amount)
+    ]
+
+
+class TestRequiredOnceInlineFormSet:
+    def test_required_without_objects(self, django_assert_num_queries):
+        participant = factories.ParticipantFactory()
+        formset = build_formset_cls(RequiredOnceInlineFormSet)(instance=participant)
+
+        with django_assert_num_queries(1):
+            forms = formset.forms
+
+        assert [form.empty_permitted for form in forms] == [False]
+
+    def test_not_required_with_objects(self, django_assert_num_queries):
+        participant = factories.ParticipantFactory()
+        create_emergency_contacts(participant, 3)
+        formset = build_formset_cls(RequiredOnceInlineFormSet)(instance=participant)
+
+        with django_assert_num_queries(1):
+            forms = formset.forms
+
+        assert len(forms) == 4
+        assert forms[-1].empty_permitted is True
+
+    def test_bound_checks_existence_once(self, django_assert_num_queries):
+        participant = factories.ParticipantFactory()
+        formset = build_formset_cls(RequiredOnceInlineFormSet)(
+            instance=participant,
+            data={
+                'emergency_contacts-TOTAL_FORMS': '2',
+                'emergency_contacts-INITIAL_FORMS': '0',
+            },
+        )
+
+        with django_assert_num_queries(1):
+            forms = formset.forms
+
+        assert [form.empty_permitted for form in forms] == [False, False]
+
+
+class TestPaginatedInlineFormSet:
+    @pytest.mark.parametrize(
+        ['page_number', 'expected_names'],
+        [
+            (1, ['Contact 0', 'Contact 1']),
+            (2, ['Contact 2', 'Contact 3']),
+            (3, ['Contact 4']),
+            ('invalid', ['Contact 0', 'Contact 1']),
+            (10, ['Contact 4']),
+        ],
+    )
+    def test_page(self, page_number, expected_names, django_assert_num_queries):
+        participant = factories.ParticipantFactory()
+        create_emergency_contacts(participant, 5)
+        formset_cls = build_formset_cls(paginated_inline_formset_builder(2))
+        formset_cls.page_number = page_number
+        formset = formset_cls(instance=participant)
+
+        with django_assert_num_queries(2):
+            forms = formset.forms
+
+        assert [form.instance.full_name for form in forms[:-1]] == expected_names
+        assert forms[-1].empty_permitted is True
+
+    def test_page_query_keeps_other_parameters(self):
+        participant = factories.ParticipantFactory()
+        create_emergency_contacts(participant, 5)
+        formset_cls = build_formset_cls(paginated_inline_formset_builder(2))
+        formset_cls.page_number = 2
+        formset_cls.query = QueryDict('_changelist_filters=q%3Djon&other-page=3&emergency-page=2')
+        formset = formset_cls(instance=participant, prefix='emergency')
+
+        assert QueryDict(formset.previous_page_query) == QueryDict(
+            '_changelist_filters=q%3Djon&other-page=3&emergency-page=1'
+        )
+        assert QueryDict(formset.next_page_query)['emergency-page'] == '3'
+        assert QueryDict(formset.next_page_query)['other-page'] == '3'
@@ -0,0 +1,103 @@
+from datetime import date
+
+import pytest
+from django.urls import reverse
+
+from apps.membership import models
+from apps.membership.tests import factories
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def client_admin(client, django_user_model):
+    user = django_user_model.objects.create_superuser('admin', 'admin@example.com', 'pw')
+    client.force_login(user)
+    factories.GeneralSetupFactory(valid_from=date(2015, 1, 1))
+    return client
+
+
+@pytest.fixture
+def participant():
+    participant = factories.ParticipantFactory(date_of_birth=date(1990, 1, 1))
+    models.ContactInfo.objects.create(
+        participant=participant,
+        address='Main street',
+        postcode='20001',
+        phone='600000000',
+        email='john@example.com',
+    )
+    return participant
+
+
+def get_change_data(participant, name):
+    return dict(
+        name=name,
+        surname=participant.surname,
+        date_of_birth=participant.date_of_birth.isoformat(),
+        participation_form_filled_on=participant.participation_form_filled_on.isoformat(),
+    )
+
+
+def test_change_view_without_inlines(client_admin, participant):
+    url = reverse('admin:membership_participant_change', args=[participant.pk])
+    response = client_admin.get(url)
+
+    assert response.status_code == 200
+    assert response.context['inline_admin_formsets'] == []
+    assert [section['url'] for section in response.context['lazy_inlines']] == [
+        reverse('admin:membership_participant_inline', args=[participant.pk, prefix])
+        for prefix in ('contact_info', 'emergency_contacts', 'health_info')
+    ]
+
+
+def test_change_view_includes_inline_media(client_admin, participant):
+    response = client_admin.get(
+        reverse('admin:membership_participant_change', args=[participant.pk])
+    )
+
+    # Needed to initialize the sections once they are fetched
+    assert '/static/admin/js/inlines.js' in response.context['media'].render()
+
+
+def test_inline_view(client_admin, participant):
+    response = client_admin.get(
+        reverse('admin:membership_participant_inline', args=[participant.pk, 'contact_info'])
+    )
+
+    assert response.status_code == 200
+    assert b'john@example.com' in response.content
+    assert b'contact_info-TOTAL_FORMS' in response.content
+
+
+def test_inline_view_unknown_prefix(client_admin, participant):
+    response = client_admin.get(
+        reverse('admin:membership_participant_inline', args=[participant.pk, 'memberships'])
+    )
+
+    assert response.status_code == 404
+
+
+def test_save_validates_the_inlines_not_loaded(client_admin, participant):
+    url = reverse('admin:membership_participant_change', args=[participant.pk])
+    # Required for the participant, which has no emergency contacts
+    response = client_admin.post(url, get_change_data(participant, 'Jack'))
+
+    assert response.status_code == 200
+    assert [
+        bool(inline_admin_formset.formset.errors[0])
+        for inline_admin_formset in response.context['inline_admin_formsets']
+    ] == [False, True, False]
+    participant.refresh_from_db()
+    assert participant.name != 'Jack'
+
+    models.EmergencyContact.objects.create(
+        participant=participant, full_name='Jane', phone='600000001', relation='Sister'
+    )
+    models.HealthInfo.objects.create(participant=participant, height=180)
+    response = client_admin.post(url, get_change_data(participant, 'Jack'))
+
+    assert response.status_code == 302
+    participant.refresh_from_db()
+    assert participant.name == 'Jack'
+    assert participant.contact_info.get().email == 'john@example.com'
@@ -6,6 +6,7 @@ from django.core.exceptions import ValidationError
 from freezegun import freeze_time
 
 from apps.membership import models
+from apps.membership.constants import TimeUnit
 from apps.membership.tests import factories
 
 pytestmark = pytest.mark.django_db
@@ -365,6 +366,26 @@ class TestMembership(RequiresGeneralSetup):
         assert membership.effective_until == expected_until
         assert membership.group_first_membership is None
 
+    def test_save_increments_membership_counts(self):
+        tier = factories.TierFactory()
+        other_tier = factories.TierFactory(member_type=tier.member_type)
+        assert not tier.in_use
+        assert not tier.member_type.in_use
+
+        membership = factories.MembershipFactory(tier=tier, effective_until=date(2019, 12, 31))
+        factories.MembershipFactory(tier=other_tier, effective_until=date(2019, 12, 31))
+        membership.notes = 'Updated'
+        membership.save()
+
+        tier.refresh_from_db()
+        other_tier.refresh_from_db()
+        tier.member_type.refresh_from_db()
+        assert tier.membership_count == 1
+        assert tier.in_use
+        assert other_tier.membership_count == 1
+        assert tier.member_type.membership_count == 2
+        assert tier.member_type.in_use
+
 
 class TestMembershipPeriod(RequiresGeneralSetup):
     def test_correct_grouping(self):
@@ -465,3 +486,37 @@ class TestMembershipPeriod(RequiresGeneralSetup):
                 'effective_until': date(2018, 12, 31),
             },
         ]
+
+
+class TestGeneralSetupPeriod:
+    def test_periods(self):
+        setup1 = factories.GeneralSetupFactory(
+            valid_from=date(2015, 1, 1),
+            minimum_age_to_vote=18,
+            time_to_vote_since_membership=3,
+            time_unit_to_vote_since_membership=TimeUnit.MONTHS.value,
+        )
+        setup2 = factories.GeneralSetupFactory(
+            valid_from=date(2019, 1, 1),
+            minimum_age_to_vote=16,
+            time_to_vote_since_membership=10,
+            time_unit_to_vote_since_membership=TimeUnit.DAYS.value,
+        )
+
+        period1, period2 = models.GeneralSetupPeriod.objects.order_by('valid_from')
+        assert period1.general_setup_id == setup1.id
+        assert (period1.valid_from, period1.valid_until) == (date(2015, 1, 1), date(2019, 1, 1))
+        assert period2.general_setup_id == setup2.id
+        assert (period2.valid_from, period2.valid_until) == (date(2019, 1, 1), None)
+        assert period2.minimum_age_to_vote == timedelta(days=16 * 365)
+        assert period2.time_to_vote_since_membership == timedelta(days=10)
+
+        for ref_date, expected in [
+            (date(2014, 12, 31), None),
+            (date(2018, 12, 31), setup1),
+            (date(2019, 1, 1), setup2),
+            (date(2030, 1, 1), setup2),
+        ]:
+            period = models.GeneralSetupPeriod.objects.filter(validity__contains=ref_date).first()
+            assert (period and period.general_setup) == expected
+            assert models.GeneralSetup.get_for_date(ref_date) == expected
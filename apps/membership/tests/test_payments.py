@@ -0,0 +1,34 @@
+from datetime import date
+
+import pytest
+from django.db.models import Count
+
+from apps.membership import models
+from apps.membership.constants import PaymentMethod
+from apps.membership.payments import create_payments
+from apps.membership.tests import factories
+
+pytestmark = pytest.mark.django_db
+
+
+def test_create_payments(django_assert_num_queries):
+    tier = factories.TierFactory(usable_from=date(2015, 1, 1))
+    memberships = factories.MembershipFactory.create_batch(
+        10, tier=tier, effective_from=date(2019, 3, 1)
+    )
+    memberships[0].paid_on = date(2019, 3, 1)
+    models.Membership.objects.filter(pk=memberships[0].pk).update(paid_on=date(2019, 3, 1))
+    amounts = {membership: 10 for membership in memberships}
+    amounts[memberships[-1]] = 0
+
+    # Savepoint, insert, rollups, paid_on update, participant summaries and the savepoint release
+    with django_assert_num_queries(6):
+        payments = create_payments(
+            amounts, PaymentMethod.PAYMENT_METHOD_CASH.name, paid_on=date(2019, 4, 1)
+        )
+
+    assert len(payments) == 9
+    paid_on_counts = models.Membership.objects.values_list('paid_on').annotate(Count('id'))
+    assert dict(paid_on_counts) == {date(2019, 3, 1): 1, date(2019, 4, 1): 8, None: 1}
+    rollup = models.PaymentRollup.objects.get(tier=tier)
+    assert (rollup.amount_paid, rollup.payment_count) == (90, 9)
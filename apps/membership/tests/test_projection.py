@@ -0,0 +1,80 @@
+import pytest
+from django.contrib import admin
+
+from apps.membership import models
+from apps.membership.tests import factories
+from common.utils.admin import get_projection, get_template_fields, project_queryset
+
+pytestmark = pytest.mark.django_db
+
+
+def test_projection_of_columns_and_relations():
+    assert get_projection(
+        models.Membership, ['effective_from', 'tier_id', 'participant__family__family_name']
+    ) == (
+        [
+            'effective_from',
+            'id',
+            'participant',
+            'participant__family',
+            'participant__family__family_name',
+            'tier',
+        ],
+        ['participant', 'participant__family'],
+    )
+    assert get_projection(models.Participant, ['summary__surname']) == (
+        ['id', 'summary__surname'],
+        ['summary'],
+    )
+
+
+@pytest.mark.parametrize('name', ['full_name', 'memberships', 'memberships__effective_from'])
+def test_no_projection_of_properties_and_many_valued_relations(name):
+    assert get_projection(models.Participant, ['name', name]) is None
+
+
+def test_project_queryset():
+    factories.ParticipantFactory()
+
+    participant = project_queryset(
+        models.Participant.objects.select_related('family'), ['name', 'summary__surname']
+    ).get()
+
+    assert participant.get_deferred_fields() == {
+        'created_at',
+        'updated_at',
+        'surname',
+        'date_of_birth',
+        'family_id',
+        'participation_form_filled_on',
+    }
+    assert participant.summary.surname
+
+
+def test_template_fields():
+    assert get_template_fields('col/participant_export.html', 'participant') == [
+        'name',
+        'surname',
+    ]
+
+
+def test_participant_list_projection():
+    model_admin = admin.site._registry[models.Participant]
+
+    names = model_admin.get_list_projection(None, ['action_checkbox'] + model_admin.list_display)
+    fields, relations = get_projection(models.Participant, names)
+
+    assert relations == ['summary']
+    assert 'summary__family_name' in fields
+    assert 'participation_form_filled_on' not in fields
+
+
+def test_tier_list_projection():
+    model_admin = admin.site._registry[models.Tier]
+
+    names = model_admin.get_list_projection(None, ['action_checkbox'] + model_admin.list_display)
+    fields, relations = get_projection(models.Tier, names)
+
+    # The member type is joined instead of looked up per row
+    assert relations == ['member_type']
+    assert 'member_type__type_name' in fields
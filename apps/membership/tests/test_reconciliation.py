@@ -0,0 +1,147 @@
+import io
+from datetime import date
+
+import pytest
+
+from apps.membership.constants import PaymentMethod
+from apps.membership.reconciliation import confirm_proposals, parse_amount, reconcile
+from apps.membership.tests import factories
+
+pytestmark = pytest.mark.django_db
+
+
+def build_statement(*lines):
+    return io.BytesIO('\n'.join(['Fecha;Importe;Ordenante;Concepto'] + list(lines)).encode())
+
+
+@pytest.fixture
+def tier():
+    return factories.TierFactory(usable_from=date(2015, 1, 1), base_amount=30)
+
+
+def create_membership(tier, name, surname, effective_from=date(2019, 3, 1), **kwargs):
+    return factories.MembershipFactory(
+        participant=factories.ParticipantFactory(name=name, surname=surname),
+        tier=tier,
+        effective_from=effective_from,
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize(
+    ['value', 'expected'],
+    [
+        ('30', 30),
+        ('1.234,50', 1235),
+        ('1,234.56', 1235),
+        ('1,234', 1234),
+        ('1.234', 1234),
+        ('1 234,5', 1235),
+        ('29.99', 30),
+        ('-30,00', -30),
+    ],
+)
+def test_parse_amount(value, expected):
+    assert parse_amount(value) == expected
+
+
+@pytest.mark.parametrize('value', ['', 'abc', '1,234,56', '1.234.5.6', '1234.567', '1,2345'])
+def test_parse_amount_invalid(value):
+    with pytest.raises(ValueError):
+        parse_amount(value)
+
+
+def test_reconcile(tier, django_assert_num_queries):
+    exact = create_membership(tier, 'Jon', 'Etxeberria')
+    by_name = create_membership(tier, 'Ane', 'Goikoetxea')
+    fuzzy = create_membership(tier, 'Miren', 'Agirre Lasa')
+    paid = create_membership(tier, 'Mikel', 'Arana')
+    factories.MembershipPaymentFactory(membership=paid, amount_paid=30)
+
+    statement = build_statement(
+        '02/03/2019;30,00;Jon Etxeberria;Cuota',
+        '03/03/2019;15,00;GOIKOETXEA ANE;',
+        '04/03/2019;30,00;Transferencia de AGUIRRE LASA MIREN;Cuota 2019',
+        '05/03/2019;30,00;Mikel Arana;Cuota',
+        '06/03/2019;-30,00;Comision;',
+        'not a date;30;Someone;',
+    )
+    with django_assert_num_queries(2):
+        reconciliation = reconcile(statement)
+
+    assert [
+        (proposal.line.line_number, proposal.membership, proposal.confidence)
+        for proposal in reconciliation.proposals[:2]
+    ] == [(2, exact, 1.0), (3, by_name, 0.6)]
+    assert [proposal.confirmed_by_default for proposal in reconciliation.proposals[:2]] == [
+        True,
+        False,
+    ]
+    assert reconciliation.proposals[2].membership == fuzzy
+    assert 0.4 <= reconciliation.proposals[2].confidence < 0.8
+    assert [line.line_number for line in reconciliation.unmatched] == [5]
+    assert reconciliation.errors == ['Line 7: the date or the amount are not valid']
+
+
+def test_reconcile_not_payable(tier):
+    create_membership(tier, 'Jon', 'Etxeberria')
+    create_membership(tier, 'Ane', 'Goikoetxea', effective_until=date(2019, 4, 1))
+    create_membership(tier, 'Miren', 'Agirre', effective_from=date(2019, 5, 1))
+
+    reconciliation = reconcile(
+        build_statement(
+            # More than what remains due
+            '02/04/2019;40;Jon Etxeberria;Cuota',
+            # Memberships no longer or not yet effective
+            '02/04/2019;30;Ane Goikoetxea;Cuota',
+            '03/04/2019;30;Miren Agirre;Cuota',
+        )
+    )
+
+    assert reconciliation.proposals == []
+    assert [line.line_number for line in reconciliation.unmatched] == [2, 3, 4]
+
+
+def test_confirm_proposals(tier):
+    membership = create_membership(tier, 'Jon', 'Etxeberria')
+    reconciliation = reconcile(
+        build_statement(
+            '02/03/2019;10;Jon Etxeberria;',
+            '05/03/2019;20;Jon Etxeberria;',
+            '06/03/2019;30;Jon Etxeberria;',
+        )
+    )
+    # Instalments are matched until nothing remains due
+    assert [proposal.confidence for proposal in reconciliation.proposals] == [0.6, 1.0]
+    assert [line.line_number for line in reconciliation.unmatched] == [4]
+
+    payments = confirm_proposals(
+        [proposal.value for proposal in reconciliation.proposals] + [f'{membership.pk}:20:bad:key']
+    )
+
+    assert len(payments) == 2
+    membership.refresh_from_db()
+    assert membership.paid_on == date(2019, 3, 2)
+    assert list(
+        membership.payments.order_by('id').values_list('amount_paid', 'payment_method')
+    ) == [
+        (10, PaymentMethod.PAYMENT_METHOD_TRANSFER.name),
+        (20, PaymentMethod.PAYMENT_METHOD_TRANSFER.name),
+    ]
+
+
+def test_confirm_proposals_once(tier):
+    membership = create_membership(tier, 'Jon', 'Etxeberria')
+    statement = ['02/03/2019;10;Jon Etxeberria;Cuota', '02/03/2019;10;Jon Etxeberria;Cuota']
+    values = [proposal.value for proposal in reconcile(build_statement(*statement)).proposals]
+    # Identical lines of a statement are different payments
+    assert len(set(values)) == 2
+
+    assert len(confirm_proposals(values)) == 2
+    assert confirm_proposals(values) == []
+
+    # Uploading the statement again along with a new line only proposes the new line
+    reconciliation = reconcile(build_statement(*statement, '03/03/2019;10;Jon Etxeberria;Cuota'))
+    assert [line.line_number for line in reconciliation.recorded] == [2, 3]
+    assert [proposal.line.line_number for proposal in reconciliation.proposals] == [4]
+    assert membership.payments.count() == 2
@@ -0,0 +1,116 @@
+from datetime import date
+from unittest import mock
+
+import pytest
+
+from apps.membership import models
+from apps.membership.reference_data import TierRecord, UsableTierIndex, reference_data
+from apps.membership.tests import factories
+
+pytestmark = pytest.mark.django_db
+
+
+def build_tier_record(tier_id, usable_from, usable_until=None):
+    return TierRecord(
+        id=tier_id,
+        name=f'Tier {tier_id}',
+        usable_from=usable_from,
+        usable_until=usable_until,
+        member_type_id=1,
+        can_vote=True,
+        needs_renewal=False,
+        base_amount=10,
+        replaced_by_id=None,
+    )
+
+
+class TestUsableTierIndex:
+    @pytest.mark.parametrize(
+        ['ref_date', 'expected_ids'],
+        [
+            (date(2018, 12, 31), []),
+            (date(2019, 1, 1), [1]),
+            (date(2019, 6, 1), [1, 2]),
+            (date(2019, 12, 31), [1, 2]),
+            (date(2020, 1, 1), [2, 3]),
+            (date(2030, 1, 1), [2, 3]),
+        ],
+    )
+    def test_get_usable(self, ref_date, expected_ids):
+        index = UsableTierIndex(
+            [
+                build_tier_record(1, date(2019, 1, 1), date(2020, 1, 1)),
+                build_tier_record(2, date(2019, 6, 1)),
+                build_tier_record(3, date(2020, 1, 1)),
+            ]
+        )
+        assert [tier.id for tier in index.get_usable(ref_date)] == expected_ids
+
+    def test_get_usable_empty(self):
+        assert UsableTierIndex([]).get_usable(date(2019, 1, 1)) == ()
+
+
+class TestReferenceDataRegistry:
+    def test_get_tier_loads_once(self, django_assert_num_queries):
+        tier = factories.TierFactory()
+
+        with django_assert_num_queries(2):
+            record = reference_data.get_tier(tier.pk)
+        with django_assert_num_queries(0):
+            assert reference_data.get_tier(tier.pk) is record
+            assert reference_data.get_member_type(tier.member_type_id).type_name == (
+                tier.member_type.type_name
+            )
+
+        assert record.name == tier.name
+        assert record.needs_renewal == tier.needs_renewal
+
+    def test_save_invalidates(self):
+        tier = factories.TierFactory()
+        assert reference_data.get_tier(tier.pk).name == tier.name
+
+        tier.name = 'Renamed'
+        tier.save()
+
+        assert reference_data.get_tier(tier.pk).name == 'Renamed'
+
+    def test_version_change_invalidates(self):
+        tier = factories.TierFactory()
+        reference_data.get_tier(tier.pk)
+
+        models.Tier.objects.filter(pk=tier.pk).update(name='Renamed')
+        assert reference_data.get_tier(tier.pk).name == tier.name
+
+        # Simulate an invalidation coming from another worker
+        reference_data._data.version = 'outdated'
+        assert reference_data.get_tier(tier.pk).name == 'Renamed'
+
+    def test_data_checks_version_once(self, django_assert_num_queries):
+        tier = factories.TierFactory()
+        data = reference_data.data
+
+        with mock.patch('apps.membership.reference_data.get_version') as get_version:
+            with django_assert_num_queries(0):
+                assert data.get_tier(tier.pk).name == tier.name
+                assert data.get_member_type(tier.member_type_id).type_name == (
+                    tier.member_type.type_name
+                )
+                replacement = data.get_usable_replacement(tier.pk, tier.usable_from)
+                assert replacement == data.tiers[tier.pk]
+            get_version.assert_not_called()
+
+        with pytest.raises(models.Tier.DoesNotExist):
+            data.get_tier(0)
+
+    def test_get_tier_missing(self, django_assert_num_queries):
+        with pytest.raises(models.Tier.DoesNotExist):
+            reference_data.get_tier(0)
+
+        # Only reloaded again once the version changes
+        with django_assert_num_queries(0), pytest.raises(models.Tier.DoesNotExist):
+            reference_data.get_tier(0)
+
+    def test_record_immutable(self):
+        record = reference_data.get_tier(factories.TierFactory().pk)
+        with pytest.raises(AttributeError):
+            record.name = 'Renamed'
@@ -0,0 +1,82 @@
+from datetime import date
+from unittest import mock
+
+import pytest
+from django.core import mail
+
+from apps.membership import models
+from apps.membership.reminders import get_memberships_to_remind, send_renewal_reminders
+from apps.membership.tests import factories
+
+pytestmark = pytest.mark.django_db
+
+TODAY = date(2019, 12, 15)
+
+
+@pytest.fixture(autouse=True)
+def general_setup():
+    return factories.GeneralSetupFactory(valid_from=date(2015, 1, 1), renewal_month=1)
+
+
+@pytest.fixture
+def tier():
+    return factories.TierFactory(usable_from=date(2015, 1, 1), needs_renewal=True)
+
+
+def create_membership(tier, effective_from, email='member@example.com', **kwargs):
+    membership = factories.MembershipFactory(tier=tier, effective_from=effective_from, **kwargs)
+    if email is not None:
+        models.ContactInfo.objects.create(participant=membership.participant, email=email)
+    return membership
+
+
+def test_get_memberships_to_remind(tier):
+    expiring = create_membership(tier, date(2019, 3, 1))
+    create_membership(
+        factories.TierFactory(usable_from=date(2015, 1, 1), needs_renewal=False),
+        date(2019, 3, 1),
+        effective_until=date(2019, 12, 31),
+    )
+    renewed = create_membership(tier, date(2019, 3, 1))
+    models.Membership.objects.create(
+        participant=renewed.participant,
+        tier=tier,
+        effective_from=date(2020, 1, 1),
+        form_filled=date(2019, 12, 1),
+    )
+    reminded = create_membership(tier, date(2019, 3, 1))
+    models.RenewalReminder.objects.create(membership=reminded, email='member@example.com')
+
+    assert list(get_memberships_to_remind(30, today=TODAY)) == [expiring]
+    assert list(get_memberships_to_remind(10, today=TODAY)) == []
+
+
+def test_send_renewal_reminders(tier, django_assert_max_num_queries):
+    memberships = [create_membership(tier, date(2019, 3, i)) for i in range(1, 6)]
+    create_membership(tier, date(2019, 3, 1), email=None)
+
+    with mock.patch('apps.membership.reminders.get_connection') as get_connection:
+        get_connection.return_value = mail.get_connection()
+        result = send_renewal_reminders(30, batch_size=2, today=TODAY)
+
+    get_connection.assert_called_once_with()
+    assert result.sent == 5
+    assert result.without_email == 1
+    assert len(mail.outbox) == 5
+    assert mail.outbox[0].to == ['member@example.com']
+    assert '31/12/2019' in mail.outbox[0].subject
+    assert set(models.RenewalReminder.objects.values_list('membership_id', flat=True)) == {
+        membership.pk for membership in memberships
+    }
+
+    with django_assert_max_num_queries(3):
+        assert send_renewal_reminders(30, batch_size=2, today=TODAY).sent == 0
+    assert len(mail.outbox) == 5
+
+
+def test_send_renewal_reminders_dry_run(tier):
+    create_membership(tier, date(2019, 3, 1))
+
+    assert send_renewal_reminders(30, dry_run=True, today=TODAY).sent == 1
+    assert len(mail.outbox) == 0
+    assert not models.RenewalReminder.objects.exists()
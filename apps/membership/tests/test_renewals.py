@@ -0,0 +1,114 @@
+from datetime import date
+
+import pytest
+
+from apps.membership import models
+from apps.membership.renewals import apply_renewals, get_expiring, plan_renewals
+from apps.membership.tests import factories
+
+pytestmark = pytest.mark.django_db
+
+TODAY = date(2019, 12, 15)
+
+
+@pytest.fixture(autouse=True)
+def general_setup():
+    return factories.GeneralSetupFactory(valid_from=date(2015, 1, 1), renewal_month=1)
+
+
+@pytest.fixture
+def tier():
+    return factories.TierFactory(usable_from=date(2015, 1, 1), needs_renewal=True)
+
+
+def test_plan_renewals_same_tier(tier):
+    membership = factories.MembershipFactory(tier=tier, effective_from=date(2019, 3, 1))
+
+    [plan] = plan_renewals(models.Membership.objects.all())
+
+    assert plan.conflict is None
+    assert plan.membership == membership
+    assert plan.tier.id == tier.id
+    assert plan.effective_from == date(2020, 1, 1)
+    assert plan.effective_until == date(2020, 12, 31)
+
+
+def test_plan_renewals_replaced_tier(tier):
+    membership = factories.MembershipFactory(tier=tier, effective_from=date(2019, 3, 1))
+    replacement = factories.TierFactory(usable_from=date(2020, 1, 1), needs_renewal=True)
+    tier.usable_until = date(2019, 12, 31)
+    tier.replaced_by = replacement
+    tier.save()
+
+    [plan] = plan_renewals(models.Membership.objects.filter(pk=membership.pk))
+
+    assert plan.conflict is None
+    assert plan.current_tier.name == tier.name
+    assert plan.tier.id == replacement.id
+
+
+def test_plan_renewals_conflicts(tier):
+    expired_tier = factories.TierFactory(
+        usable_from=date(2015, 1, 1), usable_until=date(2019, 12, 31), needs_renewal=True
+    )
+    without_replacement = factories.MembershipFactory(
+        tier=expired_tier, effective_from=date(2019, 3, 1)
+    )
+    renewed = factories.MembershipFactory(tier=tier, effective_from=date(2018, 3, 1))
+    factories.MembershipFactory(
+        participant=renewed.participant, tier=tier, effective_from=date(2019, 1, 1)
+    )
+    not_renewing = factories.MembershipFactory(
+        tier=factories.TierFactory(usable_from=date(2015, 1, 1), needs_renewal=False),
+        effective_from=date(2019, 3, 1),
+    )
+
+    plans = {
+        plan.membership: plan
+        for plan in plan_renewals(
+            models.Membership.objects.filter(
+                pk__in=[without_replacement.pk, renewed.pk, not_renewing.pk]
+            )
+        )
+    }
+
+    assert 'no replacement' in plans[without_replacement].conflict
+    assert 'later membership' in plans[renewed].conflict
+    assert 'does not need renewal' in plans[not_renewing].conflict
+
+
+def test_get_expiring(tier):
+    expiring = factories.MembershipFactory(tier=tier, effective_from=date(2019, 3, 1))
+    factories.MembershipFactory(tier=tier, effective_from=date(2018, 3, 1))
+    renewed = factories.MembershipFactory(tier=tier, effective_from=date(2019, 3, 1))
+    factories.MembershipFactory(
+        participant=renewed.participant, tier=tier, effective_from=date(2020, 1, 1)
+    )
+
+    assert list(get_expiring(models.Membership.objects.all(), TODAY)) == [expiring]
+
+
+def test_apply_renewals(tier, django_assert_num_queries):
+    first = factories.MembershipFactory(tier=tier, effective_from=date(2018, 3, 1))
+    second = factories.MembershipFactory(
+        participant=first.participant,
+        tier=tier,
+        effective_from=date(2019, 1, 1),
+        group_first_membership=first,
+    )
+    other = factories.MembershipFactory(tier=tier, effective_from=date(2019, 3, 1))
+    plans = plan_renewals(models.Membership.objects.filter(pk__in=[second.pk, other.pk]))
+
+    # Savepoint, insert, two counters, the rollups, the participant summaries and the savepoint
+    # release
+    with django_assert_num_queries(7):
+        renewals = apply_renewals(plans, form_filled=TODAY)
+
+    assert {
+        (renewal.participant_id, renewal.group_first_membership_id) for renewal in renewals
+    } == {(first.participant_id, first.pk), (other.participant_id, other.pk)}
+    assert all(renewal.effective_from == date(2020, 1, 1) for renewal in renewals)
+    tier.refresh_from_db()
+    assert tier.membership_count == 5
+    rollup = models.MembershipRollup.objects.get(month=date(2020, 1, 1), tier=tier)
+    assert rollup.membership_count == 2
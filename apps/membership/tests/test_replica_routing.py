@@ -0,0 +1,163 @@
+import time
+from datetime import date
+
+import pytest
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from apps.membership import models
+from apps.membership.data_versions import (
+    MEMBERSHIP_DATA,
+    bump_versions,
+    get_read_versions,
+    get_versions,
+    increment_versions,
+)
+from apps.membership.filters import (
+    ELIGIBILITY_DATA,
+    ELIGIBLE_FOR_VOTE_CACHE_KEY,
+    get_eligible_for_vote_ids,
+)
+from apps.membership.tests import factories
+from common.utils import db
+from common.utils.db import (
+    REPLICA_DB_ALIAS,
+    STICKY_COOKIE_NAME,
+    ReplicaRoutingMiddleware,
+    get_read_db,
+    read_from_replica,
+)
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def add_replica(**settings):
+    # A second connection to the test database, standing for the replica
+    connections.databases[REPLICA_DB_ALIAS] = {
+        **connections[DEFAULT_DB_ALIAS].settings_dict,
+        **settings,
+    }
+
+
+@pytest.fixture(autouse=True)
+def remove_replica():
+    yield
+    if REPLICA_DB_ALIAS in connections.databases:
+        connections[REPLICA_DB_ALIAS].close()
+        del connections.databases[REPLICA_DB_ALIAS]
+        delattr(connections._connections, REPLICA_DB_ALIAS)
+    db.replica_unavailable_until = 0
+
+
+@pytest.fixture
+def replica():
+    add_replica()
+
+
+def test_reads_from_primary_by_default(replica):
+    assert models.Participant.objects.all().db == DEFAULT_DB_ALIAS
+
+
+def test_reads_from_primary_without_replica():
+    with read_from_replica():
+        assert models.Participant.objects.all().db == DEFAULT_DB_ALIAS
+
+
+def test_reads_from_replica(replica):
+    participant = factories.ParticipantFactory()
+
+    with read_from_replica():
+        participants = models.Participant.objects.all()
+        assert participants.db == REPLICA_DB_ALIAS
+        assert list(participants) == [participant]
+
+    # Written to the primary even if read from the replica
+    assert participants[0]._state.db == REPLICA_DB_ALIAS
+    participants[0].save()
+    assert participants[0]._state.db == DEFAULT_DB_ALIAS
+
+
+def test_reads_from_primary_in_transaction(replica):
+    with transaction.atomic(), read_from_replica():
+        assert get_read_db() == DEFAULT_DB_ALIAS
+
+
+def test_versions_read_from_replica(replica):
+    bump_versions(MEMBERSHIP_DATA)
+    stored = get_versions(MEMBERSHIP_DATA)
+    # A write to the primary the replica has not received yet
+    increment_versions([MEMBERSHIP_DATA])
+
+    assert get_read_versions(MEMBERSHIP_DATA) == (stored[0] + 1,)
+    with read_from_replica():
+        assert get_read_versions(MEMBERSHIP_DATA) == stored
+
+
+def test_eligible_ids_cached_under_replica_versions(replica):
+    bump_versions(*ELIGIBILITY_DATA)
+    stored = get_versions(*ELIGIBILITY_DATA)
+    increment_versions(ELIGIBILITY_DATA)
+
+    get_eligible_for_vote_ids(date(2020, 1, 1))
+
+    key = ELIGIBLE_FOR_VOTE_CACHE_KEY.format(
+        versions='.'.join(str(version) for version in stored), date='2020-01-01'
+    )
+    assert cache.get(key) is not None
+
+
+def test_falls_back_to_primary(caplog):
+    add_replica(PORT='1')
+
+    with read_from_replica():
+        assert get_read_db() == DEFAULT_DB_ALIAS
+    assert 'The replica is not available' in caplog.text
+    assert db.replica_unavailable_until > time.monotonic()
+
+
+def get_read_dbs(request, response_class=HttpResponse):
+    read_dbs = []
+
+    def view(request):
+        with read_from_replica():
+            read_dbs.append(get_read_db())
+        return response_class()
+
+    response = ReplicaRoutingMiddleware(view)(request)
+    return read_dbs, response
+
+
+def test_sticky_after_writes(replica):
+    read_dbs, response = get_read_dbs(RequestFactory().post('/'))
+
+    assert read_dbs == [REPLICA_DB_ALIAS]
+    primary_until = float(response.cookies[STICKY_COOKIE_NAME].value)
+
+    request = RequestFactory().get('/')
+    request.COOKIES[STICKY_COOKIE_NAME] = str(primary_until)
+    read_dbs, response = get_read_dbs(request)
+
+    assert read_dbs == [DEFAULT_DB_ALIAS]
+    assert STICKY_COOKIE_NAME not in response.cookies
+
+    request.COOKIES[STICKY_COOKIE_NAME] = str(time.time() - 1)
+    assert get_read_dbs(request)[0] == [REPLICA_DB_ALIAS]
+
+
+def test_sticky_while_streaming(replica):
+    read_dbs = []
+
+    def stream():
+        with read_from_replica():
+            read_dbs.append(get_read_db())
+            yield b''
+
+    request = RequestFactory().get('/')
+    request.COOKIES[STICKY_COOKIE_NAME] = str(time.time() + 10)
+    response = ReplicaRoutingMiddleware(lambda request: StreamingHttpResponse(stream()))(request)
+
+    assert read_dbs == []
+    b''.join(response.streaming_content)
+    assert read_dbs == [DEFAULT_DB_ALIAS]
@@ -0,0 +1,120 @@
+from datetime import date
+
+import pytest
+
+from apps.membership import models
+from apps.membership.constants import PaymentMethod
+from apps.membership.rollups import get_revenue_report, rebuild_rollups
+from apps.membership.tests import factories
+
+pytestmark = pytest.mark.django_db
+
+CASH = PaymentMethod.PAYMENT_METHOD_CASH.name
+CARD = PaymentMethod.PAYMENT_METHOD_CARD.name
+
+
+def get_rollups():
+    return (
+        sorted(
+            models.MembershipRollup.objects.values_list(
+                'month', 'tier_id', 'membership_count', 'expected_amount'
+            )
+        ),
+        sorted(
+            models.PaymentRollup.objects.values_list(
+                'month', 'tier_id', 'payment_method', 'amount_paid', 'payment_count'
+            )
+        ),
+    )
+
+
+@pytest.fixture
+def tier():
+    return factories.TierFactory(usable_from=date(2015, 1, 1), base_amount=30)
+
+
+@pytest.fixture
+def memberships(tier):
+    return [
+        factories.MembershipFactory(tier=tier, effective_from=date(2019, 11, 5)),
+        factories.MembershipFactory(tier=tier, effective_from=date(2019, 11, 20)),
+        factories.MembershipFactory(tier=tier, effective_from=date(2020, 1, 1)),
+    ]
+
+
+def test_membership_rollup(tier, memberships):
+    assert get_rollups()[0] == [
+        (date(2019, 11, 1), tier.pk, 2, 60),
+        (date(2020, 1, 1), tier.pk, 1, 30),
+    ]
+
+
+def test_payment_rollup_incremental(tier, memberships):
+    payment = factories.MembershipPaymentFactory(
+        membership=memberships[0], amount_paid=10, payment_method=CASH
+    )
+    factories.MembershipPaymentFactory(
+        membership=memberships[1], amount_paid=20, payment_method=CASH
+    )
+    factories.MembershipPaymentFactory(
+        membership=memberships[2], amount_paid=30, payment_method=CARD
+    )
+    assert get_rollups()[1] == [
+        (date(2019, 11, 1), tier.pk, CASH, 30, 2),
+        (date(2020, 1, 1), tier.pk, CARD, 30, 1),
+    ]
+
+    payment = models.MembershipPayment.objects.get(pk=payment.pk)
+    payment.amount_paid = 15
+    payment.payment_method = CARD
+    payment.save()
+    assert get_rollups()[1] == [
+        (date(2019, 11, 1), tier.pk, CARD, 15, 1),
+        (date(2019, 11, 1), tier.pk, CASH, 20, 1),
+        (date(2020, 1, 1), tier.pk, CARD, 30, 1),
+    ]
+
+    payment.delete()
+    assert get_rollups()[1] == [
+        (date(2019, 11, 1), tier.pk, CARD, 0, 0),
+        (date(2019, 11, 1), tier.pk, CASH, 20, 1),
+        (date(2020, 1, 1), tier.pk, CARD, 30, 1),
+    ]
+
+
+def test_rebuild_matches_incremental(tier, memberships):
+    for membership, amount in zip(memberships, (10, 20, 30)):
+        factories.MembershipPaymentFactory(
+            membership=membership, amount_paid=amount, payment_method=CASH
+        )
+    incremental = get_rollups()
+
+    models.PaymentRollup.objects.all().delete()
+    models.MembershipRollup.objects.update(membership_count=0)
+    rebuild_rollups()
+
+    assert get_rollups() == incremental
+
+
+def test_get_revenue_report(tier, memberships, django_assert_num_queries):
+    factories.MembershipPaymentFactory(
+        membership=memberships[0], amount_paid=10, payment_method=CASH
+    )
+    factories.MembershipPaymentFactory(
+        membership=memberships[1], amount_paid=20, payment_method=CARD
+    )
+
+    report = get_revenue_report(2019)
+    with django_assert_num_queries(2):
+        report = get_revenue_report(2019)
+
+    assert report.payment_methods == [method.value for method in PaymentMethod]
+    assert len(report.tiers) == 1
+    assert report.tiers[0].tier == str(tier)
+    assert report.tiers[0].by_payment_method == [10, 0, 20]
+    assert report.paid == 30
+    assert report.expected == 60
+    assert report.outstanding == 30
+    assert report.by_month == {date(2019, 11, 1): 30}
+
+    assert get_revenue_report(2020).outstanding == 30
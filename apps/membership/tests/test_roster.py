@@ -0,0 +1,207 @@
+import csv
+import io
+from datetime import date
+
+import pytest
+from dateutil.relativedelta import relativedelta
+from django.utils import timezone
+from openpyxl import Workbook
+
+from apps.membership import models
+from apps.membership.forms import UNDER_AGED_WITHOUT_ADULT_ERROR, UNDER_AGED_WITHOUT_FAMILY_ERROR
+from apps.membership.roster import ROSTER_COLUMNS, UNKNOWN_FAMILY_ERROR, import_roster
+from apps.membership.tests import factories
+
+pytestmark = pytest.mark.django_db
+
+CHILD_DATE_OF_BIRTH = (timezone.now() - relativedelta(years=10)).date()
+
+
+def build_row(**kwargs):
+    row = dict(
+        name='Jane',
+        surname='Doe',
+        date_of_birth='01/02/1980',
+        participation_form_filled_on='01/09/2019',
+        family_name='',
+        family_id='',
+        address='1 Main Street',
+        postcode='12345',
+        phone='600000000',
+        email='jane@example.com',
+        emergency_contact_name='',
+        emergency_contact_phone='',
+        emergency_contact_relation='',
+        height='',
+        weight='',
+        health_info='',
+    )
+    row.update(kwargs)
+    return row
+
+
+def build_csv(rows):
+    content = io.StringIO()
+    writer = csv.DictWriter(content, fieldnames=ROSTER_COLUMNS)
+    writer.writeheader()
+    writer.writerows(rows)
+    return io.BytesIO(content.getvalue().encode())
+
+
+def test_import_roster():
+    result = import_roster(
+        build_csv(
+            [
+                build_row(
+                    family_name='Doe',
+                    emergency_contact_name='John Doe',
+                    emergency_contact_phone='611111111',
+                    emergency_contact_relation='Husband',
+                    height='170',
+                    health_info='Asthma',
+                ),
+                build_row(
+                    name='Jimmy',
+                    date_of_birth=CHILD_DATE_OF_BIRTH.strftime('%d/%m/%Y'),
+                    family_name='Doe',
+                    address='',
+                    postcode='',
+                    phone='',
+                    email='',
+                ),
+            ]
+        ),
+        'roster.csv',
+    )
+
+    assert result.errors == []
+    assert (result.imported, result.families_created) == (2, 1)
+    jane = models.Participant.objects.get(name='Jane')
+    jimmy = models.Participant.objects.get(name='Jimmy')
+    assert jane.family == jimmy.family
+    assert jane.family.family_name == 'Doe'
+    assert jane.date_of_birth == date(1980, 2, 1)
+    assert list(jane.contact_info.values_list('email', 'phone')) == [
+        ('jane@example.com', '600000000')
+    ]
+    assert list(jane.emergency_contacts.values_list('full_name', 'relation')) == [
+        ('John Doe', 'Husband')
+    ]
+    assert list(jane.health_info.values_list('height', 'weight', 'info')) == [
+        (170, None, 'Asthma')
+    ]
+    assert not jimmy.contact_info.exists()
+    assert not jimmy.emergency_contacts.exists()
+    assert not jimmy.health_info.exists()
+
+
+def test_import_roster_errors():
+    child_date_of_birth = CHILD_DATE_OF_BIRTH.strftime('%d/%m/%Y')
+    result = import_roster(
+        build_csv(
+            [
+                build_row(email=''),
+                build_row(date_of_birth='31/02/1980'),
+                build_row(date_of_birth=child_date_of_birth),
+                build_row(date_of_birth=child_date_of_birth, family_name='Without adults'),
+                build_row(emergency_contact_name='John Doe'),
+                build_row(weight='70'),
+                build_row(name='Valid'),
+            ]
+        ),
+        'roster.csv',
+    )
+
+    assert result.imported == 1
+    assert models.Participant.objects.get().name == 'Valid'
+    assert [(error.row_number, sorted(error.errors)) for error in result.errors] == [
+        (2, ['email']),
+        (3, ['date_of_birth']),
+        (4, ['family_name']),
+        (5, ['family_name']),
+        (6, ['emergency_contact_phone', 'emergency_contact_relation']),
+        (7, ['height']),
+    ]
+    assert result.errors[2].errors['family_name'] == [UNDER_AGED_WITHOUT_FAMILY_ERROR]
+    assert result.errors[3].errors['family_name'] == [UNDER_AGED_WITHOUT_ADULT_ERROR]
+
+
+def test_import_roster_existing_family():
+    family = models.Family.objects.create(family_name='Doe')
+    factories.ParticipantFactory(family=family, date_of_birth=date(1980, 1, 1))
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(ROSTER_COLUMNS)
+    row = build_row(name='Jimmy', date_of_birth=CHILD_DATE_OF_BIRTH, family_id=family.id)
+    sheet.append([row[column] or None for column in ROSTER_COLUMNS])
+    content = io.BytesIO()
+    workbook.save(content)
+    content.seek(0)
+
+    result = import_roster(content, 'roster.xlsx')
+
+    assert result.errors == []
+    assert (result.imported, result.families_created) == (1, 0)
+    assert models.Participant.objects.get(name='Jimmy').family == family
+
+
+def test_import_roster_family_name_not_matched():
+    family = models.Family.objects.create(family_name='Doe')
+    factories.ParticipantFactory(family=family, date_of_birth=date(1980, 1, 1))
+    child_date_of_birth = CHILD_DATE_OF_BIRTH.strftime('%d/%m/%Y')
+
+    result = import_roster(
+        build_csv(
+            [
+                build_row(name='Jimmy', date_of_birth=child_date_of_birth, family_name='Doe'),
+                build_row(name='John', family_name='Doe'),
+                build_row(
+                    name='Jenny', date_of_birth=child_date_of_birth, family_id=family.id + 1
+                ),
+            ]
+        ),
+        'roster.csv',
+    )
+
+    assert [(error.row_number, error.errors) for error in result.errors] == [
+        (4, dict(family_id=[UNKNOWN_FAMILY_ERROR]))
+    ]
+    assert (result.imported, result.families_created) == (2, 1)
+    jimmy = models.Participant.objects.get(name='Jimmy')
+    assert jimmy.family != family
+    assert jimmy.family == models.Participant.objects.get(name='John').family
+
+
+def test_import_roster_workers():
+    child_date_of_birth = CHILD_DATE_OF_BIRTH.strftime('%d/%m/%Y')
+    rows = []
+    for i in range(20):
+        rows.append(build_row(name=f'Adult {i}', family_name=f'Family {i % 3}', height='170'))
+        rows.append(build_row(name=f'Child {i}', date_of_birth=child_date_of_birth))
+        rows.append(
+            build_row(
+                name=f'Child {i}', date_of_birth=child_date_of_birth, family_name=f'Family {i % 4}'
+            )
+        )
+    content = build_csv(rows).getvalue()
+
+    def import_and_clear(**kwargs):
+        result = import_roster(io.BytesIO(content), 'roster.csv', **kwargs)
+        participants = list(
+            models.Participant.objects.order_by('id').values_list(
+                'name', 'family__family_name', 'contact_info__email', 'health_info__height'
+            )
+        )
+        families = list(models.Family.objects.order_by('id').values_list('family_name', flat=True))
+        models.ContactInfo.objects.all().delete()
+        models.HealthInfo.objects.all().delete()
+        models.Participant.objects.all().delete()
+        models.Family.objects.all().delete()
+        return result, participants, families
+
+    single_process = import_and_clear()
+
+    assert single_process[0].imported == 35
+    assert len(single_process[0].errors) == 25
+    assert import_and_clear(workers=3, chunk_size=4) == single_process
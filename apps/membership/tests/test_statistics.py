@@ -0,0 +1,92 @@
+from datetime import date
+
+import pytest
+
+from apps.membership import models
+from apps.membership.statistics import (
+    MembershipEvents,
+    compute_membership_statistics,
+    get_membership_statistics,
+    get_months,
+)
+from apps.membership.tests import factories
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def general_setup():
+    return factories.GeneralSetupFactory(valid_from=date(2015, 1, 1), renewal_month=1)
+
+
+def test_get_months():
+    assert get_months(date(2019, 11, 15), date(2020, 2, 1)) == [
+        date(2019, 11, 1),
+        date(2019, 12, 1),
+        date(2020, 1, 1),
+        date(2020, 2, 1),
+    ]
+
+
+def test_count_active_matches_is_active_on():
+    ranges = [
+        (date(2019, 1, 1), date(2019, 12, 31)),
+        (date(2019, 3, 15), None),
+        (date(2019, 6, 1), date(2019, 7, 1)),
+        (date(2020, 1, 1), date(2020, 12, 31)),
+    ]
+    events = MembershipEvents()
+    for effective_from, effective_until in ranges:
+        events.add(effective_from, effective_until)
+
+    months = get_months(date(2018, 12, 1), date(2021, 1, 1))
+    expected = [
+        sum(
+            models.Membership(effective_from=f, effective_until=u).is_active_on(month)
+            for f, u in ranges
+        )
+        for month in months
+    ]
+    assert events.sort().count_active(months) == expected
+
+
+def test_compute_membership_statistics():
+    tier = factories.TierFactory(usable_from=date(2015, 1, 1), needs_renewal=True, name='Tier')
+    participant = factories.ParticipantFactory()
+    factories.MembershipFactory(
+        participant=participant, tier=tier, effective_from=date(2019, 11, 5)
+    )
+    models.Membership.objects.create(
+        participant=participant,
+        tier=tier,
+        effective_from=date(2020, 1, 1),
+        form_filled=date(2020, 1, 1),
+    )
+    factories.MembershipFactory(tier=tier, effective_from=date(2020, 1, 20))
+
+    statistics = compute_membership_statistics(date(2020, 3, 1))
+
+    assert statistics.months == get_months(date(2019, 11, 1), date(2020, 3, 1))
+    assert statistics.active == [0, 1, 1, 2, 2]
+    assert statistics.new_joiners == [1, 0, 1, 0, 0]
+    assert statistics.renewals == [0, 0, 1, 0, 0]
+    assert statistics.active_by_tier == {str(tier): [0, 1, 1, 2, 2]}
+    assert statistics.active_by_member_type == {tier.member_type.type_name: [0, 1, 1, 2, 2]}
+
+
+def test_compute_membership_statistics_empty():
+    statistics = compute_membership_statistics(date(2020, 3, 1))
+    assert statistics.months == []
+    assert list(statistics.rows()) == []
+
+
+def test_get_membership_statistics_cached(django_assert_num_queries):
+    tier = factories.TierFactory(usable_from=date(2015, 1, 1))
+    factories.MembershipFactory(tier=tier, effective_from=date(2019, 11, 5))
+    statistics = get_membership_statistics(date(2020, 3, 1))
+
+    with django_assert_num_queries(0):
+        assert get_membership_statistics(date(2020, 3, 1)) == statistics
+
+    factories.MembershipFactory(tier=tier, effective_from=date(2019, 12, 5))
+    assert get_membership_statistics(date(2020, 3, 1)).active == [0, 1, 2, 2, 2]
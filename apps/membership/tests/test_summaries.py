@@ -0,0 +1,122 @@
+from datetime import date
+
+import pytest
+from freezegun import freeze_time
+
+from apps.membership import models
+from apps.membership.constants import PaymentMethod
+from apps.membership.filters import RequiresAttentionFilter
+from apps.membership.payments import save_payments
+from apps.membership.summaries import rebuild_participant_summaries
+from apps.membership.tests import factories
+
+pytestmark = pytest.mark.django_db
+
+
+def get_summary(participant):
+    return models.ParticipantSummary.objects.get(participant=participant)
+
+
+@pytest.fixture
+def participant():
+    family = models.Family.objects.create(family_name='Smith')
+    return factories.ParticipantFactory(
+        name='John', surname='Smith', date_of_birth=date(1990, 1, 1), family=family
+    )
+
+
+def add_contact(participant):
+    models.ContactInfo.objects.create(
+        participant=participant,
+        address='Main street',
+        postcode='20001',
+        phone='600000000',
+        email='john@example.com',
+    )
+    models.EmergencyContact.objects.create(
+        participant=participant, full_name='Jane Smith', phone='600000001', relation='Sister'
+    )
+
+
+def test_summary_of_new_participant(participant):
+    summary = get_summary(participant)
+
+    assert (summary.name, summary.surname, summary.date_of_birth, summary.family_name) == (
+        'John',
+        'Smith',
+        date(1990, 1, 1),
+        'Smith',
+    )
+    assert summary.tier_id is None
+    assert not summary.contact_complete
+    assert summary.requires_attention
+
+
+def test_summary_follows_contact_and_memberships(participant):
+    add_contact(participant)
+    assert get_summary(participant).contact_complete
+
+    membership = factories.MembershipFactory(participant=participant)
+    summary = get_summary(participant)
+    assert (summary.tier_id, summary.tier_name) == (membership.tier_id, membership.tier.name)
+    assert summary.effective_from == membership.effective_from
+    assert summary.has_unpaid_memberships
+    assert summary.requires_attention
+
+    save_payments([(membership, 10, date(2020, 1, 1))], PaymentMethod.PAYMENT_METHOD_CASH.name)
+    summary = get_summary(participant)
+    assert summary.paid_on == date(2020, 1, 1)
+    assert not summary.has_unpaid_memberships
+    assert not summary.requires_attention
+
+    models.ContactInfo.objects.filter(participant=participant).update(email='')
+    rebuild_participant_summaries()
+    assert get_summary(participant).requires_attention
+
+
+def test_summary_follows_family_and_tier_names(participant):
+    membership = factories.MembershipFactory(participant=participant)
+
+    participant.family.family_name = 'Smythe'
+    participant.family.save()
+    membership.tier.name = 'Senior'
+    membership.tier.save()
+
+    summary = get_summary(participant)
+    assert (summary.family_name, summary.tier_name) == ('Smythe', 'Senior')
+
+
+@pytest.mark.parametrize(
+    ['today', 'expected'],
+    [
+        (date(2019, 2, 28), False),
+        (date(2019, 3, 1), True),
+        (date(2019, 3, 31), True),
+        (date(2019, 4, 1), False),
+    ],
+)
+def test_is_member(participant, today, expected):
+    factories.MembershipFactory(
+        participant=participant, effective_from=date(2019, 3, 1), effective_until=date(2019, 4, 1)
+    )
+
+    with freeze_time(today):
+        # Same as Membership.is_active_on, the membership is over on its effective until date
+        assert get_summary(participant).is_member is expected
+
+
+def test_requires_attention_filter(participant):
+    other = factories.ParticipantFactory()
+    add_contact(other)
+    membership = factories.MembershipFactory(participant=other)
+    save_payments([(membership, 10, date(2020, 1, 1))], PaymentMethod.PAYMENT_METHOD_CASH.name)
+
+    attention_filter = RequiresAttentionFilter(
+        request=None,
+        params={RequiresAttentionFilter.parameter_name: 'yes'},
+        model=None,
+        model_admin=None,
+    )
+    queryset = attention_filter.queryset(None, models.Participant.objects.all())
+
+    assert list(queryset) == [participant]
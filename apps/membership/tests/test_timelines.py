@@ -0,0 +1,74 @@
+from datetime import date
+
+import pytest
+
+from apps.membership import models
+from apps.membership.tests import factories
+from apps.membership.timelines import get_timeline
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def participant():
+    participant = factories.ParticipantFactory()
+    tier = factories.TierFactory(usable_from=date(2015, 1, 1), base_amount=30)
+    first = factories.MembershipFactory(
+        participant=participant,
+        tier=tier,
+        effective_from=date(2018, 1, 1),
+        effective_until=date(2019, 1, 1),
+    )
+    # Renewed within a month, in the same period as the first one
+    renewal = factories.MembershipFactory(
+        participant=participant, tier=tier, effective_from=date(2019, 1, 15)
+    )
+    models.Membership.objects.filter(pk=renewal.pk).update(effective_until=date(2020, 1, 1))
+    factories.MembershipFactory(
+        participant=participant, tier=tier, effective_from=date(2020, 7, 1)
+    )
+
+    factories.MembershipPaymentFactory(membership=first, amount_paid=30)
+    factories.MembershipPaymentFactory(membership=renewal, amount_paid=10)
+    factories.MembershipPaymentFactory(membership=renewal, amount_paid=5)
+    return participant
+
+
+def test_timeline(participant, django_assert_num_queries):
+    with django_assert_num_queries(3):
+        timeline = get_timeline(participant, today=date(2021, 1, 1))
+
+    assert (timeline.start, timeline.end) == (date(2018, 1, 1), date(2021, 1, 1))
+    assert [
+        (period.effective_from, period.effective_until, period.amount_due)
+        for period in timeline.periods
+    ] == [(date(2018, 1, 1), date(2020, 1, 1), 15), (date(2020, 7, 1), None, 30)]
+    assert [
+        [
+            (entry.membership.effective_from, entry.membership.total_paid, entry.amount_due)
+            for entry in period.memberships
+        ]
+        for period in timeline.periods
+    ] == [
+        [(date(2018, 1, 1), 30, 0), (date(2019, 1, 15), 15, 15)],
+        [(date(2020, 7, 1), 0, 30)],
+    ]
+    assert timeline.amount_due == 45
+
+
+def test_timeline_layout(participant):
+    timeline = get_timeline(participant, today=date(2021, 1, 1))
+
+    days = (date(2021, 1, 1) - date(2018, 1, 1)).days
+    first, last = timeline.periods
+    assert first.offset == 0
+    assert first.width == (date(2020, 1, 1) - date(2018, 1, 1)).days / days * 100
+    # Open until today
+    assert last.offset + last.width == 100
+
+
+def test_timeline_without_memberships():
+    timeline = get_timeline(factories.ParticipantFactory())
+
+    assert timeline.periods == []
+    assert timeline.amount_due == 0
@@ -0,0 +1,94 @@
+from datetime import date
+
+import pytest
+
+from apps.membership.constants import TimeUnit
+from apps.membership.filters import get_eligible_for_vote_ids
+from apps.membership.tests import factories
+from apps.membership.voter_rolls import (
+    EXPORT_BATCH_SIZE,
+    check_in,
+    create_voter_roll,
+    render_voter_roll,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def tier():
+    factories.GeneralSetupFactory(
+        valid_from=date(2015, 1, 1),
+        time_to_vote_since_membership=3,
+        time_unit_to_vote_since_membership=TimeUnit.MONTHS.value,
+        minimum_age_to_vote=18,
+        renewal_month=1,
+    )
+    return factories.TierFactory(needs_renewal=True, usable_from=date(2015, 1, 1))
+
+
+def create_member(tier, effective_from, **kwargs):
+    participant = factories.ParticipantFactory(date_of_birth=date(1990, 12, 1), **kwargs)
+    factories.MembershipFactory(
+        participant=participant,
+        tier=tier,
+        effective_from=effective_from,
+        form_filled=effective_from,
+    )
+    return participant
+
+
+def test_create_voter_roll(tier):
+    voters = [create_member(tier, date(2019, 1, 1)) for _ in range(3)]
+    # Not a member for long enough
+    create_member(tier, date(2019, 11, 1))
+
+    voter_roll = create_voter_roll(date(2019, 12, 31))
+    entries = voter_roll.entries.order_by('participant_id')
+    assert [entry.participant_id for entry in entries] == [voter.id for voter in voters]
+    assert [entry.participant_id for entry in entries] == list(
+        get_eligible_for_vote_ids(date(2019, 12, 31))
+    )
+    assert entries[0].surname == voters[0].surname
+
+    # The roll is frozen
+    voters[0].surname = 'Changed'
+    voters[0].save()
+    create_member(tier, date(2019, 1, 1))
+    assert voter_roll.entries.count() == 3
+    assert voter_roll.entries.get(participant=voters[0]).surname != 'Changed'
+
+
+def test_create_voter_roll_without_setup():
+    voter_roll = create_voter_roll(date(2019, 12, 31))
+    assert voter_roll.entries.count() == 0
+
+
+def test_check_in(tier):
+    voters = [create_member(tier, date(2019, 1, 1)) for _ in range(2)]
+    voter_roll = create_voter_roll(date(2019, 12, 31))
+
+    entries = voter_roll.entries.filter(participant=voters[0])
+    assert check_in(entries) == 1
+    checked_in_at = entries.get().checked_in_at
+    assert checked_in_at
+    # Checking in twice keeps the first time
+    assert check_in(voter_roll.entries.all()) == 1
+    assert entries.get().checked_in_at == checked_in_at
+
+
+def test_render_voter_roll(tier, django_assert_max_num_queries):
+    voter_count = EXPORT_BATCH_SIZE + 1
+    for i in range(voter_count):
+        create_member(tier, date(2019, 1, 1), surname=f'Surname {i:04}')
+    voter_roll = create_voter_roll(date(2019, 12, 31))
+
+    with django_assert_max_num_queries(3):
+        parts = list(render_voter_roll(voter_roll))
+    html = ''.join(parts)
+
+    # Start, two batches of rows and end
+    assert len(parts) == 4
+    assert f'{voter_count} voters' in html
+    assert html.index('Surname 0000') < html.index(f'Surname {voter_count - 1:04}')
+    assert html.count('<tr>') == voter_count + 1
@@ -0,0 +1,122 @@
+from datetime import date
+from typing import List, NamedTuple, Optional
+
+from django.db.models import Prefetch, Sum, prefetch_related_objects
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.membership.models import Membership, MembershipPayment, MembershipPeriod, Participant
+
+
+class TimelineMembership(NamedTuple):
+    membership: Membership
+    amount_due: int
+    offset: float
+    width: float
+
+
+class TimelinePeriod(NamedTuple):
+    effective_from: date
+    # None while the period is still open
+    effective_until: Optional[date]
+    memberships: List[TimelineMembership]
+    offset: float
+    width: float
+
+    @property
+    def amount_due(self):
+        return sum(timeline_membership.amount_due for timeline_membership in self.memberships)
+
+
+class Timeline(NamedTuple):
+    participant: Participant
+    start: Optional[date]
+    end: Optional[date]
+    periods: List[TimelinePeriod]
+
+    @property
+    def amount_due(self):
+        return sum(period.amount_due for period in self.periods)
+
+
+def prefetch_timeline(participant):
+    """
+    Fetches the membership periods and the memberships of the participant, along with their tier,
+    payments and `total_paid`, in three queries whatever the number of memberships
+    """
+    prefetch_related_objects(
+        [participant],
+        Prefetch(
+            'membership_periods', queryset=MembershipPeriod.objects.order_by('effective_from')
+        ),
+        Prefetch(
+            'memberships',
+            queryset=Membership.objects.select_related('tier')
+            .annotate(total_paid=Coalesce(Sum('payments__amount_paid'), 0))
+            .prefetch_related(
+                Prefetch('payments', queryset=MembershipPayment.objects.order_by('id'))
+            )
+            .order_by('effective_from', 'id'),
+        ),
+    )
+
+
+def get_timeline(participant, today=None) -> Timeline:
+    """
+    Membership periods of the participant with the memberships each of them groups, placed as
+    percentages of the time from the first membership until today or the last membership end.
+
+    The memberships are assigned to their period in a single pass, as neither the periods nor the
+    memberships overlap and both are sorted by date.
+    """
+    today = today or timezone.now().date()
+    prefetch_timeline(participant)
+    periods = [
+        (
+            period.effective_from,
+            # The view closes the open periods on the maximum date
+            None if period.effective_until == date.max else period.effective_until,
+        )
+        for period in participant.membership_periods.all()
+    ]
+    if not periods:
+        return Timeline(participant=participant, start=None, end=None, periods=[])
+
+    start = periods[0][0]
+    end = max([today] + [effective_until for _, effective_until in periods if effective_until])
+    days = max((end - start).days, 1)
+
+    def get_layout(from_date, until):
+        until = min(until or end, end)
+        return (from_date - start).days / days * 100, max((until - from_date).days, 0) / days * 100
+
+    timeline_periods = []
+    memberships = iter(participant.memberships.all())
+    membership = next(memberships, None)
+    for i, (effective_from, effective_until) in enumerate(periods):
+        next_from = periods[i + 1][0] if i + 1 < len(periods) else date.max
+        period_memberships = []
+        while membership and membership.effective_from < next_from:
+            offset, width = get_layout(membership.effective_from, membership.effective_until)
+            period_memberships.append(
+                TimelineMembership(
+                    membership=membership,
+                    amount_due=max(membership.tier.base_amount - membership.total_paid, 0),
+                    offset=offset,
+                    width=width,
+                )
+            )
+            membership = next(memberships, None)
+
+        offset, width = get_layout(effective_from, effective_until)
+        timeline_periods.append(
+            TimelinePeriod(
+                effective_from=effective_from,
+                effective_until=effective_until,
+                memberships=period_memberships,
+                offset=offset,
+                width=width,
+            )
+        )
+
+    return Timeline(participant=participant, start=start, end=end, periods=timeline_periods)
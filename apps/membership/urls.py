@@ -0,0 +1,12 @@
+from django.urls import path
+
+from apps.membership import views
+
+app_name = 'membership'
+
+urlpatterns = [
+    path('participants/', views.participants, name='participants'),
+    path('participants/eligible/', views.eligible_participants, name='eligible_participants'),
+    path('memberships/', views.memberships, name='memberships'),
+    path('changes/<str:model_name>/', views.change_feed, name='change_feed'),
+]
@@ -1,4 +1,4 @@
-from datetime import timedelta
+from datetime import date, timedelta
 from typing import Union
 
 from dateutil.relativedelta import relativedelta
@@ -12,3 +12,7 @@ def get_timedelta_from_unit(time_diff: int, unit: str) -> Union[timedelta, relat
         return timedelta(days=time_diff)
 
     return relativedelta(**{unit.value.lower(): time_diff})
+
+
+def get_month_start(ref_date: date) -> date:
+    return date(ref_date.year, ref_date.month, 1)
@@ -0,0 +1,120 @@
+import json
+
+from django.contrib.auth.decorators import permission_required
+from django.core.exceptions import PermissionDenied
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import condition, require_GET
+
+from apps.membership.api import (
+    API_PAGE_SIZE,
+    MAX_API_PAGE_SIZE,
+    MEMBERSHIP_FIELDS,
+    PARTICIPANT_FIELDS,
+    get_eligible_participants,
+    get_etag,
+    get_fields,
+    get_memberships,
+    get_page,
+    get_participants,
+)
+from apps.membership.data_versions import MEMBERSHIP_DATA, PARTICIPANT_DATA
+from apps.membership.feeds import FEED_PAGE_SIZE, MAX_FEED_PAGE_SIZE, get_changes, get_feed_models
+from apps.membership.filters import ELIGIBILITY_DATA
+from common.utils.db import read_from_replica
+
+
+def get_limit(request, default, maximum):
+    return max(min(int(request.GET.get('limit', default)), maximum), 1)
+
+
+def etag(*families):
+    """
+    Answers `304 Not Modified` without calling the view while the data of `families` has not
+    changed since the client got the response. Goes within `read_from_replica` for the views
+    reading from the replica.
+    """
+
+    def etag_func(request, *args, **kwargs):
+        return get_etag(families, request.GET)
+
+    return condition(etag_func=etag_func)
+
+
+def page_response(request, queryset, allowed_fields):
+    try:
+        fields = get_fields(request.GET.get('fields'), allowed_fields)
+        cursor = request.GET.get('cursor')
+        page = get_page(
+            queryset,
+            fields,
+            cursor=int(cursor) if cursor else None,
+            limit=get_limit(request, API_PAGE_SIZE, MAX_API_PAGE_SIZE),
+        )
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    return JsonResponse(dict(results=page.rows, cursor=page.cursor))
+
+
+@require_GET
+@permission_required('membership.view_participant', raise_exception=True)
+@read_from_replica()
+@etag(PARTICIPANT_DATA)
+def participants(request):
+    return page_response(request, get_participants(), PARTICIPANT_FIELDS)
+
+
+@require_GET
+@permission_required('membership.view_membership', raise_exception=True)
+@read_from_replica()
+@etag(MEMBERSHIP_DATA)
+def memberships(request):
+    return page_response(request, get_memberships(), MEMBERSHIP_FIELDS)
+
+
+@require_GET
+@permission_required('membership.view_participant', raise_exception=True)
+@read_from_replica()
+@etag(*ELIGIBILITY_DATA)
+def eligible_participants(request):
+    """
+    Participants who can vote on the `date` query parameter, in YYYY-MM-DD format
+    """
+    try:
+        date = parse_date(request.GET.get('date', ''))
+    except ValueError:
+        date = None
+    if not date:
+        return HttpResponseBadRequest('A valid date is required')
+    return page_response(request, get_eligible_participants(date), PARTICIPANT_FIELDS)
+
+
+@require_GET
+def change_feed(request, model_name):
+    """
+    JSON lines with the rows of a model changed after the `cursor` query parameter. The cursor to
+    continue from is returned in the `X-Cursor` header.
+    """
+    model = get_feed_models().get(model_name)
+    if not model:
+        raise Http404
+    if not request.user.has_perm(f'{model._meta.app_label}.view_{model_name}'):
+        raise PermissionDenied
+
+    try:
+        page = get_changes(
+            model,
+            cursor=request.GET.get('cursor'),
+            limit=get_limit(request, FEED_PAGE_SIZE, MAX_FEED_PAGE_SIZE),
+        )
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    response = HttpResponse(
+        ''.join(json.dumps(row, cls=DjangoJSONEncoder) + '\n' for row in page.rows),
+        content_type='application/x-ndjson',
+    )
+    response['X-Cursor'] = page.cursor or ''
+    response['X-Has-More'] = 'true' if page.has_more else 'false'
+    return response
@@ -0,0 +1,76 @@
+from django.core.exceptions import EmptyResultSet
+from django.db import connection, transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from apps.membership.filters import filter_eligible_for_vote
+from apps.membership.models import Participant, VoterRoll
+from common.utils.db import read_from_replica
+
+EXPORT_BATCH_SIZE = 500
+
+SNAPSHOT_SQL = '''
+    INSERT INTO membership_voterrollentry
+        (voter_roll_id, participant_id, name, surname, date_of_birth)
+    SELECT %s, e.id, e.name, e.surname, e.date_of_birth
+    FROM ({eligible}) AS e
+'''
+
+
+def snapshot_voter_roll(voter_roll):
+    """
+    Copies the participants eligible for vote on the election date into the roll, in a single
+    statement built from the same query as the eligibility filter
+    """
+    eligible = filter_eligible_for_vote(
+        Participant.objects.all(), voter_roll.election_date
+    ).values('id', 'name', 'surname', 'date_of_birth')
+    try:
+        sql, params = eligible.query.sql_with_params()
+    except EmptyResultSet:
+        # There is no general setup for the date
+        return 0
+
+    with connection.cursor() as cursor:
+        cursor.execute(SNAPSHOT_SQL.format(eligible=sql), [voter_roll.pk, *params])
+        return cursor.rowcount
+
+
+@transaction.atomic
+def create_voter_roll(election_date, notes=None) -> VoterRoll:
+    voter_roll = VoterRoll.objects.create(election_date=election_date, notes=notes)
+    snapshot_voter_roll(voter_roll)
+    return voter_roll
+
+
+def check_in(entries):
+    """
+    Marks as checked in the voters of `entries` which were not yet
+    """
+    return entries.filter(checked_in_at=None).update(checked_in_at=timezone.now())
+
+
+def render_voter_roll(voter_roll):
+    """
+    Yields the printable HTML of the roll in parts, rendering its entries in batches so the
+    whole roll is never held in memory. Read from the replica.
+    """
+    with read_from_replica():
+        entries = voter_roll.entries.order_by('surname', 'name', 'id').values_list(
+            'surname', 'name', 'date_of_birth', 'checked_in_at'
+        )
+        yield render_to_string(
+            'col/voter_roll_export_start.html',
+            dict(voter_roll=voter_roll, voter_count=entries.count()),
+        )
+
+        batch = []
+        for number, entry in enumerate(entries.iterator(chunk_size=EXPORT_BATCH_SIZE), start=1):
+            batch.append((number, *entry))
+            if len(batch) == EXPORT_BATCH_SIZE:
+                yield render_to_string('col/voter_roll_export_rows.html', dict(entries=batch))
+                batch = []
+        if batch:
+            yield render_to_string('col/voter_roll_export_rows.html', dict(entries=batch))
+
+        yield render_to_string('col/voter_roll_export_end.html')
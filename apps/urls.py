@@ -9,6 +9,7 @@ from django.urls import include, path, re_path
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/', include('apps.membership.urls')),
     path('accounts/', include('allauth.urls')),
     path('invitations/', include('invitations.urls', namespace='invitations')),
     re_path(r'^admin/password_reset/$', PasswordResetView.as_view(), name='admin_password_reset'),
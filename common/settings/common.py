@@ -97,7 +97,8 @@ sentry_sdk.init(dsn=env('SENTRY_DSN', default=None), integrations=[DjangoIntegra
 
 # Email backend settings
 # https://github.com/sklarsa/django-sendgrid-v5
-EMAIL_BACKEND = 'sendgrid_backend.SendgridBackend'
+EMAIL_BACKEND = env('EMAIL_BACKEND', default='sendgrid_backend.SendgridBackend')
+DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL', default='webmaster@localhost')
 SENDGRID_API_KEY = env('SENDGRID_API_KEY', default=None)
 SENDGRID_SANDBOX_MODE_IN_DEBUG = True
 
@@ -140,6 +141,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'common.utils.db.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'apps.urls'
@@ -172,11 +174,33 @@ WSGI_APPLICATION = 'apps.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 # Change 'default' database configuration with $DATABASE_URL.
-DATABASES = {'default': dj_database_url.config(conn_max_age=500)}
+# The connections are returned to a pool of the process at the end of each request
+DATABASE_ENGINE = 'contrib.django.db.backends.postgresql_pool'
+DATABASE_POOL = {
+    'MIN_SIZE': env.int('DATABASE_POOL_MIN_SIZE', default=1),
+    'MAX_SIZE': env.int('DATABASE_POOL_MAX_SIZE', default=10),
+    'TIMEOUT': env.float('DATABASE_POOL_TIMEOUT', default=10),
+    'IDLE_TIMEOUT': env.float('DATABASE_POOL_IDLE_TIMEOUT', default=60),
+    'HEALTH_CHECK_AFTER': env.float('DATABASE_POOL_HEALTH_CHECK_AFTER', default=30),
+}
+DATABASES = {'default': dj_database_url.config(engine=DATABASE_ENGINE)}
 if not DATABASES['default']:
     raise RuntimeError(
         'Cannot start without a valid DB connection: {}'.format(DATABASES['default'])
     )
+DATABASES['default']['POOL'] = DATABASE_POOL
+
+# Optional replica for the reports, exports and API listings, see common.utils.db
+if env('REPLICA_DATABASE_URL', default=None):
+    DATABASES['replica'] = dj_database_url.config(
+        engine=DATABASE_ENGINE, env='REPLICA_DATABASE_URL'
+    )
+    DATABASES['replica']['POOL'] = DATABASE_POOL
+DATABASE_ROUTERS = ['common.utils.db.ReplicaRouter']
+# Reading from the primary after a client writes, so it reads its own writes
+REPLICA_STICKY_SECONDS = env.int('REPLICA_STICKY_SECONDS', default=10)
+# Reading from the primary after failing to connect to the replica
+REPLICA_RETRY_SECONDS = env.int('REPLICA_RETRY_SECONDS', default=30)
 
 CACHES = {
     "default": {
@@ -1,10 +1,11 @@
 from .common import *
 
-DATABASES = {'default': dj_database_url.config(conn_max_age=500, env='TEST_DATABASE_URL')}
+DATABASES = {'default': dj_database_url.config(engine=DATABASE_ENGINE, env='TEST_DATABASE_URL')}
 if not DATABASES['default']:
     raise RuntimeError(
         'Cannot start without a valid DB connection: {}'.format(DATABASES['default'])
     )
+DATABASES['default']['POOL'] = DATABASE_POOL
 
 CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": ''}}
 
@@ -1,5 +1,16 @@
+from django.contrib.admin import helpers
+from django.contrib.admin.utils import unquote
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import FieldDoesNotExist, PermissionDenied
+from django.db.models.constants import LOOKUP_SEP
+from django.forms import Media
 from django.forms.widgets import TextInput
+from django.http import Http404
+from django.shortcuts import render
+from django.template.base import VariableNode
 from django.template.defaultfilters import title
+from django.template.loader import get_template
+from django.urls import path, reverse
 from django.utils.encoding import force_text
 
 
@@ -9,6 +20,7 @@ class ViewColumnMixin(object):
 
     get_view.short_description = ''
     get_view.admin_order_field = None
+    get_view.projected_fields = []
 
 
 class TextAreaToInputMixin(object):
@@ -34,6 +46,55 @@ class RemoveDeleteActionMixin(object):
         return actions
 
 
+class EmptySelectionActionsMixin(object):
+    """
+    Runs the actions in `empty_selection_actions` over the whole changelist when nothing is
+    checked.
+    """
+
+    empty_selection_actions = []
+
+    def changelist_view(self, request, extra_context=None):
+        try:
+            action_index = int(request.POST.get('index', 0))
+        except ValueError:
+            action_index = 0
+
+        try:
+            action = request.POST.getlist('action')[action_index]
+        except IndexError:
+            action = None
+
+        action_names = [getattr(a, '__name__', a) for a in self.empty_selection_actions]
+        # If the action allows an empty selection and no check box has been marked
+        if action in action_names and not request.POST.getlist(helpers.ACTION_CHECKBOX_NAME):
+            request.POST._mutable = True
+            # Activate to select across pages and avoid PK filter
+            request.POST['select_across'] = True
+            # Add fake data to simulate marked checks
+            request.POST.setlist(helpers.ACTION_CHECKBOX_NAME, [1])
+            request.POST._mutable = False
+
+        return super().changelist_view(request, extra_context=extra_context)
+
+
+class PaginatedInlineMixin(object):
+    """
+    Displays a single page of an inline built with `paginated_inline_formset_builder`.
+
+    The page is read from the `<prefix>-page` query parameter, which is kept when posting the form.
+    """
+
+    template = 'admin/edit_inline/paginated_tabular.html'
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj=obj, **kwargs)
+        page_number = request.GET.get(f'{formset.get_default_prefix()}-page', 1)
+        return type(
+            formset.__name__, (formset,), dict(page_number=page_number, query=request.GET)
+        )
+
+
 class AppendOnlyModelAdminMixin(RemoveDeleteActionMixin):
     """
     Disables the edition from a ModelAdmin, hiding the Save buttons and making all fields readonly.
@@ -97,3 +158,214 @@ class AppendOnlyModelAdminMixin(RemoveDeleteActionMixin):
             return self.readonly_fields + self.get_editable_fields(request, obj=obj)
         # This is an addition, no readonly to show
         return []
+
+
+def get_projection(model, names):
+    """
+    Fields to pass to `only()` and relations to pass to `select_related()` to load just the columns
+    of `names`, which may follow forward and one-to-one relations with `__`. A relation itself
+    loads the whole related row, as its `__str__` may read any of them, unless it is given by its
+    column name, as `tier_id`.
+
+    Returns `None` if any of the names is not a column, as a property or a many-valued relation,
+    so the whole rows have to be loaded.
+    """
+    fields = {model._meta.pk.name}
+    relations = set()
+    for name in names:
+        opts = model._meta
+        path = []
+        for part in name.split(LOOKUP_SEP):
+            try:
+                field = opts.get_field(part)
+            except FieldDoesNotExist:
+                return None
+            if field.many_to_many or field.one_to_many:
+                return None
+
+            path.append(field.name)
+            # A foreign key given by its column name is not followed
+            if not field.is_relation or part == getattr(field, 'attname', None):
+                fields.add(LOOKUP_SEP.join(path))
+                break
+            if field.concrete:
+                # The foreign key column of the relation
+                fields.add(LOOKUP_SEP.join(path))
+            relations.add(LOOKUP_SEP.join(path))
+            opts = field.related_model._meta
+        else:
+            relations.add(LOOKUP_SEP.join(path))
+    return sorted(fields), sorted(relations)
+
+
+def project_queryset(queryset, names):
+    """
+    Restricts `queryset` to the columns of `names`, or leaves it as it is if they cannot be known
+    """
+    projection = names is not None and get_projection(queryset.model, names)
+    if not projection:
+        return queryset
+    fields, relations = projection
+    return queryset.select_related(None).select_related(*relations).only(*fields)
+
+
+def get_template_fields(template_name, variable):
+    """
+    Paths of the fields of `variable` printed by the template, as `['name', 'family__family_name']`
+    for `{{ participant.name }}` and `{{ participant.family.family_name }}`. Fields only used in
+    tags, as `{% if %}`, are not included.
+    """
+    fields = []
+    for node in get_template(template_name).template.nodelist.get_nodes_by_type(VariableNode):
+        lookups = node.filter_expression.var.lookups
+        if lookups and len(lookups) > 1 and lookups[0] == variable:
+            field = LOOKUP_SEP.join(lookups[1:])
+            if field not in fields:
+                fields.append(field)
+    return fields
+
+
+class ProjectedChangeList(ChangeList):
+    def get_results(self, request):
+        self.queryset = project_queryset(
+            self.queryset, self.model_admin.get_list_projection(request, self.list_display)
+        )
+        super().get_results(request)
+
+
+class ColumnProjectionMixin(object):
+    """
+    Loads only the columns displayed in the changelist, as derived from `list_display`. Methods in
+    `list_display` declare the fields they read with a `projected_fields` attribute, as they do
+    with `admin_order_field`, or else the whole rows are loaded.
+
+    The filters only read their columns in the `WHERE` clause, so they do not add to the
+    projection. Neither are the querysets given to the actions projected, as they usually need
+    the whole rows.
+    """
+
+    def get_list_projection(self, request, list_display):
+        names = []
+        for name in list_display:
+            if name == 'action_checkbox':
+                continue
+            attribute = name if callable(name) else getattr(self, name, None)
+            if attribute is None:
+                names.append(name)
+                continue
+            projected_fields = getattr(attribute, 'projected_fields', None)
+            if projected_fields is None:
+                return None
+            names.extend(projected_fields)
+        return names
+
+    def get_changelist(self, request, **kwargs):
+        return ProjectedChangeList
+
+
+def get_formset_data(formset):
+    """
+    Data posted by the unbound `formset` when submitted without changes
+    """
+    data = {}
+    for form in [formset.management_form] + formset.forms:
+        for bound_field in form:
+            value = bound_field.value()
+            if value is not None:
+                data[bound_field.html_name] = value
+    return data
+
+
+class LazyInlinesMixin(object):
+    """
+    Renders the change view without its inlines, fetching each of them from the `inline` view
+    when its section is opened.
+
+    The sections which were not opened are posted as they were loaded, so all the inlines are still
+    validated along with the form when saving.
+
+    The media of the inlines is always included in the change view, as the scripts of the formsets
+    have to be loaded before the sections fetched are initialized.
+    """
+
+    change_form_template = 'admin/lazy_inlines_change_form.html'
+    # The material inlines exclude the formset script from their media
+    inlines_media = Media(js=['admin/js/inlines.js'])
+
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        return [
+            path(
+                '<path:object_id>/inlines/<str:prefix>/',
+                self.admin_site.admin_view(self.inline_view),
+                name='%s_%s_inline' % info,
+            ),
+        ] + super().get_urls()
+
+    def get_lazy_inlines(self, request, obj):
+        """
+        Sections of the inlines to fetch from the `inline` view, along with the media they need
+        """
+        info = self.model._meta.app_label, self.model._meta.model_name
+        query = request.GET.urlencode()
+        sections = []
+        media = self.inlines_media
+        for formset_class, inline in self.get_formsets_with_inlines(request, obj):
+            sections.append(
+                dict(
+                    title=inline.verbose_name_plural,
+                    url=reverse(
+                        'admin:%s_%s_inline' % info,
+                        args=[obj.pk, formset_class.get_default_prefix()],
+                    )
+                    + (f'?{query}' if query else ''),
+                )
+            )
+            media = media + inline.media + formset_class.form().media
+        return sections, media
+
+    def _create_formsets(self, request, obj, change):
+        if not change:
+            return super()._create_formsets(request, obj, change)
+        if request.method != 'POST':
+            # Fetched from the `inline` view instead
+            return [], []
+
+        data = request.POST.copy()
+        for formset_class, inline in self.get_formsets_with_inlines(request, obj):
+            prefix = formset_class.get_default_prefix()
+            if f'{prefix}-TOTAL_FORMS' not in data:
+                formset = formset_class(
+                    instance=obj, prefix=prefix, queryset=inline.get_queryset(request)
+                )
+                data.update(get_formset_data(formset))
+        request.POST = data
+        return super()._create_formsets(request, obj, change)
+
+    def render_change_form(self, request, context, add=False, change=False, form_url='', obj=None):
+        if change:
+            media = self.inlines_media
+            if request.method != 'POST':
+                context['lazy_inlines'], media = self.get_lazy_inlines(request, obj)
+            context['media'] = context['media'] + media
+        return super().render_change_form(
+            request, context, add=add, change=change, form_url=form_url, obj=obj
+        )
+
+    def inline_view(self, request, object_id, prefix):
+        obj = self.get_object(request, unquote(object_id))
+        if obj is None:
+            raise Http404
+        if not self.has_view_or_change_permission(request, obj):
+            raise PermissionDenied
+
+        for formset_class, inline in self.get_formsets_with_inlines(request, obj):
+            if formset_class.get_default_prefix() == prefix:
+                formset = formset_class(
+                    instance=obj, prefix=prefix, queryset=inline.get_queryset(request)
+                )
+                inline_admin_formsets = self.get_inline_formsets(request, [formset], [inline], obj)
+                return render(
+                    request, inline.template, dict(inline_admin_formset=inline_admin_formsets[0])
+                )
+        raise Http404
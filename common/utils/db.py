@@ -0,0 +1,125 @@
+"""
+Routing of the read-only workloads, as reports, exports and API listings, to the `replica`
+database.
+
+Only the reads run within `read_from_replica` go to the replica. They still go to the primary
+while a transaction is open on it, during the sticky window after a request of the same client
+wrote to it, and while the replica is not configured or cannot be connected to.
+"""
+import logging
+import threading
+import time
+from contextlib import ContextDecorator
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+logger = logging.getLogger(__name__)
+
+REPLICA_DB_ALIAS = 'replica'
+STICKY_COOKIE_NAME = 'primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+state = threading.local()
+# Time until which the replica is not tried again after failing to connect to it
+replica_unavailable_until = 0
+
+
+class read_from_replica(ContextDecorator):
+    """
+    Sends the reads of the block, or of the decorated function, to the replica
+    """
+
+    def __enter__(self):
+        state.replica_reads = getattr(state, 'replica_reads', 0) + 1
+
+    def __exit__(self, *exc_info):
+        state.replica_reads -= 1
+
+
+def is_replica_available():
+    global replica_unavailable_until
+    if REPLICA_DB_ALIAS not in connections.databases:
+        return False
+    if time.monotonic() < replica_unavailable_until:
+        return False
+
+    try:
+        connections[REPLICA_DB_ALIAS].ensure_connection()
+    except OperationalError:
+        logger.warning('The replica is not available, reading from the primary', exc_info=True)
+        replica_unavailable_until = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+        return False
+    return True
+
+
+def get_read_db():
+    if (
+        not getattr(state, 'replica_reads', 0)
+        or getattr(state, 'sticky', False)
+        or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        or not is_replica_available()
+    ):
+        return DEFAULT_DB_ALIAS
+    return REPLICA_DB_ALIAS
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return get_read_db()
+
+    def db_for_write(self, model, **hints):
+        state.wrote = True
+        # Even for instances read from the replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPLICA_DB_ALIAS:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Keeps reading from the primary for `REPLICA_STICKY_SECONDS` after a request wrote to it, so
+    its client reads its own writes even if the replica lags behind
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            primary_until = float(request.COOKIES.get(STICKY_COOKIE_NAME, 0))
+        except ValueError:
+            primary_until = 0
+
+        sticky = primary_until > time.time()
+        state.sticky = sticky
+        state.wrote = False
+        try:
+            response = self.get_response(request)
+        finally:
+            state.sticky = False
+        if response.streaming:
+            response.streaming_content = self.stream(response.streaming_content, sticky)
+
+        if state.wrote or request.method not in SAFE_METHODS:
+            response.set_cookie(
+                STICKY_COOKIE_NAME,
+                str(time.time() + settings.REPLICA_STICKY_SECONDS),
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+            )
+        return response
+
+    def stream(self, streaming_content, sticky):
+        # Streamed after the view returned
+        state.sticky = sticky
+        try:
+            yield from streaming_content
+        finally:
+            state.sticky = False
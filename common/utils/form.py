@@ -1,10 +1,22 @@
+from django.core.paginator import Paginator
 from django.forms import BaseInlineFormSet
+from django.http import QueryDict
+from django.utils.functional import cached_property
 
 
-def limited_inline_formset_builder(max_num):
-    class LimitedInlineFormSet(BaseInlineFormSet):
+def limited_inline_formset_builder(max_num, base_formset=BaseInlineFormSet):
+    class LimitedInlineFormSet(base_formset):
+        offset = 0
+
+        def get_unlimited_queryset(self):
+            return super().get_queryset()
+
         def get_queryset(self):
-            return super().get_queryset()[:max_num]
+            # Slice once so the limited queryset keeps its result cache between calls
+            if not hasattr(self, '_limited_queryset'):
+                queryset = self.get_unlimited_queryset()
+                self._limited_queryset = queryset[self.offset : self.offset + max_num]
+            return self._limited_queryset
 
     return LimitedInlineFormSet
 
@@ -14,11 +26,63 @@ class RequiredOnceInlineFormSet(BaseInlineFormSet):
     Generates an inline formset that is required
     """
 
+    @cached_property
+    def has_existing_objects(self):
+        """
+        Whether the parent instance already has related objects, computed once per formset
+        """
+        queryset = self.get_queryset()
+        if queryset._result_cache is not None:
+            # The forms have already been fetched, no need to query again
+            return bool(queryset._result_cache)
+        return queryset.exists()
+
     def _construct_form(self, i, **kwargs):
         """
         Override the method to change the form attribute empty_permitted
         """
         form = super()._construct_form(i, **kwargs)
-        if not self.queryset.count():
+        if not self.has_existing_objects:
             form.empty_permitted = False
         return form
+
+
+def paginated_inline_formset_builder(per_page, base_formset=RequiredOnceInlineFormSet):
+    """
+    Generates an inline formset that only displays a page of the related objects.
+
+    `page_number` and the `query` the page links keep are set by `PaginatedInlineMixin` from the
+    request.
+    """
+
+    class PaginatedInlineFormSet(limited_inline_formset_builder(per_page, base_formset)):
+        page_number = 1
+        query = QueryDict()
+
+        @cached_property
+        def page(self):
+            paginator = Paginator(self.get_unlimited_queryset(), per_page)
+            return paginator.get_page(self.page_number)
+
+        @property
+        def offset(self):
+            return max(self.page.start_index() - 1, 0)
+
+        def get_page_query(self, page_number):
+            """
+            Query string of the page, keeping the other parameters, as the pages of other inlines
+            or the changelist filters
+            """
+            query = self.query.copy()
+            query[f'{self.prefix}-page'] = page_number
+            return query.urlencode()
+
+        @property
+        def previous_page_query(self):
+            return self.get_page_query(self.page.previous_page_number())
+
+        @property
+        def next_page_query(self):
+            return self.get_page_query(self.page.next_page_number())
+
+    return PaginatedInlineFormSet
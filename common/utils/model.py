@@ -1,8 +1,50 @@
-from django.db import models
+from django.db import connections, models, router
 
 
 class Loggable(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
+    # Not set by QuerySet.update, bulk_update nor raw SQL, which must set it themselves
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         abstract = True
+        # Keyset pagination of the change feeds
+        indexes = [models.Index(fields=['updated_at', 'id'])]
+
+
+def increment_rows(model, key_fields, value_fields, deltas, using=None):
+    """
+    Adds the increments in `deltas` (`{key values: value increments}`) to the rows of `model`
+    matching the key values, creating the missing ones in the same statement.
+
+    `key_fields` must be covered by a unique constraint.
+    """
+    if not deltas:
+        return
+
+    connection = connections[using or router.db_for_write(model)]
+    quote_name = connection.ops.quote_name
+    table = quote_name(model._meta.db_table)
+    key_columns = [quote_name(model._meta.get_field(name).column) for name in key_fields]
+    value_columns = [quote_name(model._meta.get_field(name).column) for name in value_fields]
+
+    row_placeholder = '({})'.format(', '.join(['%s'] * (len(key_columns) + len(value_columns))))
+    params = []
+    for key, values in deltas.items():
+        params.extend(key)
+        params.extend(values)
+
+    sql = (
+        'INSERT INTO {table} ({columns}) VALUES {rows} '
+        'ON CONFLICT ({keys}) DO UPDATE SET {updates}'
+    ).format(
+        table=table,
+        columns=', '.join(key_columns + value_columns),
+        rows=', '.join([row_placeholder] * len(deltas)),
+        keys=', '.join(key_columns),
+        updates=', '.join(
+            f'{column} = {table}.{column} + EXCLUDED.{column}' for column in value_columns
+        ),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
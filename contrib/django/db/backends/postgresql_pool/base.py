@@ -0,0 +1,39 @@
+"""
+PostgreSQL backend taking its connections from a pool of the process instead of opening one per
+thread. Closing a connection, as Django does at the end of each request with `CONN_MAX_AGE = 0`,
+returns it to the pool.
+
+The pool is configured with the `POOL` key of the database settings: `MIN_SIZE`, `MAX_SIZE`,
+`TIMEOUT`, `IDLE_TIMEOUT` and `HEALTH_CHECK_AFTER`, as the arguments of `ConnectionPool`.
+"""
+from django.db.backends.postgresql import base
+
+from .creation import DatabaseCreation
+from .pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    pool = None
+
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(conn_params, self.settings_dict.get('POOL', {}))
+        connection = self.pool.getconn()
+
+        # As the base backend does, before setting the autocommit
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.putconn(self.connection)
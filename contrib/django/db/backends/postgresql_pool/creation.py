@@ -0,0 +1,10 @@
+from django.db.backends.postgresql import creation
+
+from .pool import close_pools
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # A database cannot be dropped while the pool keeps connections to it
+        close_pools(database=test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
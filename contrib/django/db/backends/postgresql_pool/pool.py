@@ -0,0 +1,228 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+
+logger = logging.getLogger(__name__)
+
+pools = {}
+pools_lock = threading.Lock()
+# The pools are shared by the connections to the same database as the same user, whatever their
+# password or other options
+POOL_KEY_PARAMS = ('host', 'port', 'database', 'user')
+
+
+class PoolStats(NamedTuple):
+    size: int
+    idle: int
+    in_use: int
+    opened: int
+    closed: int
+    checkouts: int
+    waits: int
+    timeouts: int
+    health_check_failures: int
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections, opened on demand up to `max_size`.
+
+    Getting a connection waits up to `timeout` seconds for one to be returned once all of them
+    are in use. The connections idle for longer than `health_check_after` seconds are checked
+    before being handed out, and those idle for longer than `idle_timeout` seconds are closed
+    down to `min_size`.
+    """
+
+    def __init__(
+        self,
+        connect,
+        min_size=1,
+        max_size=10,
+        timeout=10,
+        idle_timeout=60,
+        health_check_after=30,
+    ):
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self.pid = os.getpid()
+
+        self.condition = threading.Condition()
+        # Pairs of (connection, returned at), the most recently returned last
+        self.idle = deque()
+        self.size = 0
+        self.opened = self.closed = self.checkouts = self.waits = self.timeouts = 0
+        self.health_check_failures = 0
+
+    @property
+    def stats(self) -> PoolStats:
+        with self.condition:
+            return PoolStats(
+                size=self.size,
+                idle=len(self.idle),
+                in_use=self.size - len(self.idle),
+                opened=self.opened,
+                closed=self.closed,
+                checkouts=self.checkouts,
+                waits=self.waits,
+                timeouts=self.timeouts,
+                health_check_failures=self.health_check_failures,
+            )
+
+    def getconn(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            connection, returned_at = self.reserve(deadline)
+            if connection is None:
+                return self.open()
+            if self.is_healthy(connection, returned_at):
+                with self.condition:
+                    self.checkouts += 1
+                return connection
+            self.discard(connection)
+
+    def putconn(self, connection):
+        try:
+            status = connection.info.transaction_status
+            if connection.closed or status == TRANSACTION_STATUS_UNKNOWN:
+                raise psycopg2.InterfaceError('connection already closed')
+            if status != TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+            connection.autocommit = True
+        except psycopg2.Error:
+            self.discard(connection)
+            return
+
+        with self.condition:
+            self.idle.append((connection, time.monotonic()))
+            self.close_expired()
+            self.condition.notify()
+
+    def close_all(self):
+        with self.condition:
+            while self.idle:
+                connection, _ = self.idle.popleft()
+                self.size -= 1
+                self.close(connection)
+
+    def reserve(self, deadline):
+        """
+        Takes the most recently returned idle connection, or a slot to open a new one if there are
+        none, as `(None, None)`
+        """
+        with self.condition:
+            while True:
+                self.close_expired()
+                if self.idle:
+                    return self.idle.pop()
+                if self.size < self.max_size:
+                    self.size += 1
+                    return None, None
+
+                self.waits += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.condition.wait(remaining):
+                    self.timeouts += 1
+                    logger.warning('Connection pool exhausted: %s', self.stats)
+                    raise psycopg2.OperationalError(
+                        f'No database connection available after {self.timeout} seconds'
+                    )
+
+    def open(self):
+        try:
+            connection = self.connect()
+        except Exception:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+
+        with self.condition:
+            self.opened += 1
+            self.checkouts += 1
+        return connection
+
+    def is_healthy(self, connection, returned_at):
+        if connection.closed:
+            return False
+        if time.monotonic() - returned_at < self.health_check_after:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except psycopg2.Error:
+            with self.condition:
+                self.health_check_failures += 1
+            return False
+        return True
+
+    def discard(self, connection):
+        with self.condition:
+            self.size -= 1
+            self.close(connection)
+            self.condition.notify()
+
+    def close(self, connection):
+        # Called with the condition held
+        self.closed += 1
+        if connection.closed:
+            return
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+
+    def close_expired(self):
+        # Called with the condition held, the oldest idle connections come first
+        expired_at = time.monotonic() - self.idle_timeout
+        while len(self.idle) > self.min_size and self.idle[0][1] < expired_at:
+            connection, _ = self.idle.popleft()
+            self.size -= 1
+            self.close(connection)
+
+
+def get_pool(conn_params, options) -> ConnectionPool:
+    """
+    Pool of the connections with `conn_params` for the current process, as the connections of a
+    parent process cannot be shared after forking
+    """
+    key = tuple((name, str(conn_params.get(name))) for name in POOL_KEY_PARAMS)
+
+    def connect():
+        return psycopg2.connect(**conn_params)
+
+    with pools_lock:
+        pool = pools.get(key)
+        if pool is None or pool.pid != os.getpid():
+            pool = pools[key] = ConnectionPool(
+                connect, **{name.lower(): value for name, value in options.items()}
+            )
+        else:
+            # The new connections use the current password if it has been rotated
+            pool.connect = connect
+        return pool
+
+
+def close_pools(database=None):
+    """
+    Closes the idle connections of every pool, or only of those to `database`
+    """
+    with pools_lock:
+        for key, pool in list(pools.items()):
+            if database is None or ('database', database) in key:
+                pool.close_all()
+                del pools[key]
+
+
+def get_pool_stats():
+    with pools_lock:
+        return {dict(key).get('database'): pool.stats for key, pool in pools.items()}